@@ -1,5 +1,189 @@
-'''Ce module contient les fonctions permettant de communiquer avec le serveur de jeu.'''
+'''Ce module contient les fonctions permettant de communiquer avec le serveur de jeu.
+
+Les requêtes passent par un ClientAsynchrone qui réutilise ses connexions (pas de
+nouvelle poignée de main TLS à chaque coup), impose un délai maximal à
+chaque requête et reprend, avec une attente exponentielle bornée, les requêtes qui
+échouent pour une raison passagère. Les fonctions lister_parties, débuter_partie et
+jouer_coup en sont l'enveloppe synchrone et gardent leur comportement d'origine.
+
+Les appels de requests sont bloquants: chaque client les confie à son propre bassin
+de fils d'exécution, d'autant de fils que de connexions, et chaque fil a sa propre
+session. Le nombre de requêtes simultanées est donc celui des connexions, et non la
+taille de l'exécuteur par défaut de la boucle asyncio.
+'''
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import instrumentation
+
+URL_SERVEUR = 'https://python.gel.ulaval.ca/quoridor/api/'
+DÉLAI_DÉFAUT = (5, 30)  # secondes: établissement de la connexion, réponse
+TENTATIVES_DÉFAUT = 4
+ATTENTE_INITIALE = 0.25
+ATTENTE_MAX = 4.0
+CONNEXIONS_DÉFAUT = 10
+
+
+class PartieTerminée(Exception):
+    '''Levée par ClientAsynchrone.jouer_coup lorsque le serveur annonce un gagnant.
+
+    Une coroutine ne peut pas lever StopIteration (PEP 479); l'enveloppe synchrone
+    jouer_coup la convertit en StopIteration.
+    '''
+
+    @property
+    def gagnant(self):
+        '''Le nom du gagnant.'''
+        return self.args[0]
+
+
+class ClientAsynchrone:
+    '''Client du serveur de jeu, à connexions persistantes.
+
+    :param url: l'adresse de base de l'API.
+    :param délai: le délai par défaut de chaque requête, en secondes (nombre ou tuple
+    (connexion, réponse), comme pour requests).
+    :param tentatives: le nombre maximal d'essais d'une requête.
+    :param connexions: le nombre de requêtes simultanées, soit le nombre de fils
+    d'exécution et de connexions conservées.
+    '''
+
+    def __init__(self, url=URL_SERVEUR, délai=DÉLAI_DÉFAUT, tentatives=TENTATIVES_DÉFAUT,
+                 connexions=CONNEXIONS_DÉFAUT):
+        self.url = url
+        self.délai = délai
+        self.tentatives = tentatives
+        self.connexions = connexions
+        self._exécuteur = ThreadPoolExecutor(connexions, thread_name_prefix='api')
+        self._local = threading.local()
+        self._sessions = []
+        self._verrou = threading.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.fermer()
+
+    def fermer(self):
+        '''Arrêter les fils d'exécution et fermer les connexions de leurs sessions.'''
+        self._exécuteur.shutdown(wait=True)
+        with self._verrou:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+    def _session(self):
+        # une session par fil d'exécution: requests.Session n'est pas conçue pour être
+        # partagée entre fils
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            adaptateur = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount('https://', adaptateur)
+            session.mount('http://', adaptateur)
+            with self._verrou:
+                self._sessions.append(session)
+        return session
+
+    def _envoyer(self, méthode, url, **kwargs):
+        return self._session().request(méthode, url, **kwargs)
+
+    async def lister_parties(self, idul, délai=None):
+        '''Obtenir les 20 dernières parties de l'idul passé en argument'''
+        data = await self._requête('GET', 'lister/', délai, params={'idul': idul})
+        return data['parties']
+
+    async def débuter_partie(self, idul, délai=None):
+        '''Entamer une nouvelle partie liée à l'idul passé en argument'''
+        data = await self._requête('POST', 'débuter/', délai, data={'idul': idul})
+        return data['id'], data['état']
+
+    async def jouer_coup(self, id_partie, type_coup, position, délai=None):
+        '''Communiquer le mouvement du joueur au serveur et recevoir le nouvel état de jeu.
+        Lève PartieTerminée si la partie est gagnée.
+
+        '''
+        data = await self._requête(
+            'POST', 'jouer/', délai,
+            data={'id': id_partie, 'type': type_coup, 'pos': position})
+        if data.get('gagnant') is not None:
+            raise PartieTerminée(data['gagnant'])
+        return data['état']
+
+    async def _requête(self, méthode, chemin, délai, **kwargs):
+        url = self.url + chemin
+        # un POST n'est repris que si la connexion n'a pas pu être établie: le serveur
+        # n'a alors pas reçu le coup, qui ne risque pas d'être joué deux fois
+        idempotente = méthode == 'GET'
+        essai = 0
+        while True:
+            dernier = essai >= self.tentatives - 1
+            if essai and instrumentation.actif:
+                instrumentation.compter('api.reprises')
+            début = time.perf_counter()
+            try:
+                req = await asyncio.get_running_loop().run_in_executor(
+                    self._exécuteur, partial(
+                        self._envoyer, méthode, url,
+                        timeout=self.délai if délai is None else délai, **kwargs))
+            except requests.ConnectionError as err:
+                if dernier or not (idempotente or isinstance(err, requests.ConnectTimeout)
+                                   or _avant_envoi(err)):
+                    raise ConnectionError(f"La requête vers {url} a échoué. ({err})") from err
+            except requests.Timeout as err:
+                if dernier or not idempotente:
+                    raise ConnectionError(
+                        f"La requête vers {url} a expiré. ({err})") from err
+            else:
+                if instrumentation.actif:
+                    instrumentation.mesurer(
+                        'api.' + chemin.strip('/'), time.perf_counter() - début)
+                if req.status_code == 200:
+                    data = req.json()
+                    if data.get('message') is not None:
+                        raise RuntimeError(data['message'])
+                    return data
+                if dernier or not (idempotente and req.status_code >= 500):
+                    raise ConnectionError(
+                        f"La requête vers {url} a échoué. (Code d'erreur: {req.status_code})")
+            await asyncio.sleep(min(ATTENTE_MAX, ATTENTE_INITIALE * 2 ** essai))
+            essai += 1
+
+
+def _avant_envoi(err):
+    # l'échec est survenu en établissant la connexion (résolution du nom, refus...)
+    raison = getattr(err.args[0], 'reason', None) if err.args else None
+    return isinstance(raison, NewConnectionError)
+
+
+_CLIENT = None
+
+
+def client():
+    '''Le client partagé par les fonctions synchrones du module, créé au premier appel.'''
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = ClientAsynchrone()
+    return _CLIENT
+
+
+def configurer(url=URL_SERVEUR, **options):
+    '''Diriger les fonctions du module vers un autre serveur (par exemple, le serveur
+    local de serveur.py). Les options sont celles de ClientAsynchrone.
+
+    '''
+    global _CLIENT
+    if _CLIENT is not None:
+        _CLIENT.fermer()
+    _CLIENT = ClientAsynchrone(url, **options)
 
 
 def lister_parties(idul):
@@ -7,15 +191,7 @@ def lister_parties(idul):
     les 20 dernières parties de l'idul passé en argument
 
     '''
-    url = 'https://python.gel.ulaval.ca/quoridor/api/lister/'
-    req = requests.get(url, params={'idul': idul})
-    data = req.json()
-    if req.status_code == 200:
-        if data.get('message') is not None:
-            raise RuntimeError(data['message'])
-        return data['parties']
-    raise ConnectionError(
-        f"La requête vers {url} a échoué. (Code d'erreur: {req.status_code})")
+    return asyncio.run(client().lister_parties(idul))
 
 
 def débuter_partie(idul):
@@ -23,28 +199,12 @@ def débuter_partie(idul):
      nouvelle partie liée à l'idul passé en argument
 
     '''
-    url = 'https://python.gel.ulaval.ca/quoridor/api/débuter/'
-    req = requests.post(url, data={'idul': idul})
-    data = req.json()
-    if req.status_code == 200:
-        if data.get('message') is not None:
-            raise RuntimeError(data['message'])
-        return data['id'], data['état']
-    raise ConnectionError(
-        f"La requête vers {url} a échoué. (Code d'erreur: {req.status_code})")
+    return asyncio.run(client().débuter_partie(idul))
 
 
 def jouer_coup(id_partie, type_coup, position):
     '''Communique le mouvement du joueur au serveur et reçois le nouvel état de jeu'''
-    url = 'https://python.gel.ulaval.ca/quoridor/api/jouer/'
-    req = requests.post(
-        url, data={'id': id_partie, 'type': type_coup, 'pos': position})
-    data = req.json()
-    if req.status_code == 200:
-        if data.get('message') is not None:
-            raise RuntimeError(data['message'])
-        if data.get('gagnant') is not None:
-            raise StopIteration(data['gagnant'])
-        return data['état']
-    raise ConnectionError(
-        f"La requête vers {url} a échoué. (Code d'erreur: {req.status_code})")
+    try:
+        return asyncio.run(client().jouer_coup(id_partie, type_coup, position))
+    except PartieTerminée as fin:
+        raise StopIteration(fin.gagnant) from None
@@ -0,0 +1,344 @@
+"""
+Base de parties en format binaire compact.
+
+Chaque coup tient sur un octet: 0 à 80 pour un déplacement (l'indice de la case
+d'arrivée, voir damier.case), 81 à 144 pour un mur horizontal et 145 à 208 pour un
+mur vertical (81 ou 145 plus l'indice de la fente, voir damier.fente_horizontale).
+Les joueurs jouent à tour de rôle; une partie est enregistrée ainsi:
+
+    drapeaux (1 octet) | nom 1 | nom 2 | [position de départ] | nombre de coups (2 octets) | coups
+
+où chaque nom est précédé de sa longueur en octets (UTF-8, 1 octet); un nom plus
+long est tronqué à 255 octets sans couper de caractère. Le bit 0 des
+drapeaux signale une position de départ autre que la position initiale: elle suit
+les noms, en 20 octets (cases des deux pions, murs restants, masques des murs
+horizontaux et verticaux). Le bit 1 signale que le joueur 2 joue le premier coup.
+
+La base est un fichier auquel les parties sont ajoutées bout à bout, accompagné d'un
+index (même chemin, suffixe .idx) qui donne la position de chaque partie sur 8
+octets. Le lecteur (BaseParties) projette les deux fichiers en mémoire: lire une
+partie ne demande ni de parcourir les précédentes, ni de lire du JSON.
+
+Utilisation: python archives.py BASE [--partie N [--plis K]]
+"""
+import mmap
+import os
+import struct
+from argparse import ArgumentParser
+
+from damier import (
+    Damier, NB_CASES, NB_FENTES, case, position, fente_horizontale, fente_verticale,
+    position_horizontale, position_verticale)
+from quoridor import Quoridor, QuoridorError
+
+SIGNATURE = b'QPAR'
+SIGNATURE_INDEX = b'QIDX'
+VERSION = 1
+EN_TÊTE = struct.Struct('<4sH')
+POSITION = struct.Struct('<Q')
+DÉPART = struct.Struct('<BBBBQQ')
+NOMBRE = struct.Struct('<H')
+
+DÉPART_EXPLICITE = 1
+TRAIT_JOUEUR_2 = 2
+
+_MURS_H = NB_CASES
+_MURS_V = NB_CASES + NB_FENTES
+_INITIALES = ((5, 1), (5, 9))
+_LONGUEUR_NOM_MAX = 255
+
+
+def encoder_coup(coup):
+    """
+    Encoder un coup au format externe sur un octet.
+
+    :param coup: le tuple (type_coup, position), où type_coup est 'D', 'MH' ou 'MV'.
+    :returns: l'octet du coup (0 à 208).
+    """
+    type_coup, (x, y) = coup
+    if type_coup == 'D':
+        return case((x, y))
+    if type_coup == 'MH':
+        return _MURS_H + fente_horizontale((x, y))
+    return _MURS_V + fente_verticale((x, y))
+
+
+def décoder_coup(octet):
+    """
+    Décoder un coup encodé par encoder_coup.
+
+    :param octet: l'octet du coup.
+    :returns: le tuple (type_coup, position).
+    """
+    if octet < _MURS_H:
+        return 'D', position(octet)
+    if octet < _MURS_V:
+        return 'MH', position_horizontale(octet - _MURS_H)
+    return 'MV', position_verticale(octet - _MURS_V)
+
+
+def encoder_partie(noms, coups, départ=None, trait=1):
+    """
+    Encoder une partie.
+
+    :param noms: les noms des joueurs 1 et 2.
+    :param coups: la liste des coups joués à tour de rôle, au format externe.
+    :param départ: le dictionnaire d'état de la position de départ (voir
+    Quoridor.état_partie), ou None pour la position initiale.
+    :param trait: le numéro du joueur (1 ou 2) qui joue le premier coup.
+    :returns: les octets de la partie.
+    """
+    drapeaux = TRAIT_JOUEUR_2 if trait == 2 else 0
+    morceaux = []
+    for nom in noms:
+        octets = _encoder_nom(nom)
+        morceaux += [bytes([len(octets)]), octets]
+    if départ is not None and not _initiale(départ):
+        drapeaux |= DÉPART_EXPLICITE
+        damier = Damier(
+            [joueur['pos'] for joueur in départ['joueurs']],
+            départ['murs']['horizontaux'], départ['murs']['verticaux'])
+        morceaux.append(DÉPART.pack(
+            *damier.pions, *(joueur['murs'] for joueur in départ['joueurs']),
+            damier.murs_h, damier.murs_v))
+    morceaux.append(NOMBRE.pack(len(coups)))
+    morceaux.append(bytes(encoder_coup(coup) for coup in coups))
+    return bytes([drapeaux]) + b''.join(morceaux)
+
+
+def _encoder_nom(nom):
+    # tronqué à la frontière d'un caractère: un caractère de plusieurs octets coupé
+    # par la troncature est retiré entièrement
+    octets = nom.encode('utf-8')
+    if len(octets) <= _LONGUEUR_NOM_MAX:
+        return octets
+    return octets[:_LONGUEUR_NOM_MAX].decode('utf-8', 'ignore').encode('utf-8')
+
+
+def _initiale(état):
+    return (
+        [tuple(joueur['pos']) for joueur in état['joueurs']] == list(_INITIALES)
+        and all(joueur['murs'] == 10 for joueur in état['joueurs'])
+        and not état['murs']['horizontaux'] and not état['murs']['verticaux']
+    )
+
+
+def décoder_partie(données, début=0):
+    """
+    Décoder une partie encodée par encoder_partie.
+
+    :param données: un objet octets (bytes, mmap...).
+    :param début: la position de la partie dans les données.
+    :returns: le dictionnaire {'noms', 'départ', 'trait', 'coups'}, où départ est le
+    dictionnaire d'état de la position de départ et coups, les octets des coups.
+    """
+    drapeaux = données[début]
+    curseur = début + 1
+    noms = []
+    for _ in range(2):
+        longueur = données[curseur]
+        noms.append(bytes(données[curseur + 1:curseur + 1 + longueur]).decode('utf-8'))
+        curseur += 1 + longueur
+
+    if drapeaux & DÉPART_EXPLICITE:
+        pion1, pion2, murs1, murs2, murs_h, murs_v = DÉPART.unpack_from(données, curseur)
+        curseur += DÉPART.size
+        pions, restants = (pion1, pion2), (murs1, murs2)
+        damier = Damier.depuis_indices(pions, murs_h, murs_v)
+        murs = {'horizontaux': damier.murs_horizontaux(), 'verticaux': damier.murs_verticaux()}
+    else:
+        pions, restants = [case(pos) for pos in _INITIALES], (10, 10)
+        murs = {'horizontaux': [], 'verticaux': []}
+    départ = {
+        'joueurs': [
+            {'nom': nom, 'murs': murs_joueur, 'pos': position(pion)}
+            for nom, murs_joueur, pion in zip(noms, restants, pions)
+        ],
+        'murs': murs,
+    }
+
+    (nombre,) = NOMBRE.unpack_from(données, curseur)
+    curseur += NOMBRE.size
+    return {
+        'noms': noms,
+        'départ': départ,
+        'trait': 2 if drapeaux & TRAIT_JOUEUR_2 else 1,
+        'coups': bytes(données[curseur:curseur + nombre]),
+    }
+
+
+def coups_entre(avant, après):
+    """
+    Retrouver les coups joués entre deux états successifs du serveur (le coup du
+    joueur 1, puis celui du joueur 2), pour convertir des parties archivées en JSON.
+
+    Les coups sont rejoués selon les règles depuis l'état avant. Lorsque les deux
+    joueurs ont placé un mur, l'ordre des deux nouveaux murs ne peut pas être connu:
+    l'attribution retenue est la première qui donne une suite légale, en essayant
+    d'abord le premier nouveau mur horizontal pour le joueur 1.
+
+    :param avant: le dictionnaire d'état avant le coup du joueur 1.
+    :param après: le dictionnaire d'état après la réponse du joueur 2.
+    :returns: la liste des tuples (joueur, coup), coup au format externe.
+    :raises QuoridorError: si aucune suite de coups légaux ne mène d'un état à
+    l'autre.
+    """
+    nouveaux = []
+    for clé, type_coup in (('horizontaux', 'MH'), ('verticaux', 'MV')):
+        anciens = {tuple(mur) for mur in avant['murs'][clé]}
+        nouveaux += [(type_coup, tuple(mur)) for mur in après['murs'][clé]
+                     if tuple(mur) not in anciens]
+    for ordre in (nouveaux, nouveaux[::-1]):
+        restants = list(ordre)
+        coups = []
+        for joueur, (état_avant, état_après) in enumerate(
+                zip(avant['joueurs'], après['joueurs']), start=1):
+            if tuple(état_avant['pos']) != tuple(état_après['pos']):
+                coups.append((joueur, ('D', tuple(état_après['pos']))))
+            elif état_après['murs'] < état_avant['murs'] and restants:
+                coups.append((joueur, restants.pop(0)))
+        if not restants and _légaux(avant, après, coups):
+            return coups
+    raise QuoridorError("Aucune suite de coups légaux ne relie les deux états")
+
+
+def _légaux(avant, après, coups):
+    # rejouer les coups depuis l'état avant et comparer le résultat à l'état après
+    jeu = Quoridor(avant['joueurs'], avant['murs'])
+    try:
+        for joueur, coup in coups:
+            _jouer(jeu, joueur, coup)
+    except QuoridorError:
+        return False
+    état = jeu.état_partie()
+    return (
+        [(tuple(j['pos']), j['murs']) for j in état['joueurs']]
+        == [(tuple(j['pos']), j['murs']) for j in après['joueurs']]
+        and all({tuple(mur) for mur in état['murs'][clé]}
+                == {tuple(mur) for mur in après['murs'][clé]}
+                for clé in ('horizontaux', 'verticaux'))
+    )
+
+
+def _jouer(jeu, joueur, coup):
+    type_coup, position_coup = coup
+    if type_coup == 'D':
+        jeu.déplacer_jeton(joueur, position_coup)
+    else:
+        jeu.placer_mur(
+            joueur, position_coup, 'horizontal' if type_coup == 'MH' else 'vertical')
+
+
+def ajouter_partie(chemin, noms, coups, départ=None, trait=1):
+    """
+    Ajouter une partie à la fin d'une base, créée au besoin.
+
+    :param chemin: le chemin du fichier de la base (l'index est chemin + '.idx').
+    :param noms: les noms des joueurs 1 et 2.
+    :param coups: la liste des coups joués à tour de rôle, au format externe.
+    :param départ: le dictionnaire d'état de la position de départ, ou None pour la
+    position initiale.
+    :param trait: le numéro du joueur (1 ou 2) qui joue le premier coup.
+    :returns: le numéro de la partie dans la base.
+    """
+    données = encoder_partie(noms, coups, départ, trait)
+    with open(chemin, 'ab') as fichier, open(chemin + '.idx', 'ab') as index:
+        if fichier.tell() == 0:
+            fichier.write(EN_TÊTE.pack(SIGNATURE, VERSION))
+        if index.tell() == 0:
+            index.write(EN_TÊTE.pack(SIGNATURE_INDEX, VERSION))
+        numéro = (index.tell() - EN_TÊTE.size) // POSITION.size
+        # la partie est écrite avant son entrée d'index: une écriture interrompue
+        # laisse au pire des octets inaccessibles à la fin de la base
+        début = fichier.tell()
+        fichier.write(données)
+        fichier.flush()
+        index.write(POSITION.pack(début))
+    return numéro
+
+
+class BaseParties:
+    """
+    Lecteur d'une base de parties, projetée en mémoire.
+
+    :param chemin: le chemin du fichier de la base (l'index est chemin + '.idx').
+    :raises ValueError: si les fichiers ne sont pas une base de parties.
+    """
+
+    def __init__(self, chemin):
+        self._données = _projeter(chemin, SIGNATURE)
+        self._index = _projeter(chemin + '.idx', SIGNATURE_INDEX)
+        self.taille = (len(self._index) - EN_TÊTE.size) // POSITION.size
+
+    def __len__(self):
+        return self.taille
+
+    def __iter__(self):
+        return (self.partie(numéro) for numéro in range(self.taille))
+
+    def partie(self, numéro):
+        """
+        Lire une partie (voir décoder_partie).
+
+        :param numéro: le numéro de la partie.
+        :raises IndexError: si la partie n'existe pas.
+        """
+        if not 0 <= numéro < self.taille:
+            raise IndexError(f"La partie {numéro} n'existe pas")
+        (début,) = POSITION.unpack_from(self._index, EN_TÊTE.size + numéro * POSITION.size)
+        return décoder_partie(self._données, début)
+
+    def coups(self, numéro):
+        """Produire la liste des coups d'une partie, au format externe."""
+        return [décoder_coup(octet) for octet in self.partie(numéro)['coups']]
+
+    def rejouer(self, numéro, plis=None):
+        """
+        Rejouer une partie selon les règles de Quoridor.
+
+        :param numéro: le numéro de la partie.
+        :param plis: le nombre de coups à rejouer (par défaut, tous).
+        :returns: l'instance de Quoridor après ces coups.
+        :raises QuoridorError: si un coup enregistré est illégal.
+        """
+        partie = self.partie(numéro)
+        jeu = Quoridor(partie['départ']['joueurs'], partie['départ']['murs'])
+        joueur = partie['trait']
+        for octet in partie['coups'][:plis]:
+            _jouer(jeu, joueur, décoder_coup(octet))
+            joueur = 3 - joueur
+        return jeu
+
+    def fermer(self):
+        """Fermer les projections des fichiers."""
+        self._données.close()
+        self._index.close()
+
+
+def _projeter(chemin, signature):
+    with open(chemin, 'rb') as fichier:
+        projection = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(projection) < EN_TÊTE.size or EN_TÊTE.unpack_from(projection) != (signature, VERSION):
+        projection.close()
+        raise ValueError(f"{chemin} n'est pas une base de parties")
+    return projection
+
+
+if __name__ == '__main__':
+    PARSER = ArgumentParser(description='Base de parties Quoridor')
+    PARSER.add_argument('base', help='Fichier de la base.')
+    PARSER.add_argument('--partie', type=int, default=None, help='Partie à afficher.')
+    PARSER.add_argument('--plis', type=int, default=None,
+                        help='Nombre de coups à rejouer (par défaut, tous).')
+    ARGS = PARSER.parse_args()
+    BASE = BaseParties(ARGS.base)
+    if ARGS.partie is None:
+        COUPS = sum(len(PARTIE['coups']) for PARTIE in BASE)
+        print(f'{len(BASE)} parties, {COUPS} coups, '
+              f'{os.path.getsize(ARGS.base)} octets '
+              f'({os.path.getsize(ARGS.base) / max(COUPS, 1):.2f} par coup)')
+    else:
+        PARTIE = BASE.partie(ARGS.partie)
+        print(f"{PARTIE['noms'][0]} contre {PARTIE['noms'][1]}, {len(PARTIE['coups'])} coups")
+        print(BASE.rejouer(ARGS.partie, ARGS.plis))
+    BASE.fermer()
@@ -0,0 +1,241 @@
+"""
+Tournoi d'autojeu entre configurations du moteur, avec classement Elo.
+
+Chaque configuration est un dictionnaire d'options de Quoridor.jouer_coup (par
+exemple {'profondeur': 3} ou {'mode': 'mcts', 'simulations': 500}). Les
+configurations s'affrontent deux à deux; chaque position de départ, obtenue par
+quelques coups aléatoires mais légaux, est jouée deux fois en inversant les couleurs.
+Les parties sont réparties sur un ProcessPoolExecutor.
+
+Les coups de chaque partie peuvent être ajoutés à une base de parties (voir
+archives.py), pour les analyser ou les rejouer plus tard.
+
+Le résultat est un dictionnaire sérialisable en JSON: pour chaque configuration, le
+taux de victoire, l'Elo contre l'ensemble des autres configurations avec son
+intervalle de confiance à 95 %, la latence moyenne par coup et le nombre de noeuds
+visités par seconde. Il peut être ajouté à un fichier JSON Lines pour suivre les
+régressions d'une version à l'autre.
+
+Utilisation:
+python autojeu.py --config 'ab2={"profondeur": 2}' --config 'ab3={"profondeur": 3}'
+"""
+import itertools
+import json
+import math
+import os
+import random
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+
+from archives import ajouter_partie
+from damier import position_horizontale, position_verticale
+from murs import murs_légaux
+from quoridor import Quoridor
+
+PARTIES_DÉFAUT = 100
+COUPS_OUVERTURE = 4
+PROBABILITÉ_MUR_OUVERTURE = 0.25
+LONGUEUR_MAX = 200
+Z_95 = 1.959964
+
+CONFIGURATIONS_DÉFAUT = {
+    'alphabeta-2': {'profondeur': 2},
+    'alphabeta-3': {'profondeur': 3},
+}
+
+
+def ouverture(graine, coups=COUPS_OUVERTURE):
+    """
+    Produire une position de départ par des coups aléatoires des deux joueurs.
+
+    :param graine: la graine du générateur aléatoire (entier ou chaîne).
+    :param coups: le nombre de coups de chaque joueur.
+    :returns: le dictionnaire d'état (voir Quoridor.état_partie), le joueur 1 ayant
+    le trait.
+    """
+    aléa = random.Random(graine)
+    partie = Quoridor(['1', '2'])
+    for _ in range(coups):
+        for joueur in (1, 2):
+            damier = partie.damier()
+            if partie.joueurs[joueur - 1]['murs'] and aléa.random() < PROBABILITÉ_MUR_OUVERTURE:
+                orientation, fente = aléa.choice(murs_légaux(damier))
+                if orientation == 'horizontal':
+                    partie.placer_mur(joueur, position_horizontale(fente), orientation)
+                else:
+                    partie.placer_mur(joueur, position_verticale(fente), orientation)
+            else:
+                # un pas qui ne termine pas la partie
+                destinations = [
+                    destination for destination in damier.déplacements(joueur)
+                    if destination[1] != (9 if joueur == 1 else 1)]
+                partie.déplacer_jeton(joueur, aléa.choice(destinations))
+    return partie.état_partie()
+
+
+def jouer_partie(tâche):
+    """
+    Jouer une partie entre deux configurations.
+
+    :param tâche: le tuple (noms, options, état) où noms et options donnent le nom
+    et les options de jouer_coup des joueurs 1 et 2, et état est la position de
+    départ.
+    :returns: le dictionnaire {'noms', 'gagnant', 'coups', 'temps', 'noeuds',
+    'historique'}, où gagnant est 1, 2 ou None (partie nulle après LONGUEUR_MAX
+    coups), temps et noeuds sont les totaux de chaque joueur et historique est la
+    liste des coups joués.
+    """
+    noms, options, état = tâche
+    partie = Quoridor(état['joueurs'], état['murs'])
+    tables = ({}, {})
+    temps = [0.0, 0.0]
+    noeuds = [0, 0]
+    historique = []
+    joueur = 1
+    while not partie.partie_terminée() and len(historique) < LONGUEUR_MAX:
+        partie.table_transposition = tables[joueur - 1]
+        début = time.perf_counter()
+        historique.append(partie.jouer_coup(joueur, **options[joueur - 1]))
+        temps[joueur - 1] += time.perf_counter() - début
+        noeuds[joueur - 1] += partie.noeuds_visités
+        joueur = 3 - joueur
+    gagnant = None
+    if partie.partie_terminée():
+        gagnant = 1 if partie.joueurs[0]['pos'][1] == 9 else 2
+    return {'noms': list(noms), 'gagnant': gagnant, 'coups': len(historique),
+            'temps': temps, 'noeuds': noeuds, 'historique': historique}
+
+
+def elo(score):
+    """
+    Convertir un score moyen en écart Elo.
+
+    :param score: la proportion de points obtenus, strictement entre 0 et 1.
+    :returns: l'écart Elo correspondant.
+    """
+    return -400 * math.log10(1 / score - 1)
+
+
+def classement(score, parties):
+    """
+    Estimer l'Elo et son intervalle de confiance à 95 % (approximation normale).
+
+    Un score de 0 ou de 1 est ramené à une demi-partie de l'extrême pour que l'Elo
+    reste fini.
+
+    :param score: la proportion de points obtenus.
+    :param parties: le nombre de parties jouées.
+    :returns: le tuple (elo, elo_min, elo_max).
+    """
+    borne = 0.5 / parties
+    écart = Z_95 * math.sqrt(score * (1 - score) / parties)
+    bornes = [min(max(s, borne), 1 - borne) for s in (score, score - écart, score + écart)]
+    return tuple(round(elo(s), 1) for s in bornes)
+
+
+def tournoi(configurations, parties=PARTIES_DÉFAUT, travailleurs=None, graine=0, base=None):
+    """
+    Faire s'affronter toutes les paires de configurations.
+
+    :param configurations: le dictionnaire nom -> options de jouer_coup.
+    :param parties: le nombre de parties de chaque confrontation (arrondi au nombre
+    pair supérieur, chaque ouverture étant jouée avec les deux couleurs).
+    :param travailleurs: le nombre de processus (par défaut, le nombre de coeurs).
+    :param graine: la graine des ouvertures.
+    :param base: le fichier de la base de parties à laquelle ajouter les parties
+    jouées (None: aucune).
+    :returns: le dictionnaire des résultats, sérialisable en JSON.
+    """
+    options = {}
+    for nom, opt in configurations.items():
+        opt = dict(opt)
+        if opt.get('mode') == 'mcts':
+            opt.setdefault('travailleurs', 1)  # les parties occupent déjà les coeurs
+        options[nom] = opt
+
+    ouvertures = [ouverture(f'{graine}-{i}') for i in range((parties + 1) // 2)]
+    tâches = []
+    for nom1, nom2 in itertools.combinations(options, 2):
+        for état in ouvertures:
+            for noms in ((nom1, nom2), (nom2, nom1)):
+                tâches.append((noms, (options[noms[0]], options[noms[1]]), état))
+
+    début = time.perf_counter()
+    with ProcessPoolExecutor(travailleurs or os.cpu_count() or 1) as exécuteur:
+        résultats = list(exécuteur.map(jouer_partie, tâches, chunksize=4))
+    durée = time.perf_counter() - début
+    if base is not None:
+        for tâche, résultat in zip(tâches, résultats):
+            ajouter_partie(base, résultat['noms'], résultat['historique'], tâche[2])
+
+    bilans = {nom: {'parties': 0, 'victoires': 0, 'défaites': 0, 'nulles': 0,
+                    'temps': 0.0, 'coups': 0, 'noeuds': 0} for nom in options}
+    confrontations = {}
+    for résultat in résultats:
+        for i, nom in enumerate(résultat['noms']):
+            bilan = bilans[nom]
+            bilan['parties'] += 1
+            if résultat['gagnant'] is None:
+                bilan['nulles'] += 1
+            elif résultat['gagnant'] == i + 1:
+                bilan['victoires'] += 1
+            else:
+                bilan['défaites'] += 1
+            bilan['temps'] += résultat['temps'][i]
+            bilan['coups'] += (résultat['coups'] + 1 - i) // 2
+            bilan['noeuds'] += résultat['noeuds'][i]
+        paire = ' vs '.join(sorted(résultat['noms']))
+        points = confrontations.setdefault(paire, {nom: 0.0 for nom in résultat['noms']})
+        for i, nom in enumerate(résultat['noms']):
+            if résultat['gagnant'] is None:
+                points[nom] += 0.5
+            elif résultat['gagnant'] == i + 1:
+                points[nom] += 1
+
+    for nom, bilan in bilans.items():
+        score = (bilan['victoires'] + bilan['nulles'] / 2) / bilan['parties']
+        bilan['taux'] = round(score, 4)
+        bilan['temps'] = round(bilan['temps'], 3)
+        bilan['elo'], bilan['elo_min'], bilan['elo_max'] = classement(score, bilan['parties'])
+        bilan['latence_moyenne'] = round(bilan['temps'] / max(bilan['coups'], 1), 4)
+        bilan['noeuds_par_seconde'] = round(bilan['noeuds'] / bilan['temps'], 1) \
+            if bilan['temps'] else 0.0
+        bilan['options'] = configurations[nom]
+
+    return {
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'graine': graine,
+        'parties': len(résultats),
+        'durée': round(durée, 2),
+        'configurations': bilans,
+        'confrontations': confrontations,
+    }
+
+
+def _configuration(texte):
+    nom, _, options = texte.partition('=')
+    return nom, json.loads(options) if options else {}
+
+
+if __name__ == '__main__':
+    PARSER = ArgumentParser(description="Tournoi d'autojeu Quoridor")
+    PARSER.add_argument(
+        '--config', type=_configuration, action='append', metavar='NOM=JSON',
+        help='Une configuration: son nom et les options de jouer_coup en JSON.')
+    PARSER.add_argument('--parties', type=int, default=PARTIES_DÉFAUT,
+                        help='Nombre de parties par confrontation.')
+    PARSER.add_argument('--travailleurs', type=int, default=None,
+                        help='Nombre de processus.')
+    PARSER.add_argument('--graine', type=int, default=0, help='Graine des ouvertures.')
+    PARSER.add_argument('--sortie', default=None,
+                        help='Fichier JSON Lines auquel ajouter le résultat.')
+    PARSER.add_argument('--base', default=None,
+                        help='Base de parties à laquelle ajouter les parties jouées.')
+    ARGS = PARSER.parse_args()
+    RÉSULTAT = tournoi(dict(ARGS.config) if ARGS.config else CONFIGURATIONS_DÉFAUT,
+                       ARGS.parties, ARGS.travailleurs, ARGS.graine, ARGS.base)
+    print(json.dumps(RÉSULTAT, ensure_ascii=False, indent=2))
+    if ARGS.sortie:
+        with open(ARGS.sortie, 'a', encoding='utf-8') as fichier:
+            fichier.write(json.dumps(RÉSULTAT, ensure_ascii=False) + '\n')
@@ -0,0 +1,240 @@
+"""
+Banc d'essai des opérations fréquentes, sur un corpus fixe de positions de milieu de
+partie (corpus.json).
+
+Chaque mesure applique une opération à toutes les positions du corpus; le temps
+retenu est le meilleur de plusieurs répétitions, par position. Une passe séparée
+sous tracemalloc donne la pointe de mémoire allouée par l'opération et le nombre de
+blocs qui lui survivent.
+
+Les résultats peuvent être enregistrés comme référence, puis comparés à celle-ci:
+une mesure plus lente que la référence au-delà du seuil est une régression et le
+programme se termine avec le code 1. La référence dépend de la machine et n'est
+pas versionnée.
+
+Utilisation:
+python banc.py --enregistrer        # mesurer et enregistrer la référence
+python banc.py --seuil 0.15         # comparer à la référence
+python banc.py --regenerer-corpus   # recréer corpus.json (graine fixe)
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+from damier import Damier
+from graphe import EXEMPLE, construire_graphe
+from murs import masque_murs_légaux
+from quoridor import Quoridor
+
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(DOSSIER, 'corpus.json')
+RÉFÉRENCE = os.path.join(DOSSIER, 'banc_reference.json')
+RÉPÉTITIONS_DÉFAUT = 5
+SEUIL_DÉFAUT = 0.10
+# les mesures plus bruitées tolèrent un écart plus grand
+SEUILS = {'jouer_coup': 0.20}
+PROFONDEUR_BANC = 2
+
+
+def générer_corpus(positions=24, graine=0):
+    """
+    Produire un corpus de positions de milieu de partie, de façon reproductible:
+    la position d'exemple (graphe.EXEMPLE, dessinée par visualisation.py), puis des
+    positions tirées de parties d'autojeu à la profondeur 2 depuis des ouvertures
+    aléatoires (voir autojeu.ouverture).
+
+    :param positions: le nombre de positions voulu.
+    :param graine: la graine des ouvertures.
+    :returns: la liste des dictionnaires d'état.
+    """
+    from autojeu import ouverture
+
+    corpus = [EXEMPLE]
+    partie_no = 0
+    while len(corpus) < positions:
+        état = ouverture(f'banc-{graine}-{partie_no}')
+        partie = Quoridor(
+            [dict(joueur, nom=nom) for joueur, nom in zip(état['joueurs'], ('idul', 'automate'))],
+            état['murs'])
+        joueur = 1
+        for coup in range(30):
+            if partie.partie_terminée():
+                break
+            partie.jouer_coup(joueur, profondeur=PROFONDEUR_BANC)
+            joueur = 3 - joueur
+            # une position sur six à partir du dixième coup, le joueur 1 ayant le trait
+            if coup >= 9 and joueur == 1 and coup % 6 == 5 and not partie.partie_terminée():
+                corpus.append(partie.état_partie())
+                if len(corpus) == positions:
+                    break
+        partie_no += 1
+    return corpus
+
+
+def charger_corpus(chemin=CORPUS):
+    """Lire le corpus de positions."""
+    with open(chemin, encoding='utf-8') as fichier:
+        return json.load(fichier)
+
+
+def _damier(état):
+    return Damier(
+        [joueur['pos'] for joueur in état['joueurs']],
+        état['murs']['horizontaux'], état['murs']['verticaux'])
+
+
+def _jouer_coup(état):
+    partie = Quoridor(état['joueurs'], état['murs'])
+    partie.jouer_coup(1, profondeur=PROFONDEUR_BANC)
+
+
+# nom -> (préparation de chaque position, opération mesurée)
+OPÉRATIONS = {
+    'construire_graphe': (
+        lambda état: ([j['pos'] for j in état['joueurs']],
+                      état['murs']['horizontaux'], état['murs']['verticaux']),
+        lambda args: construire_graphe(*args)),
+    'plus_court_chemin': (
+        _damier,
+        lambda damier: (damier.chemin(1), damier.chemin(2))),
+    'murs_légaux': (
+        _damier,
+        masque_murs_légaux),
+    'quoridor_init': (
+        lambda état: état,
+        lambda état: Quoridor(état['joueurs'], état['murs'])),
+    'quoridor_str': (
+        lambda état: Quoridor(état['joueurs'], état['murs']),
+        str),
+    'jouer_coup': (
+        lambda état: état,
+        _jouer_coup),
+}
+
+
+def mesurer(corpus, répétitions=RÉPÉTITIONS_DÉFAUT, opérations=None):
+    """
+    Mesurer les opérations sur le corpus.
+
+    :param corpus: la liste des dictionnaires d'état.
+    :param répétitions: le nombre de répétitions de la mesure de temps.
+    :param opérations: les noms des opérations à mesurer (par défaut, toutes).
+    :returns: le dictionnaire nom -> {'temps', 'mémoire', 'blocs'}: par position, le
+    meilleur temps moyen (s), la pointe de mémoire allouée (octets) et le nombre de
+    blocs encore alloués après l'opération.
+    """
+    résultats = {}
+    for nom in opérations or OPÉRATIONS:
+        préparer, opération = OPÉRATIONS[nom]
+        entrées = [préparer(état) for état in corpus]
+
+        meilleur = float('inf')
+        gc.disable()
+        try:
+            for _ in range(répétitions):
+                début = time.perf_counter()
+                for entrée in entrées:
+                    opération(entrée)
+                meilleur = min(meilleur, time.perf_counter() - début)
+        finally:
+            gc.enable()
+
+        # tracemalloc ne compte pas les blocs déjà libérés: on retient la pointe de
+        # mémoire de chaque appel et les blocs qui lui survivent (caches, fuites)
+        pointes = 0
+        tracemalloc.start()
+        try:
+            avant = tracemalloc.take_snapshot()
+            for entrée in entrées:
+                départ, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                opération(entrée)
+                pointes += tracemalloc.get_traced_memory()[1] - départ
+            après = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        blocs = sum(stat.count_diff for stat in après.compare_to(avant, 'filename'))
+
+        résultats[nom] = {
+            'temps': meilleur / len(entrées),
+            'mémoire': pointes / len(entrées),
+            'blocs': blocs / len(entrées),
+        }
+    return résultats
+
+
+def comparer(résultats, référence, seuil=SEUIL_DÉFAUT, seuils=None):
+    """
+    Comparer des mesures à une référence.
+
+    :param résultats: les mesures (voir mesurer).
+    :param référence: les mesures de référence.
+    :param seuil: l'écart relatif de temps toléré par défaut.
+    :param seuils: les écarts tolérés propres à certaines opérations.
+    :returns: le tuple (lignes du rapport, liste des opérations en régression).
+    """
+    seuils = {**SEUILS, **(seuils or {})}
+    lignes = []
+    régressions = []
+    for nom, mesure in résultats.items():
+        ligne = (f"{nom:18s} {mesure['temps'] * 1e6:10.1f} µs  "
+                 f"{mesure['mémoire'] / 1024:8.1f} Kio  {mesure['blocs']:6.1f} blocs")
+        ancienne = référence.get(nom)
+        if ancienne is not None:
+            écart = mesure['temps'] / ancienne['temps'] - 1
+            tolérance = seuils.get(nom, seuil)
+            ligne += f"  {écart:+7.1%}"
+            if écart > tolérance:
+                ligne += f"  RÉGRESSION (> {tolérance:.0%})"
+                régressions.append(nom)
+        lignes.append(ligne)
+    return lignes, régressions
+
+
+def _seuil(texte):
+    nom, _, valeur = texte.partition('=')
+    return nom, float(valeur)
+
+
+if __name__ == '__main__':
+    PARSER = ArgumentParser(description="Banc d'essai Quoridor")
+    PARSER.add_argument('operations', nargs='*', metavar='OPERATION',
+                        help=f"Opérations à mesurer parmi {', '.join(OPÉRATIONS)} "
+                             "(par défaut, toutes).")
+    PARSER.add_argument('--repetitions', type=int, default=RÉPÉTITIONS_DÉFAUT,
+                        help='Nombre de répétitions de la mesure de temps.')
+    PARSER.add_argument('--seuil', type=float, default=SEUIL_DÉFAUT,
+                        help='Ralentissement relatif toléré (0.10 pour 10 %%).')
+    PARSER.add_argument('--seuil-operation', type=_seuil, action='append', default=[],
+                        metavar='NOM=SEUIL', help="Seuil propre à une opération.")
+    PARSER.add_argument('--reference', default=RÉFÉRENCE, help='Fichier de référence.')
+    PARSER.add_argument('--enregistrer', action='store_true',
+                        help='Enregistrer les mesures comme nouvelle référence.')
+    PARSER.add_argument('--regenerer-corpus', action='store_true',
+                        help='Recréer le corpus de positions.')
+    ARGS = PARSER.parse_args()
+    for OPÉRATION in ARGS.operations:
+        if OPÉRATION not in OPÉRATIONS:
+            PARSER.error(f'opération inconnue: {OPÉRATION}')
+
+    if ARGS.regenerer_corpus:
+        with open(CORPUS, 'w', encoding='utf-8') as FICHIER:
+            json.dump(générer_corpus(), FICHIER, ensure_ascii=False, indent=1)
+
+    RÉSULTATS = mesurer(charger_corpus(), ARGS.repetitions, ARGS.operations)
+    RÉFÉRENCE_LUE = {}
+    if not ARGS.enregistrer and os.path.exists(ARGS.reference):
+        with open(ARGS.reference, encoding='utf-8') as FICHIER:
+            RÉFÉRENCE_LUE = json.load(FICHIER)
+    LIGNES, RÉGRESSIONS = comparer(
+        RÉSULTATS, RÉFÉRENCE_LUE, ARGS.seuil, dict(ARGS.seuil_operation))
+    print('\n'.join(LIGNES))
+
+    if ARGS.enregistrer:
+        with open(ARGS.reference, 'w', encoding='utf-8') as FICHIER:
+            json.dump(RÉSULTATS, FICHIER, ensure_ascii=False, indent=2)
+    sys.exit(1 if RÉGRESSIONS else 0)
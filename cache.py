@@ -0,0 +1,175 @@
+"""
+Table de transposition persistante, conservée sur disque d'une partie à l'autre.
+
+La table s'utilise comme le dictionnaire de recherche.Recherche: clé de Zobrist ->
+(profondeur, score, drapeau, meilleur coup). Les entrées vivent en mémoire pendant la
+recherche: la base SQLite est lue en entier, en une seule requête, au premier accès
+(ou par charger), et n'est plus consultée ensuite; une clé absente de la mémoire est
+absente de la base, sans requête dans la boucle de recherche. Les entrées
+suffisamment profondes sont écrites sur disque par enregistrer (ou clear, lorsque la
+recherche vide sa table). La base est bornée en nombre d'entrées: les moins
+récemment utilisées sont évincées.
+"""
+import sqlite3
+
+CHEMIN_DÉFAUT = 'cache_quoridor.sqlite'
+TAILLE_MAX_DÉFAUT = 500000
+PROFONDEUR_MIN_DÉFAUT = 2
+
+_DÉCALAGE = 1 << 63  # les clés de 64 bits non signées sont stockées signées
+
+
+class CachePersistant:
+    """
+    Table de transposition adossée à une base SQLite.
+
+    :param chemin: le chemin du fichier de la base.
+    :param taille_max: le nombre maximal d'entrées conservées sur disque.
+    :param profondeur_min: la profondeur minimale d'une entrée pour être écrite.
+    """
+
+    def __init__(self, chemin=CHEMIN_DÉFAUT, taille_max=TAILLE_MAX_DÉFAUT,
+                 profondeur_min=PROFONDEUR_MIN_DÉFAUT):
+        self.chemin = chemin
+        self.taille_max = taille_max
+        self.profondeur_min = profondeur_min
+        self.mémoire = {}
+        self.modifiées = set()
+        self.consultées = set()
+        # entrées lues sur disque que la recherche n'a pas encore consultées
+        self.non_consultées = set()
+        self.chargée = False
+        self._connexion = None
+        self._horloge = 0
+
+    @property
+    def connexion(self):
+        """La connexion à la base, ouverte au premier accès."""
+        if self._connexion is None:
+            # la table peut être remplie par un fil de réflexion (voir ponderation),
+            # jamais en même temps que par le fil principal
+            self._connexion = sqlite3.connect(self.chemin, check_same_thread=False)
+            self._connexion.executescript('''
+                CREATE TABLE IF NOT EXISTS entrées (
+                    clé INTEGER PRIMARY KEY,
+                    profondeur INTEGER NOT NULL,
+                    score INTEGER NOT NULL,
+                    drapeau INTEGER NOT NULL,
+                    type_coup TEXT,
+                    valeur INTEGER,
+                    accès INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entrées_accès ON entrées (accès);
+            ''')
+            self._horloge = self._connexion.execute(
+                'SELECT COALESCE(MAX(accès), 0) FROM entrées').fetchone()[0]
+        return self._connexion
+
+    def charger(self):
+        """
+        Lire toutes les entrées de la base en mémoire, sans remplacer celles qui y
+        sont déjà.
+        """
+        self.chargée = True
+        rangées = self.connexion.execute(
+            'SELECT clé, profondeur, score, drapeau, type_coup, valeur FROM entrées')
+        for clé, profondeur, score, drapeau, type_coup, valeur in rangées:
+            clé += _DÉCALAGE
+            if clé not in self.mémoire:
+                self.mémoire[clé] = (
+                    profondeur, score, drapeau,
+                    None if type_coup is None else (type_coup, valeur))
+                self.non_consultées.add(clé)
+
+    def __len__(self):
+        return len(self.mémoire)
+
+    def __contains__(self, clé):
+        return self.get(clé) is not None
+
+    def __getitem__(self, clé):
+        entrée = self.get(clé)
+        if entrée is None:
+            raise KeyError(clé)
+        return entrée
+
+    def __setitem__(self, clé, entrée):
+        if not self.chargée:
+            self.charger()
+        self.mémoire[clé] = entrée
+        self.modifiées.add(clé)
+
+    def get(self, clé, défaut=None):
+        """
+        Lire une entrée; la base est chargée au premier appel.
+
+        :param clé: la clé de Zobrist de la position.
+        :param défaut: la valeur retournée si la clé est absente.
+        :returns: le tuple (profondeur, score, drapeau, coup), ou défaut.
+        """
+        if not self.chargée:
+            self.charger()
+        entrée = self.mémoire.get(clé)
+        if entrée is None:
+            return défaut
+        if clé in self.non_consultées:
+            self.non_consultées.discard(clé)
+            self.consultées.add(clé)
+        return entrée
+
+    def enregistrer(self):
+        """
+        Écrire sur disque les entrées modifiées assez profondes, rafraîchir la date
+        d'accès des entrées consultées, puis évincer les entrées les plus anciennes si
+        la base dépasse sa taille maximale.
+        """
+        if not self.modifiées and not self.consultées:
+            return
+        connexion = self.connexion
+        self._horloge += 1
+        horloge = self._horloge
+        rangées = []
+        for clé in self.modifiées:
+            profondeur, score, drapeau, coup = self.mémoire[clé]
+            if profondeur < self.profondeur_min:
+                continue
+            type_coup, valeur = coup if coup is not None else (None, None)
+            rangées.append((clé - _DÉCALAGE, profondeur, score, drapeau, type_coup, valeur, horloge))
+        with connexion:
+            # une entrée plus profonde déjà sur disque n'est pas remplacée
+            connexion.executemany('''
+                INSERT INTO entrées VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (clé) DO UPDATE SET
+                    profondeur = excluded.profondeur, score = excluded.score,
+                    drapeau = excluded.drapeau, type_coup = excluded.type_coup,
+                    valeur = excluded.valeur, accès = excluded.accès
+                WHERE excluded.profondeur >= entrées.profondeur
+            ''', rangées)
+            connexion.executemany(
+                'UPDATE entrées SET accès = ? WHERE clé = ?',
+                [(horloge, clé - _DÉCALAGE) for clé in self.consultées])
+            excédent = connexion.execute(
+                'SELECT COUNT(*) FROM entrées').fetchone()[0] - self.taille_max
+            if excédent > 0:
+                connexion.execute('''
+                    DELETE FROM entrées WHERE clé IN (
+                        SELECT clé FROM entrées ORDER BY accès LIMIT ?)
+                ''', (excédent,))
+        self.modifiées.clear()
+        self.consultées.clear()
+
+    def clear(self):
+        """
+        Enregistrer les entrées sur disque, puis vider la mémoire. La base n'est pas
+        relue: la recherche en cours ne doit pas payer son chargement.
+        """
+        self.enregistrer()
+        self.mémoire.clear()
+        self.non_consultées.clear()
+
+    def fermer(self):
+        """Enregistrer les entrées et fermer la base."""
+        self.enregistrer()
+        if self._connexion is not None:
+            self._connexion.close()
+            self._connexion = None
@@ -0,0 +1,175 @@
+"""
+Générateur de charge pour le serveur de jeu.
+
+Des parties sont jouées en parallèle par le vrai client (api.ClientAsynchrone); le
+joueur 1 avance le long d'un plus court chemin pour que le temps mesuré soit celui du
+client, du réseau et du serveur. Le générateur produit les centiles de latence de
+chaque point d'accès et le débit soutenu en parties par seconde.
+
+Le nombre de requêtes en vol est fixé explicitement: le client a autant de fils
+d'exécution et de connexions que de parties simultanées. Par défaut, le serveur
+local de serveur.py est lancé dans un processus distinct, pour que le serveur et le
+générateur ne se disputent pas le même verrou global de l'interpréteur.
+
+Utilisation, contre un serveur local lancé pour l'occasion:
+python charge.py --parties 200 --simultanées 16
+ou contre un serveur déjà lancé: python charge.py --url http://127.0.0.1:8000/
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+import serveur
+from api import ClientAsynchrone, PartieTerminée
+from damier import Damier, position
+
+CENTILES = (50, 90, 99)
+SERVEUR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serveur.py')
+
+
+def centile(valeurs, rang):
+    """
+    Calculer un centile (méthode du rang le plus proche).
+
+    :param valeurs: les valeurs mesurées, triées.
+    :param rang: le centile voulu, de 0 à 100.
+    :returns: la valeur du centile, ou None s'il n'y a aucune valeur.
+    """
+    if not valeurs:
+        return None
+    indice = max(0, -(-rang * len(valeurs) // 100) - 1)
+    return valeurs[min(indice, len(valeurs) - 1)]
+
+
+def coup_chemin(état):
+    """
+    Choisir le pas du joueur 1 le long d'un plus court chemin.
+
+    :param état: le dictionnaire d'état du serveur.
+    :returns: le tuple (type_coup, position) du coup.
+    """
+    joueurs = [tuple(joueur['pos']) for joueur in état['joueurs']]
+    damier = Damier(
+        joueurs,
+        [tuple(mur) for mur in état['murs']['horizontaux']],
+        [tuple(mur) for mur in état['murs']['verticaux']])
+    return 'D', position(damier.chemin(1)[0])
+
+
+def lancer_serveur(adversaire='chemin'):
+    """
+    Lancer le serveur local de serveur.py dans un nouveau processus, sur un port
+    libre.
+
+    :param adversaire: la stratégie du joueur 2 (voir serveur.ADVERSAIRES).
+    :returns: le tuple (processus, url); processus.terminate() arrête le serveur.
+    :raises RuntimeError: si le serveur s'arrête avant d'annoncer son adresse.
+    """
+    processus = subprocess.Popen(
+        [sys.executable, '-u', SERVEUR, '--port', '0', '--adversaire', adversaire],
+        stdout=subprocess.PIPE, text=True)
+    # première ligne: «Serveur Quoridor à l'écoute sur <url>»
+    ligne = processus.stdout.readline()
+    if not ligne:
+        processus.wait()
+        raise RuntimeError("Le serveur local s'est arrêté au démarrage")
+    return processus, ligne.split()[-1]
+
+
+async def _chronométrer(latences, point, attente):
+    début = time.perf_counter()
+    try:
+        return await attente
+    finally:
+        latences.setdefault(point, []).append(time.perf_counter() - début)
+
+
+async def _jouer(client, idul, latences):
+    id_partie, état = await _chronométrer(latences, 'débuter', client.débuter_partie(idul))
+    while True:
+        type_coup, position_coup = coup_chemin(état)
+        try:
+            état = await _chronométrer(
+                latences, 'jouer', client.jouer_coup(id_partie, type_coup, position_coup))
+        except PartieTerminée:
+            return
+
+
+async def générer(url, parties, simultanées, idul='charge'):
+    """
+    Jouer des parties contre un serveur en gardant un nombre constant de parties en
+    cours.
+
+    :param url: l'adresse de base de l'API.
+    :param parties: le nombre total de parties à jouer.
+    :param simultanées: le nombre de parties en cours à la fois, qui est aussi le
+    nombre de requêtes simultanées du client.
+    :param idul: l'IDUL sous lequel les parties sont débutées.
+    :returns: le tuple (latences par point d'accès, nombre d'erreurs, durée en s).
+    """
+    latences = {}
+    erreurs = 0
+    restantes = parties
+
+    async def travailler():
+        nonlocal restantes, erreurs
+        while restantes > 0:
+            restantes -= 1
+            try:
+                await _jouer(client, idul, latences)
+            except (RuntimeError, ConnectionError):
+                erreurs += 1
+
+    début = time.perf_counter()
+    async with ClientAsynchrone(url, connexions=simultanées) as client:
+        await asyncio.gather(*(travailler() for _ in range(simultanées)))
+    return latences, erreurs, time.perf_counter() - début
+
+
+def rapport(latences, erreurs, durée, parties):
+    """
+    Produire le rapport d'un test de charge.
+
+    :param latences: les latences par point d'accès retournées par générer.
+    :param erreurs: le nombre de parties interrompues par une erreur.
+    :param durée: la durée totale, en secondes.
+    :param parties: le nombre de parties jouées.
+    :returns: le rapport, sous forme de chaîne de caractères.
+    """
+    lignes = []
+    for point, valeurs in sorted(latences.items()):
+        valeurs = sorted(valeurs)
+        centiles = '  '.join(
+            f'p{rang} {centile(valeurs, rang) * 1000:7.2f} ms' for rang in CENTILES)
+        lignes.append(f'{point:8s} {len(valeurs):7d} requêtes  {centiles}')
+    requêtes = sum(len(valeurs) for valeurs in latences.values())
+    lignes.append(
+        f'{parties - erreurs}/{parties} parties en {durée:.2f} s: '
+        f'{(parties - erreurs) / durée:.2f} parties/s, {requêtes / durée:.1f} requêtes/s')
+    return '\n'.join(lignes)
+
+
+if __name__ == '__main__':
+    PARSER = ArgumentParser(description='Générateur de charge Quoridor')
+    PARSER.add_argument('--url', default=None,
+                        help='Adresse du serveur (par défaut, un serveur local lancé '
+                             'dans un autre processus).')
+    PARSER.add_argument('--parties', type=int, default=100, help='Nombre de parties.')
+    PARSER.add_argument('--simultanées', type=int, default=8,
+                        help='Nombre de parties en cours à la fois.')
+    PARSER.add_argument('--adversaire', choices=serveur.ADVERSAIRES, default='chemin',
+                        help='Stratégie du serveur local.')
+    ARGS = PARSER.parse_args()
+    PROCESSUS, URL = None, ARGS.url
+    if URL is None:
+        PROCESSUS, URL = lancer_serveur(ARGS.adversaire)
+    try:
+        print(rapport(*asyncio.run(générer(URL, ARGS.parties, ARGS.simultanées)),
+                      ARGS.parties))
+    finally:
+        if PROCESSUS is not None:
+            PROCESSUS.terminate()
+            PROCESSUS.wait()
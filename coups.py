@@ -0,0 +1,72 @@
+"""
+Générateur des coups légaux d'une position, sans construction de graphe.
+
+Les déplacements du pion (sauts en ligne droite et pas en diagonale compris) sont
+lus dans les tables de voisins et de murs bloquants de damier.py; les murs légaux
+viennent du masque vectorisé de murs.masque_murs_légaux. Les coups sont produits
+paresseusement, dans un ordre favorable à la recherche:
+
+1. les déplacements, ceux qui rapprochent le pion de sa rangée objectif d'abord;
+2. les murs qui coupent un plus court chemin de l'adversaire;
+3. les autres murs légaux.
+
+Le masque des murs n'est calculé que si le consommateur dépasse les déplacements.
+"""
+from damier import (
+    NB_FENTES, position, position_horizontale, position_verticale, murs_bloquants)
+from murs import masque_murs_légaux
+
+
+def déplacements_légaux(damier, joueur):
+    """
+    Produire les cases où le pion d'un joueur peut se déplacer, en avançant d'abord.
+
+    :param damier: le damier (voir damier.Damier).
+    :param joueur: le numéro du joueur (1 ou 2).
+    :returns: la liste des positions (x, y), triées de la plus avancée à la plus
+    reculée vers la rangée objectif.
+    """
+    sens = 1 if joueur == 1 else -1
+    destinations = [position(indice) for indice in damier.successeurs(damier.pions[joueur - 1])]
+    destinations.sort(key=lambda destination: -sens * destination[1])
+    return destinations
+
+
+def coups_légaux(état, joueur, murs=True):
+    """
+    Énumérer paresseusement les coups légaux d'un joueur.
+
+    :param état: l'état de la partie (voir etat.EtatQuoridor).
+    :param joueur: le numéro du joueur (1 ou 2).
+    :param murs: si faux, seuls les déplacements sont produits.
+    :returns: un générateur de tuples (type_coup, position), où type_coup est 'D',
+    'MH' ou 'MV', au format de EtatQuoridor.jouer et de l'API.
+    """
+    damier = état.damier()
+    for destination in déplacements_légaux(damier, joueur):
+        yield 'D', destination
+    if not murs or not état.restants[joueur - 1]:
+        return
+
+    masque = masque_murs_légaux(damier)
+
+    # d'abord les murs qui coupent un plus court chemin de l'adversaire: seuls
+    # ceux-là peuvent l'allonger (les sauts de pion n'en désignent aucun)
+    adversaire = 3 - joueur
+    chemin = damier.chemin(adversaire) or []
+    cases = [damier.pions[adversaire - 1]] + chemin
+    for départ, arrivée in zip(cases, cases[1:]):
+        for orientation, fente in murs_bloquants(départ, arrivée):
+            indice = fente if orientation == 'horizontal' else NB_FENTES + fente
+            if masque[indice]:
+                masque[indice] = False
+                yield _coup_mur(indice)
+
+    for indice in masque.nonzero()[0]:
+        yield _coup_mur(int(indice))
+
+
+def _coup_mur(indice):
+    if indice < NB_FENTES:
+        return 'MH', position_horizontale(indice)
+    return 'MV', position_verticale(indice - NB_FENTES)
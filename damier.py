@@ -0,0 +1,420 @@
+"""
+Moteur de damier compact pour Quoridor.
+
+Les cases sont représentées par des entiers de 0 à 80 (case = (x-1) + 9*(y-1)) et
+les murs par deux masques de 64 bits, un par orientation. Les tables de voisins et
+de murs bloquants sont calculées une seule fois au chargement du module, ce qui
+permet de répondre aux requêtes d'accessibilité et de plus court chemin sans
+construire de graphe.
+"""
+from collections import deque
+
+from instrumentation import chronométré
+
+TAILLE = 9
+NB_CASES = TAILLE * TAILLE
+NB_FENTES = 64
+
+# directions: est, ouest, nord, sud
+EST, OUEST, NORD, SUD = range(4)
+DIRECTIONS = (EST, OUEST, NORD, SUD)
+DÉCALAGES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# noeuds objectifs, comme dans graphe.construire_graphe
+OBJECTIFS = {1: 'B1', 2: 'B2'}
+
+
+def case(position):
+    """
+    Convertir une position (x, y) en indice de case.
+
+    :param position: le tuple (x, y) de la case (1<=x<=9 et 1<=y<=9).
+    :returns: l'indice de la case (0 à 80).
+    """
+    x, y = position
+    return (x - 1) + TAILLE * (y - 1)
+
+
+def position(indice):
+    """
+    Convertir un indice de case en position (x, y).
+
+    :param indice: l'indice de la case (0 à 80).
+    :returns: le tuple (x, y) de la case.
+    """
+    return (indice % TAILLE + 1, indice // TAILLE + 1)
+
+
+def fente_horizontale(position_mur):
+    """
+    Convertir la position (x, y) d'un mur horizontal en indice de fente.
+
+    :param position_mur: le tuple (x, y) du mur (1<=x<=8 et 2<=y<=9).
+    :returns: l'indice de la fente (0 à 63).
+    """
+    x, y = position_mur
+    return (x - 1) + 8 * (y - 2)
+
+
+def fente_verticale(position_mur):
+    """
+    Convertir la position (x, y) d'un mur vertical en indice de fente.
+
+    :param position_mur: le tuple (x, y) du mur (2<=x<=9 et 1<=y<=8).
+    :returns: l'indice de la fente (0 à 63).
+    """
+    x, y = position_mur
+    return (x - 2) + 8 * (y - 1)
+
+
+def position_horizontale(fente):
+    """Convertir un indice de fente horizontale en position (x, y) du mur."""
+    return (fente % 8 + 1, fente // 8 + 2)
+
+
+def position_verticale(fente):
+    """Convertir un indice de fente verticale en position (x, y) du mur."""
+    return (fente % 8 + 2, fente // 8 + 1)
+
+
+def mur_horizontal_valide(position_mur):
+    """Vérifier que la position d'un mur horizontal est sur le damier."""
+    return 1 <= position_mur[0] <= 8 and 2 <= position_mur[1] <= 9
+
+
+def mur_vertical_valide(position_mur):
+    """Vérifier que la position d'un mur vertical est sur le damier."""
+    return 2 <= position_mur[0] <= 9 and 1 <= position_mur[1] <= 8
+
+
+def _construire_tables():
+    voisins = []
+    bloqueurs_h = []
+    bloqueurs_v = []
+    for indice in range(NB_CASES):
+        x, y = position(indice)
+        ligne_voisins = []
+        ligne_h = []
+        ligne_v = []
+        for dx, dy in DÉCALAGES:
+            nx_, ny_ = x + dx, y + dy
+            if not (1 <= nx_ <= TAILLE and 1 <= ny_ <= TAILLE):
+                ligne_voisins.append(-1)
+                ligne_h.append(0)
+                ligne_v.append(0)
+                continue
+            ligne_voisins.append(case((nx_, ny_)))
+            masque_h = masque_v = 0
+            if dy:
+                # un mur horizontal (mx, my) sépare les lignes my-1 et my
+                # pour les colonnes mx et mx+1
+                my = max(y, ny_)
+                for mx in (x - 1, x):
+                    if mur_horizontal_valide((mx, my)):
+                        masque_h |= 1 << fente_horizontale((mx, my))
+            else:
+                # un mur vertical (mx, my) sépare les colonnes mx-1 et mx
+                # pour les lignes my et my+1
+                mx = max(x, nx_)
+                for my in (y - 1, y):
+                    if mur_vertical_valide((mx, my)):
+                        masque_v |= 1 << fente_verticale((mx, my))
+            ligne_h.append(masque_h)
+            ligne_v.append(masque_v)
+        voisins.append(tuple(ligne_voisins))
+        bloqueurs_h.append(tuple(ligne_h))
+        bloqueurs_v.append(tuple(ligne_v))
+    return tuple(voisins), tuple(bloqueurs_h), tuple(bloqueurs_v)
+
+
+def _construire_conflits():
+    # Deux murs de même orientation se chevauchent s'ils partagent un segment, et
+    # un mur horizontal croise le mur vertical de même indice (même centre).
+    conflits_h = []
+    conflits_v = []
+    for fente in range(NB_FENTES):
+        x, y = fente % 8, fente // 8
+        masque_h = 1 << fente
+        if x > 0:
+            masque_h |= 1 << (fente - 1)
+        if x < 7:
+            masque_h |= 1 << (fente + 1)
+        conflits_h.append((masque_h, 1 << fente))
+        masque_v = 1 << fente
+        if y > 0:
+            masque_v |= 1 << (fente - 8)
+        if y < 7:
+            masque_v |= 1 << (fente + 8)
+        conflits_v.append((1 << fente, masque_v))
+    return tuple(conflits_h), tuple(conflits_v)
+
+
+VOISINS, BLOQUEURS_H, BLOQUEURS_V = _construire_tables()
+CONFLITS_H, CONFLITS_V = _construire_conflits()
+
+# cases de la rangée objectif de chaque joueur
+RANGÉES = {
+    1: tuple(case((x, TAILLE)) for x in range(1, TAILLE + 1)),
+    2: tuple(case((x, 1)) for x in range(1, TAILLE + 1)),
+}
+
+
+class Damier:
+    """
+    Position des pions et des murs sur un damier de Quoridor.
+
+    :param joueurs: une liste des positions (x, y) des joueurs.
+    :param murs_horizontaux: une liste des positions (x, y) des murs horizontaux.
+    :param murs_verticaux: une liste des positions (x, y) des murs verticaux.
+    """
+
+    __slots__ = ('pions', 'murs_h', 'murs_v')
+
+    def __init__(self, joueurs, murs_horizontaux=(), murs_verticaux=()):
+        self.pions = [case(tuple(pos)) for pos in joueurs]
+        self.murs_h = 0
+        self.murs_v = 0
+        for pos in murs_horizontaux:
+            self.murs_h |= 1 << fente_horizontale(tuple(pos))
+        for pos in murs_verticaux:
+            self.murs_v |= 1 << fente_verticale(tuple(pos))
+
+    @classmethod
+    def depuis_indices(cls, pions, murs_h, murs_v):
+        """
+        Construire un damier directement à partir de sa représentation compacte.
+
+        :param pions: les indices des cases des pions.
+        :param murs_h: le masque des murs horizontaux.
+        :param murs_v: le masque des murs verticaux.
+        :returns: une instance de Damier.
+        """
+        damier = cls.__new__(cls)
+        damier.pions = list(pions)
+        damier.murs_h = murs_h
+        damier.murs_v = murs_v
+        return damier
+
+    def ouvert(self, indice, direction):
+        """
+        Déterminer si le passage d'une case vers sa voisine est libre de murs.
+
+        :param indice: l'indice de la case de départ.
+        :param direction: la direction (EST, OUEST, NORD ou SUD).
+        :returns: True si la voisine existe et n'est pas séparée par un mur.
+        """
+        return (
+            VOISINS[indice][direction] >= 0
+            and not self.murs_h & BLOQUEURS_H[indice][direction]
+            and not self.murs_v & BLOQUEURS_V[indice][direction]
+        )
+
+    def voisins(self, indice):
+        """
+        Produire les cases adjacentes accessibles sans tenir compte des pions.
+
+        :param indice: l'indice de la case de départ.
+        :returns: la liste des indices des cases voisines accessibles.
+        """
+        murs_h, murs_v = self.murs_h, self.murs_v
+        voisins, bloqueurs_h, bloqueurs_v = (
+            VOISINS[indice], BLOQUEURS_H[indice], BLOQUEURS_V[indice])
+        return [
+            voisins[d] for d in DIRECTIONS
+            if voisins[d] >= 0
+            and not murs_h & bloqueurs_h[d]
+            and not murs_v & bloqueurs_v[d]
+        ]
+
+    def successeurs(self, indice):
+        """
+        Produire les déplacements admissibles depuis une case, en tenant compte des
+        pions: on ne peut pas s'arrêter sur un pion, mais on peut le sauter en ligne
+        droite ou, si un mur ou un autre pion l'empêche, en diagonale.
+
+        :param indice: l'indice de la case de départ.
+        :returns: la liste des indices des cases accessibles en un coup.
+        """
+        pions = self.pions
+        résultat = []
+        for direction in DIRECTIONS:
+            if not self.ouvert(indice, direction):
+                continue
+            voisin = VOISINS[indice][direction]
+            if voisin not in pions:
+                résultat.append(voisin)
+                continue
+            saut = VOISINS[voisin][direction]
+            if self.ouvert(voisin, direction) and saut not in pions:
+                résultat.append(saut)
+                continue
+            for diagonale in self.voisins(voisin):
+                if diagonale != indice and diagonale not in pions:
+                    résultat.append(diagonale)
+        return résultat
+
+    def déplacements(self, joueur):
+        """
+        Produire les positions accessibles en un coup pour le pion d'un joueur.
+
+        :param joueur: le numéro du joueur (1 ou 2).
+        :returns: la liste des positions (x, y) admissibles.
+        """
+        return [position(i) for i in self.successeurs(self.pions[joueur - 1])]
+
+    @chronométré('distances')
+    def distances(self, joueur):
+        """
+        Calculer, par parcours en largeur inversé depuis la rangée objectif, la
+        distance de chaque case à l'objectif d'un joueur. Les pions sont ignorés.
+
+        :param joueur: le numéro du joueur (1 ou 2) dont on vise l'objectif.
+        :returns: une liste de 81 distances (None pour une case isolée).
+        """
+        distances = [None] * NB_CASES
+        file = deque(RANGÉES[joueur])
+        for indice in file:
+            distances[indice] = 0
+        while file:
+            courant = file.popleft()
+            suivante = distances[courant] + 1
+            for voisin in self.voisins(courant):
+                if distances[voisin] is None:
+                    distances[voisin] = suivante
+                    file.append(voisin)
+        return distances
+
+    @chronométré('chemin')
+    def chemin(self, joueur, départ=None):
+        """
+        Trouver un plus court chemin vers l'objectif d'un joueur, en tenant compte
+        des sauts de pions comme dans graphe.construire_graphe.
+
+        :param joueur: le numéro du joueur (1 ou 2).
+        :param départ: l'indice de la case de départ (par défaut, celle du pion).
+        :returns: la liste des indices des cases visitées après le départ, ou None
+        si l'objectif est inaccessible.
+        """
+        if départ is None:
+            départ = self.pions[joueur - 1]
+        objectif = RANGÉES[joueur]
+        if départ in objectif:
+            return []
+        parents = {départ: None}
+        file = deque([départ])
+        while file:
+            courant = file.popleft()
+            for suivant in self.successeurs(courant):
+                if suivant in parents:
+                    continue
+                parents[suivant] = courant
+                if suivant in objectif:
+                    chemin = []
+                    while suivant != départ:
+                        chemin.append(suivant)
+                        suivant = parents[suivant]
+                    return chemin[::-1]
+                file.append(suivant)
+        return None
+
+    def distance(self, joueur, départ=None):
+        """
+        Calculer la longueur d'un plus court chemin vers l'objectif d'un joueur.
+
+        :param joueur: le numéro du joueur (1 ou 2).
+        :param départ: l'indice de la case de départ (par défaut, celle du pion).
+        :returns: le nombre de coups, ou None si l'objectif est inaccessible.
+        """
+        chemin = self.chemin(joueur, départ)
+        return None if chemin is None else len(chemin)
+
+    def conflit(self, orientation, fente):
+        """
+        Déterminer si un mur chevauche ou croise un mur déjà placé.
+
+        :param orientation: l'orientation du mur ('horizontal' ou 'vertical').
+        :param fente: l'indice de la fente du mur (0 à 63).
+        :returns: True si le mur entre en conflit avec un mur existant.
+        """
+        conflits_h, conflits_v = (
+            CONFLITS_H if orientation == 'horizontal' else CONFLITS_V)[fente]
+        return bool(self.murs_h & conflits_h or self.murs_v & conflits_v)
+
+    def mur_valide(self, orientation, fente):
+        """
+        Déterminer si un mur peut être placé: il ne doit entrer en conflit avec aucun
+        mur existant et doit laisser un chemin vers l'objectif à chaque joueur.
+
+        :param orientation: l'orientation du mur ('horizontal' ou 'vertical').
+        :param fente: l'indice de la fente du mur (0 à 63).
+        :returns: True si le placement est admissible.
+        """
+        return not self.conflit(orientation, fente) and not murs.isole_un_joueur(
+            self, orientation, fente)
+
+    def ajouter_mur(self, orientation, fente):
+        """Ajouter un mur sans validation."""
+        if orientation == 'horizontal':
+            self.murs_h |= 1 << fente
+        else:
+            self.murs_v |= 1 << fente
+
+    def retirer_mur(self, orientation, fente):
+        """Retirer un mur sans validation."""
+        if orientation == 'horizontal':
+            self.murs_h &= ~(1 << fente)
+        else:
+            self.murs_v &= ~(1 << fente)
+
+    def murs_horizontaux(self):
+        """Produire la liste des positions (x, y) des murs horizontaux."""
+        return [position_horizontale(f) for f in range(NB_FENTES) if self.murs_h >> f & 1]
+
+    def murs_verticaux(self):
+        """Produire la liste des positions (x, y) des murs verticaux."""
+        return [position_verticale(f) for f in range(NB_FENTES) if self.murs_v >> f & 1]
+
+    def vers_networkx(self):
+        """
+        Exporter le damier en graphe networkX, pour la visualisation. Le graphe
+        produit est celui de graphe.construire_graphe: un noeud (x, y) par case et
+        les noeuds objectifs 'B1' et 'B2'.
+
+        :returns: le graphe orienté (en networkX) des déplacements admissibles.
+        """
+        import networkx as nx
+
+        graphe = nx.DiGraph()
+        for indice in range(NB_CASES):
+            graphe.add_node(position(indice))
+            for suivant in self.successeurs(indice):
+                graphe.add_edge(position(indice), position(suivant))
+        for joueur, objectif in OBJECTIFS.items():
+            for indice in RANGÉES[joueur]:
+                graphe.add_edge(position(indice), objectif)
+        return graphe
+
+
+def murs_bloquants(départ, arrivée):
+    """
+    Produire les murs qui bloqueraient le passage entre deux cases adjacentes.
+
+    :param départ: l'indice de la case de départ.
+    :param arrivée: l'indice de la case d'arrivée.
+    :returns: la liste des murs (orientation, fente) qui bloquent ce passage, vide
+    si les cases ne sont pas adjacentes.
+    """
+    for direction in DIRECTIONS:
+        if VOISINS[départ][direction] == arrivée:
+            return (
+                [('horizontal', f) for f in range(NB_FENTES)
+                 if BLOQUEURS_H[départ][direction] >> f & 1] +
+                [('vertical', f) for f in range(NB_FENTES)
+                 if BLOQUEURS_V[départ][direction] >> f & 1]
+            )
+    return []
+
+
+# murs dépend de ce module: il est importé une fois, après toutes les définitions
+# dont il a besoin, et isole_un_joueur est résolu à l'appel (voir Damier.mur_valide)
+import murs
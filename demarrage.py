@@ -0,0 +1,151 @@
+"""
+Banc d'essai du démarrage de main.py, contre un serveur local (voir serveur.py).
+
+Chaque scénario lance main.py dans un nouvel interpréteur et mesure le temps écoulé
+jusqu'à son aboutissement:
+
+- 'lister': main.py --lister, jusqu'à la fin du processus;
+- 'partie': main.py --automatique, jusqu'à la réception du premier coup par le
+  serveur (importations, début de la partie, affichage et choix du coup compris).
+
+Le temps retenu est le meilleur de plusieurs répétitions. Un scénario qui dépasse
+son budget fait terminer le programme avec le code 1; --detail affiche les modules
+dont l'importation par main.py coûte le plus (python -X importtime).
+
+Utilisation: python demarrage.py [--budget partie=0.6] [--detail]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser
+
+import serveur
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+IDUL = 'demarrage'
+RÉPÉTITIONS_DÉFAUT = 5
+# secondes, interpréteur compris
+BUDGETS = {'lister': 0.45, 'partie': 0.4}
+DÉLAI_MAX = 30
+
+
+def _commande(*arguments):
+    return [sys.executable, MAIN, IDUL, *arguments]
+
+
+def mesurer_lister(url):
+    """
+    Mesurer la durée de main.py --lister.
+
+    :param url: l'adresse du serveur.
+    :returns: la durée, en secondes.
+    """
+    début = time.perf_counter()
+    subprocess.run(
+        _commande('--lister', '--url', url), stdout=subprocess.DEVNULL, check=True,
+        timeout=DÉLAI_MAX)
+    return time.perf_counter() - début
+
+
+def mesurer_partie(local, dossier):
+    """
+    Mesurer le temps écoulé entre le lancement de main.py --automatique et la
+    réception de son premier coup.
+
+    :param local: le serveur local (voir serveur.démarrer).
+    :param dossier: le dossier où placer le cache de la partie.
+    :returns: la durée, en secondes.
+    """
+    reçu = threading.Event()
+    jouer = local.jouer
+
+    def jouer_signalé(*args):
+        reçu.set()
+        return jouer(*args)
+
+    local.jouer = jouer_signalé
+    début = time.perf_counter()
+    processus = subprocess.Popen(
+        _commande('--automatique', '--url', local.url,
+                  '--cache', os.path.join(dossier, 'cache.sqlite')),
+        stdout=subprocess.DEVNULL)
+    try:
+        if not reçu.wait(DÉLAI_MAX):
+            raise TimeoutError("main.py n'a joué aucun coup")
+        return time.perf_counter() - début
+    finally:
+        processus.kill()
+        processus.wait()
+        local.jouer = jouer
+
+
+def mesurer(répétitions=RÉPÉTITIONS_DÉFAUT):
+    """
+    Mesurer les scénarios contre un serveur local.
+
+    :param répétitions: le nombre de lancements de chaque scénario.
+    :returns: le dictionnaire scénario -> meilleure durée, en secondes.
+    """
+    local = serveur.démarrer()
+    # main.py est interrompu en pleine partie: ses connexions coupées sont attendues
+    local.handle_error = lambda requête, adresse: None
+    try:
+        with tempfile.TemporaryDirectory() as dossier:
+            return {
+                'lister': min(mesurer_lister(local.url) for _ in range(répétitions)),
+                'partie': min(mesurer_partie(local, dossier) for _ in range(répétitions)),
+            }
+    finally:
+        local.shutdown()
+        local.server_close()
+
+
+def importations(nombre=15):
+    """
+    Lister les importations les plus coûteuses de main.py.
+
+    :param nombre: le nombre de modules listés.
+    :returns: la liste des tuples (durée cumulée en secondes, module), de la plus
+    longue à la plus courte.
+    """
+    sortie = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=os.path.dirname(MAIN), capture_output=True, text=True, check=True).stderr
+    mesures = []
+    for ligne in sortie.splitlines()[1:]:
+        _, cumul, module = ligne.split('|')
+        mesures.append((int(cumul) / 1e6, module.rstrip()))
+    return sorted(mesures, reverse=True)[:nombre]
+
+
+def _budget(texte):
+    nom, _, valeur = texte.partition('=')
+    return nom, float(valeur)
+
+
+if __name__ == '__main__':
+    PARSER = ArgumentParser(description='Banc d\'essai du démarrage de main.py')
+    PARSER.add_argument('--repetitions', type=int, default=RÉPÉTITIONS_DÉFAUT,
+                        help='Nombre de lancements de chaque scénario.')
+    PARSER.add_argument('--budget', type=_budget, action='append', default=[],
+                        metavar='NOM=SECONDES', help='Budget propre à un scénario.')
+    PARSER.add_argument('--detail', action='store_true',
+                        help='Afficher les importations les plus coûteuses de main.py.')
+    ARGS = PARSER.parse_args()
+    BUDGETS.update(ARGS.budget)
+
+    DÉPASSEMENTS = []
+    for NOM, DURÉE in mesurer(ARGS.repetitions).items():
+        LIGNE = f'{NOM:8s} {DURÉE * 1e3:8.1f} ms  (budget {BUDGETS[NOM] * 1e3:.0f} ms)'
+        if DURÉE > BUDGETS[NOM]:
+            LIGNE += '  DÉPASSEMENT'
+            DÉPASSEMENTS.append(NOM)
+        print(LIGNE)
+    if ARGS.detail:
+        print('\nImportations de main.py (durée cumulée):')
+        for CUMUL, MODULE in importations():
+            print(f'{CUMUL * 1e3:8.1f} ms  {MODULE}')
+    sys.exit(1 if DÉPASSEMENTS else 0)
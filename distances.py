@@ -0,0 +1,247 @@
+"""
+Champs de distances à l'objectif, maintenus de façon incrémentale.
+
+Chaque champ donne, pour chaque case, la distance (sans tenir compte des pions) à la
+rangée objectif d'un joueur, c'est-à-dire au noeud 'B1' ou 'B2' de
+graphe.construire_graphe. Il est calculé une fois par parcours en largeur inversé
+depuis la rangée objectif. Lorsqu'un mur est ajouté, seules les cases qui perdent
+tous leurs plus courts chemins sont recalculées; les anciennes valeurs sont
+conservées sur une pile pour que l'annulation du mur soit immédiate.
+
+IndexChemins réunit tous les plus courts chemins d'un pion pour distinguer, parmi
+les murs qui en coupent un, ceux qui allongent vraiment sa distance.
+"""
+import heapq
+
+from damier import (
+    NB_CASES, NB_FENTES, VOISINS, BLOQUEURS_H, BLOQUEURS_V, RANGÉES, EST, NORD, murs_bloquants)
+
+INACCESSIBLE = 1 << 30
+
+
+class ChampDistances:
+    """
+    Distances de chaque case à la rangée objectif d'un joueur.
+
+    :param damier: le damier (voir damier.Damier) dont les murs sont suivis.
+    :param joueur: le numéro du joueur (1 ou 2) dont on vise l'objectif.
+    """
+
+    __slots__ = ('damier', 'joueur', 'valeurs', 'objectif')
+
+    def __init__(self, damier, joueur):
+        self.damier = damier
+        self.joueur = joueur
+        self.objectif = frozenset(RANGÉES[joueur])
+        self.valeurs = [
+            INACCESSIBLE if distance is None else distance
+            for distance in damier.distances(joueur)
+        ]
+
+    def __getitem__(self, indice):
+        distance = self.valeurs[indice]
+        return None if distance == INACCESSIBLE else distance
+
+    def distance(self):
+        """
+        Produire la distance du pion du joueur à son objectif.
+
+        :returns: le nombre de pas, ou None si l'objectif est inaccessible.
+        """
+        return self[self.damier.pions[self.joueur - 1]]
+
+    def réparer(self, orientation, fente):
+        """
+        Mettre à jour le champ après l'ajout d'un mur au damier.
+
+        Les distances ne peuvent qu'augmenter: on invalide, par distance croissante,
+        les cases qui n'ont plus de voisine valide plus près de l'objectif, puis on
+        recalcule seulement celles-là à partir de leurs voisines valides.
+
+        :param orientation: l'orientation du mur ajouté.
+        :param fente: l'indice de la fente du mur ajouté.
+        :returns: la liste des (case, ancienne distance) modifiées.
+        """
+        valeurs = self.valeurs
+        voisins = self.damier.voisins
+
+        candidats = []
+        for départ, arrivée in PASSAGES_COUPÉS[orientation][fente]:
+            for haute, basse in ((départ, arrivée), (arrivée, départ)):
+                if valeurs[haute] != INACCESSIBLE and valeurs[haute] == valeurs[basse] + 1:
+                    heapq.heappush(candidats, (valeurs[haute], haute))
+
+        invalides = set()
+        while candidats:
+            distance, indice = heapq.heappop(candidats)
+            if indice in invalides or indice in self.objectif:
+                continue
+            if any(valeurs[v] == distance - 1 and v not in invalides for v in voisins(indice)):
+                continue
+            invalides.add(indice)
+            for voisin in voisins(indice):
+                if valeurs[voisin] == distance + 1 and voisin not in invalides:
+                    heapq.heappush(candidats, (distance + 1, voisin))
+
+        if not invalides:
+            return []
+
+        modifiées = [(indice, valeurs[indice]) for indice in invalides]
+        file = []
+        for indice in invalides:
+            valeurs[indice] = INACCESSIBLE
+        for indice in invalides:
+            meilleure = min(
+                (valeurs[v] + 1 for v in voisins(indice) if v not in invalides),
+                default=INACCESSIBLE)
+            if meilleure < INACCESSIBLE:
+                heapq.heappush(file, (meilleure, indice))
+        while file:
+            distance, indice = heapq.heappop(file)
+            if distance >= valeurs[indice]:
+                continue
+            valeurs[indice] = distance
+            for voisin in voisins(indice):
+                if voisin in invalides and distance + 1 < valeurs[voisin]:
+                    heapq.heappush(file, (distance + 1, voisin))
+        return modifiées
+
+    def restaurer(self, modifiées):
+        """Rétablir les distances retournées par réparer."""
+        valeurs = self.valeurs
+        for indice, distance in modifiées:
+            valeurs[indice] = distance
+
+
+def _construire_passages_coupés():
+    # pour chaque mur, les paires de cases adjacentes qu'il sépare
+    passages = {'horizontal': [], 'vertical': []}
+    for orientation, bloqueurs in (('horizontal', BLOQUEURS_H), ('vertical', BLOQUEURS_V)):
+        for fente in range(NB_FENTES):
+            passages[orientation].append(tuple(
+                (indice, VOISINS[indice][direction])
+                for indice in range(NB_CASES) for direction in (EST, NORD)
+                if bloqueurs[indice][direction] >> fente & 1
+            ))
+    return {orientation: tuple(liste) for orientation, liste in passages.items()}
+
+
+PASSAGES_COUPÉS = _construire_passages_coupés()
+
+
+class IndexChemins:
+    """
+    Union des plus courts chemins du pion d'un joueur vers sa rangée objectif: le
+    graphe orienté acyclique des passages (case, voisine) où la distance diminue
+    de un, restreint aux cases accessibles depuis le pion.
+
+    Un mur ne peut allonger le chemin du pion que s'il coupe tous ces plus courts
+    chemins; l'index permet de le vérifier sans recalculer les distances. Il ne dit
+    pas de combien le chemin s'allonge: ce gain est mesuré par les champs de
+    distances (voir Distances.ajouter_mur).
+
+    :param champ: le champ de distances du joueur (voir ChampDistances).
+    """
+
+    __slots__ = ('niveaux', 'arêtes')
+
+    def __init__(self, champ):
+        valeurs = champ.valeurs
+        voisins = champ.damier.voisins
+        départ = champ.damier.pions[champ.joueur - 1]
+        # niveaux[k]: les passages du k-ième pas, depuis le pion
+        self.niveaux = []
+        self.arêtes = {}
+        front = [départ] if valeurs[départ] != INACCESSIBLE else []
+        while front and valeurs[front[0]]:
+            suivants = []
+            passages = []
+            for case in front:
+                for voisin in voisins(case):
+                    if valeurs[voisin] == valeurs[case] - 1:
+                        passages.append((case, voisin))
+                        if voisin not in suivants:
+                            suivants.append(voisin)
+            self.niveaux.append(passages)
+            front = suivants
+        for niveau, passages in enumerate(self.niveaux):
+            for passage in passages:
+                for mur in murs_bloquants(*passage):
+                    self.arêtes.setdefault(mur, set()).add((niveau, passage))
+
+    def allonge(self, orientation, fente):
+        """
+        Déterminer si un mur allonge le chemin du pion, c'est-à-dire s'il coupe tous
+        ses plus courts chemins (les conflits avec les murs présents sont ignorés).
+
+        :param orientation: l'orientation du mur.
+        :param fente: l'indice de la fente du mur.
+        :returns: vrai si la distance du pion à son objectif augmenterait.
+        """
+        coupés = self.arêtes.get((orientation, fente))
+        if not coupés:
+            return False
+        atteintes = None
+        for niveau, passages in enumerate(self.niveaux):
+            suivantes = set()
+            for passage in passages:
+                if (atteintes is None or passage[0] in atteintes) and \
+                        (niveau, passage) not in coupés:
+                    suivantes.add(passage[1])
+            if not suivantes:
+                return True
+            atteintes = suivantes
+        return False
+
+    def murs_allongeants(self):
+        """Les murs (orientation, fente) qui allongent le chemin du pion."""
+        return [mur for mur in self.arêtes if self.allonge(*mur)]
+
+
+class Distances:
+    """
+    Champs de distances des deux joueurs, tenus à jour lors de l'ajout et de
+    l'annulation de murs.
+
+    :param damier: le damier (voir damier.Damier) à suivre; les murs doivent lui être
+    ajoutés et retirés par l'intermédiaire de cet objet.
+    """
+
+    __slots__ = ('damier', 'champs', 'pile')
+
+    def __init__(self, damier):
+        self.damier = damier
+        self.champs = {joueur: ChampDistances(damier, joueur) for joueur in (1, 2)}
+        self.pile = []
+
+    def __getitem__(self, joueur):
+        return self.champs[joueur]
+
+    def distance(self, joueur):
+        """
+        Produire la distance du pion d'un joueur à son objectif, en temps constant.
+
+        :param joueur: le numéro du joueur (1 ou 2).
+        :returns: le nombre de pas, ou None si l'objectif est inaccessible.
+        """
+        return self.champs[joueur].distance()
+
+    def ajouter_mur(self, orientation, fente):
+        """
+        Ajouter un mur au damier, sans validation, et réparer les deux champs.
+
+        :param orientation: l'orientation du mur ('horizontal' ou 'vertical').
+        :param fente: l'indice de la fente du mur (0 à 63).
+        """
+        self.damier.ajouter_mur(orientation, fente)
+        self.pile.append((
+            orientation, fente,
+            [champ.réparer(orientation, fente) for champ in self.champs.values()]
+        ))
+
+    def annuler(self):
+        """Retirer le dernier mur ajouté par ajouter_mur et rétablir les champs."""
+        orientation, fente, modifications = self.pile.pop()
+        for champ, modifiées in zip(self.champs.values(), modifications):
+            champ.restaurer(modifiées)
+        self.damier.retirer_mur(orientation, fente)
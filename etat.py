@@ -0,0 +1,169 @@
+"""
+Représentation compacte et immuable d'un état de partie.
+
+Un EtatQuoridor conserve les cases des pions sous forme de petits entiers (voir
+damier.case), le nombre de murs restants de chaque joueur et les murs placés sous
+forme de deux masques de 64 bits. Il est hachable et ordonnable, et se convertit sans
+perte vers et depuis le dictionnaire d'état du serveur:
+
+{
+    'joueurs': [
+        {'nom': nom1, 'murs': n1, 'pos': [x1, y1]},
+        {'nom': nom2, 'murs': n2, 'pos': [x2, y2]},
+    ],
+    'murs': {
+        'horizontaux': [[x, y], ...],
+        'verticaux': [[x, y], ...],
+    }
+}
+
+Seul l'ordre des listes de murs n'est pas conservé: les murs sont énumérés par
+indice de fente croissant.
+"""
+from functools import total_ordering
+
+from damier import (
+    Damier, NB_FENTES, case, position, fente_horizontale, fente_verticale,
+    position_horizontale, position_verticale)
+
+
+@total_ordering
+class EtatQuoridor:
+    """
+    État immuable d'une partie de Quoridor.
+
+    :param noms: le tuple des noms des deux joueurs.
+    :param pions: le tuple des indices des cases des deux pions.
+    :param restants: le tuple du nombre de murs que chaque joueur peut encore placer.
+    :param murs_h: le masque des murs horizontaux (voir damier.fente_horizontale).
+    :param murs_v: le masque des murs verticaux (voir damier.fente_verticale).
+    """
+
+    __slots__ = ('noms', 'pion1', 'pion2', 'restants1', 'restants2', 'murs_h', 'murs_v')
+
+    def __init__(self, noms, pions, restants, murs_h=0, murs_v=0):
+        assigner = object.__setattr__
+        assigner(self, 'noms', tuple(noms))
+        assigner(self, 'pion1', pions[0])
+        assigner(self, 'pion2', pions[1])
+        assigner(self, 'restants1', restants[0])
+        assigner(self, 'restants2', restants[1])
+        assigner(self, 'murs_h', murs_h)
+        assigner(self, 'murs_v', murs_v)
+
+    def __setattr__(self, nom, valeur):
+        raise AttributeError("EtatQuoridor est immuable")
+
+    def __delattr__(self, nom):
+        raise AttributeError("EtatQuoridor est immuable")
+
+    def __reduce__(self):
+        return (EtatQuoridor, (self.noms, self.pions, self.restants, self.murs_h, self.murs_v))
+
+    def _clé(self):
+        return (self.pion1, self.pion2, self.restants1, self.restants2,
+                self.murs_h, self.murs_v, self.noms)
+
+    def __eq__(self, autre):
+        if not isinstance(autre, EtatQuoridor):
+            return NotImplemented
+        return self._clé() == autre._clé()
+
+    def __lt__(self, autre):
+        if not isinstance(autre, EtatQuoridor):
+            return NotImplemented
+        return self._clé() < autre._clé()
+
+    def __hash__(self):
+        return hash(self._clé())
+
+    def __repr__(self):
+        return (
+            f"EtatQuoridor(noms={self.noms!r}, pions={self.pions!r}, "
+            f"restants={self.restants!r}, murs_h={self.murs_h:#x}, murs_v={self.murs_v:#x})"
+        )
+
+    @property
+    def pions(self):
+        """Le tuple des indices des cases des deux pions."""
+        return (self.pion1, self.pion2)
+
+    @property
+    def restants(self):
+        """Le tuple du nombre de murs que chaque joueur peut encore placer."""
+        return (self.restants1, self.restants2)
+
+    @classmethod
+    def depuis_dict(cls, état):
+        """
+        Construire un état à partir du dictionnaire du serveur ou de
+        Quoridor.état_partie.
+
+        :param état: le dictionnaire d'état.
+        :returns: une instance d'EtatQuoridor.
+        """
+        murs_h = 0
+        for mur in état['murs']['horizontaux']:
+            murs_h |= 1 << fente_horizontale(tuple(mur))
+        murs_v = 0
+        for mur in état['murs']['verticaux']:
+            murs_v |= 1 << fente_verticale(tuple(mur))
+        joueurs = état['joueurs']
+        return cls(
+            (joueurs[0]['nom'], joueurs[1]['nom']),
+            (case(tuple(joueurs[0]['pos'])), case(tuple(joueurs[1]['pos']))),
+            (joueurs[0]['murs'], joueurs[1]['murs']),
+            murs_h,
+            murs_v,
+        )
+
+    def vers_dict(self):
+        """
+        Produire le dictionnaire d'état au format du serveur.
+
+        :returns: le dictionnaire d'état.
+        """
+        return {
+            'joueurs': [
+                {'nom': nom, 'murs': restants, 'pos': list(position(pion))}
+                for nom, restants, pion in zip(self.noms, self.restants, self.pions)
+            ],
+            'murs': {
+                'horizontaux': [
+                    list(position_horizontale(f)) for f in range(NB_FENTES)
+                    if self.murs_h >> f & 1],
+                'verticaux': [
+                    list(position_verticale(f)) for f in range(NB_FENTES)
+                    if self.murs_v >> f & 1],
+            },
+        }
+
+    def damier(self):
+        """
+        Produire un damier modifiable (voir damier.Damier) pour cet état.
+
+        :returns: une instance de Damier.
+        """
+        return Damier.depuis_indices(self.pions, self.murs_h, self.murs_v)
+
+    def jouer(self, joueur, coup):
+        """
+        Produire l'état qui résulte d'un coup, sans validation.
+
+        :param joueur: le numéro du joueur (1 ou 2).
+        :param coup: le tuple (type_coup, position), où type_coup est 'D', 'MH' ou 'MV'.
+        :returns: le nouvel EtatQuoridor.
+        """
+        type_coup, position_coup = coup
+        pions = list(self.pions)
+        restants = list(self.restants)
+        murs_h, murs_v = self.murs_h, self.murs_v
+        if type_coup == 'D':
+            pions[joueur - 1] = case(tuple(position_coup))
+        else:
+            restants[joueur - 1] -= 1
+            if type_coup == 'MH':
+                murs_h |= 1 << fente_horizontale(tuple(position_coup))
+            else:
+                murs_v |= 1 << fente_verticale(tuple(position_coup))
+        return EtatQuoridor(self.noms, pions, restants, murs_h, murs_v)
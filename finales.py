@@ -0,0 +1,182 @@
+"""
+Table de finales pour les courses de pions, lorsque les deux joueurs n'ont plus de
+murs à placer.
+
+Sans murs restants, la partie ne dépend plus que de la disposition des murs posés,
+des deux pions et du joueur qui a le trait. Pour une disposition donnée, les
+81 x 81 x 2 positions sont résolues d'un coup par analyse rétrograde: on part des
+positions gagnées (un pion sur sa rangée objectif) et on remonte les coups, sauts et
+pas en diagonale compris (voir damier.Damier.successeurs). Chaque position reçoit
+son issue exacte pour le joueur qui a le trait et le nombre de demi-coups avant la
+fin; le meilleur coup s'en déduit en examinant les quelques successeurs.
+
+Les tables sont construites à la demande, une par disposition de murs, et les moins
+récemment utilisées sont évincées.
+"""
+from array import array
+from collections import OrderedDict, deque
+
+from damier import Damier, NB_CASES, RANGÉES
+
+INCONNUE, GAIN, PERTE = 0, 1, 2
+CAPACITÉ_DÉFAUT = 32
+
+_NB_ÉTATS = 2 * NB_CASES * NB_CASES
+_OBJECTIFS = {joueur: frozenset(cases) for joueur, cases in RANGÉES.items()}
+
+
+def _état(pions, trait):
+    return (trait - 1) * NB_CASES * NB_CASES + pions[0] * NB_CASES + pions[1]
+
+
+class Finale:
+    """
+    Issues exactes de toutes les positions de course pour une disposition de murs.
+
+    :param murs_h: le masque des murs horizontaux (voir damier.fente_horizontale).
+    :param murs_v: le masque des murs verticaux (voir damier.fente_verticale).
+    """
+
+    __slots__ = ('damier', 'issues', 'plis')
+
+    def __init__(self, murs_h, murs_v):
+        self.damier = Damier.depuis_indices((0, 0), murs_h, murs_v)
+        self.issues = bytearray(_NB_ÉTATS)
+        self.plis = array('H', bytes(2 * _NB_ÉTATS))
+        self._résoudre()
+
+    def _successeurs(self, pions, trait):
+        # les positions atteintes par les coups du joueur qui a le trait
+        self.damier.pions = list(pions)
+        suivants = []
+        for case in self.damier.successeurs(pions[trait - 1]):
+            nouveaux = list(pions)
+            nouveaux[trait - 1] = case
+            suivants.append(_état(nouveaux, 3 - trait))
+        return suivants
+
+    def _résoudre(self):
+        issues, plis = self.issues, self.plis
+        restants = array('B', bytes(_NB_ÉTATS))
+        prédécesseurs = [[] for _ in range(_NB_ÉTATS)]
+        file = deque()
+        for trait in (1, 2):
+            for pion1 in range(NB_CASES):
+                for pion2 in range(NB_CASES):
+                    if pion1 == pion2:
+                        continue
+                    état = _état((pion1, pion2), trait)
+                    if pion1 in _OBJECTIFS[1] or pion2 in _OBJECTIFS[2]:
+                        # le joueur qui vient de jouer a gagné
+                        issues[état] = PERTE
+                        file.append(état)
+                        continue
+                    suivants = self._successeurs((pion1, pion2), trait)
+                    restants[état] = len(suivants)
+                    for suivant in suivants:
+                        prédécesseurs[suivant].append(état)
+
+        # parcours en largeur: les issues sont fixées par nombre de plis croissant
+        while file:
+            état = file.popleft()
+            for précédent in prédécesseurs[état]:
+                if issues[précédent] != INCONNUE:
+                    continue
+                if issues[état] == PERTE:
+                    issues[précédent] = GAIN
+                else:
+                    restants[précédent] -= 1
+                    if restants[précédent]:
+                        continue
+                    issues[précédent] = PERTE
+                plis[précédent] = plis[état] + 1
+                file.append(précédent)
+
+    def sonder(self, pions, trait):
+        """
+        Lire l'issue d'une position.
+
+        :param pions: les indices des cases des deux pions.
+        :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+        :returns: le tuple (issue, plis): GAIN ou PERTE pour le joueur qui a le trait
+        et le nombre de demi-coups avant la fin, ou (INCONNUE, 0) si aucun joueur ne
+        peut forcer le gain.
+        """
+        état = _état(pions, trait)
+        return self.issues[état], self.plis[état]
+
+    def meilleur_coup(self, pions, trait):
+        """
+        Choisir le coup parfait: gagner au plus vite, ou perdre au plus tard.
+
+        :param pions: les indices des cases des deux pions.
+        :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+        :returns: l'indice de la case où déplacer le pion.
+        """
+        self.damier.pions = list(pions)
+        meilleur, clé_meilleure = None, None
+        for case in self.damier.successeurs(pions[trait - 1]):
+            nouveaux = list(pions)
+            nouveaux[trait - 1] = case
+            issue, plis = self.sonder(nouveaux, 3 - trait)
+            # du point de vue du joueur qui a le trait: gain rapide, puis nulle,
+            # puis perte lente
+            if issue == PERTE:
+                clé = (2, -plis)
+            elif issue == INCONNUE:
+                clé = (1, 0)
+            else:
+                clé = (0, plis)
+            if clé_meilleure is None or clé > clé_meilleure:
+                meilleur, clé_meilleure = case, clé
+        return meilleur
+
+
+class TableFinales:
+    """
+    Tables de finales construites à la demande, par disposition de murs, avec
+    éviction des moins récemment utilisées.
+
+    :param capacité: le nombre maximal de dispositions conservées.
+    """
+
+    def __init__(self, capacité=CAPACITÉ_DÉFAUT):
+        self.capacité = capacité
+        self.finales = OrderedDict()
+
+    def finale(self, murs_h, murs_v):
+        """
+        Produire la table d'une disposition de murs, construite au besoin.
+
+        :param murs_h: le masque des murs horizontaux.
+        :param murs_v: le masque des murs verticaux.
+        :returns: une instance de Finale.
+        """
+        clé = (murs_h, murs_v)
+        finale = self.finales.get(clé)
+        if finale is None:
+            finale = self.finales[clé] = Finale(murs_h, murs_v)
+            if len(self.finales) > self.capacité:
+                self.finales.popitem(last=False)
+        else:
+            self.finales.move_to_end(clé)
+        return finale
+
+    def sonder(self, damier, trait):
+        """
+        Lire l'issue de la position d'un damier (voir Finale.sonder).
+
+        :param damier: le damier (voir damier.Damier).
+        :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+        """
+        return self.finale(damier.murs_h, damier.murs_v).sonder(damier.pions, trait)
+
+    def meilleur_coup(self, damier, trait):
+        """
+        Choisir le coup parfait du joueur qui a le trait (voir Finale.meilleur_coup).
+
+        :param damier: le damier (voir damier.Damier).
+        :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+        :returns: l'indice de la case où déplacer le pion.
+        """
+        return self.finale(damier.murs_h, damier.murs_v).meilleur_coup(damier.pions, trait)
@@ -0,0 +1,161 @@
+"""
+Hachage de Zobrist des positions de Quoridor, avec prise en compte de la symétrie.
+
+Une position et son image miroir gauche-droite (x -> 10-x) sont équivalentes: les
+distances, les coups légaux et donc la valeur de la position sont les mêmes, à la
+symétrie près. On maintient en parallèle la clé de la position et celle de son
+image miroir; la plus petite des deux est la clé canonique, commune aux deux
+positions. Les coups conservés sous une clé canonique doivent être ramenés dans le
+repère canonique (voir miroir_coup).
+
+Par symétrie, la case (x, y) devient (10-x, y), le mur horizontal (x, y) devient
+(9-x, y) et le mur vertical (x, y) devient (11-x, y).
+"""
+import random
+
+from damier import (
+    NB_CASES, NB_FENTES, case, position, fente_horizontale, fente_verticale,
+    position_horizontale, position_verticale)
+
+_ALÉA = random.Random(20200417)
+ZOBRIST_PIONS = tuple(
+    tuple(_ALÉA.getrandbits(64) for _ in range(NB_CASES)) for _ in range(2))
+ZOBRIST_MURS_H = tuple(_ALÉA.getrandbits(64) for _ in range(NB_FENTES))
+ZOBRIST_MURS_V = tuple(_ALÉA.getrandbits(64) for _ in range(NB_FENTES))
+ZOBRIST_RESTANTS = tuple(
+    tuple(_ALÉA.getrandbits(64) for _ in range(11)) for _ in range(2))
+ZOBRIST_TRAIT = _ALÉA.getrandbits(64)
+
+MIROIR_CASES = tuple(
+    case((10 - x, y)) for x, y in map(position, range(NB_CASES)))
+MIROIR_H = tuple(
+    fente_horizontale((9 - x, y)) for x, y in map(position_horizontale, range(NB_FENTES)))
+MIROIR_V = tuple(
+    fente_verticale((11 - x, y)) for x, y in map(position_verticale, range(NB_FENTES)))
+
+# clé d'un mur, selon le type de coup, dans la position et dans son image miroir
+_MURS = {'MH': ZOBRIST_MURS_H, 'MV': ZOBRIST_MURS_V}
+_MURS_MIROIR = {
+    'MH': tuple(ZOBRIST_MURS_H[MIROIR_H[f]] for f in range(NB_FENTES)),
+    'MV': tuple(ZOBRIST_MURS_V[MIROIR_V[f]] for f in range(NB_FENTES)),
+}
+_PIONS_MIROIR = tuple(
+    tuple(ZOBRIST_PIONS[i][MIROIR_CASES[c]] for c in range(NB_CASES)) for i in range(2))
+
+
+def clé_zobrist(damier, murs, trait):
+    """
+    Calculer la clé de Zobrist d'une position.
+
+    :param damier: le damier (voir damier.Damier).
+    :param murs: la liste du nombre de murs restants de chaque joueur.
+    :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+    :returns: la clé de 64 bits de la position.
+    """
+    return Hachage(damier, murs, trait).clé
+
+
+def clé_canonique(damier, murs, trait):
+    """
+    Calculer la clé de Zobrist commune à une position et à son image miroir.
+
+    :param damier: le damier (voir damier.Damier).
+    :param murs: la liste du nombre de murs restants de chaque joueur.
+    :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+    :returns: la clé canonique de 64 bits de la position.
+    """
+    return Hachage(damier, murs, trait).canonique
+
+
+def miroir_coup(coup):
+    """
+    Produire l'image miroir d'un coup au format de la recherche.
+
+    :param coup: le tuple (type_coup, indice).
+    :returns: le tuple (type_coup, indice) du coup symétrique.
+    """
+    type_coup, valeur = coup
+    if type_coup == 'D':
+        return type_coup, MIROIR_CASES[valeur]
+    if type_coup == 'MH':
+        return type_coup, MIROIR_H[valeur]
+    return type_coup, MIROIR_V[valeur]
+
+
+class Hachage:
+    """
+    Clés de Zobrist d'une position et de son image miroir, mises à jour de façon
+    incrémentale.
+
+    :param damier: le damier (voir damier.Damier).
+    :param murs: la liste du nombre de murs restants de chaque joueur.
+    :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+    """
+
+    __slots__ = ('clé', 'miroir')
+
+    def __init__(self, damier, murs, trait):
+        self.clé = self.miroir = 0
+        for i, pion in enumerate(damier.pions):
+            self.déplacer(i + 1, None, pion)
+            self.clé ^= ZOBRIST_RESTANTS[i][murs[i]]
+            self.miroir ^= ZOBRIST_RESTANTS[i][murs[i]]
+        for fente in range(NB_FENTES):
+            if damier.murs_h >> fente & 1:
+                self.basculer_mur('MH', fente)
+            if damier.murs_v >> fente & 1:
+                self.basculer_mur('MV', fente)
+        if trait == 2:
+            self.changer_trait()
+
+    @property
+    def canonique(self):
+        """La clé commune à la position et à son image miroir."""
+        return min(self.clé, self.miroir)
+
+    @property
+    def inversée(self):
+        """Vrai si la clé canonique est celle de l'image miroir."""
+        return self.miroir < self.clé
+
+    def déplacer(self, joueur, ancienne, nouvelle):
+        """
+        Mettre à jour les clés pour le déplacement d'un pion.
+
+        :param joueur: le numéro du joueur (1 ou 2).
+        :param ancienne: l'indice de la case quittée (None s'il n'y en a pas).
+        :param nouvelle: l'indice de la case atteinte.
+        """
+        i = joueur - 1
+        if ancienne is not None:
+            self.clé ^= ZOBRIST_PIONS[i][ancienne]
+            self.miroir ^= _PIONS_MIROIR[i][ancienne]
+        self.clé ^= ZOBRIST_PIONS[i][nouvelle]
+        self.miroir ^= _PIONS_MIROIR[i][nouvelle]
+
+    def basculer_mur(self, type_coup, fente):
+        """
+        Mettre à jour les clés pour l'ajout ou le retrait d'un mur.
+
+        :param type_coup: 'MH' ou 'MV'.
+        :param fente: l'indice de la fente du mur.
+        """
+        self.clé ^= _MURS[type_coup][fente]
+        self.miroir ^= _MURS_MIROIR[type_coup][fente]
+
+    def changer_restants(self, joueur, avant, après):
+        """
+        Mettre à jour les clés pour un changement du nombre de murs restants.
+
+        :param joueur: le numéro du joueur (1 ou 2).
+        :param avant: le nombre de murs restants avant le changement.
+        :param après: le nombre de murs restants après le changement.
+        """
+        bascule = ZOBRIST_RESTANTS[joueur - 1][avant] ^ ZOBRIST_RESTANTS[joueur - 1][après]
+        self.clé ^= bascule
+        self.miroir ^= bascule
+
+    def changer_trait(self):
+        """Mettre à jour les clés pour un changement de trait."""
+        self.clé ^= ZOBRIST_TRAIT
+        self.miroir ^= ZOBRIST_TRAIT
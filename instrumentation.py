@@ -0,0 +1,177 @@
+"""
+Instrumentation facultative des chemins critiques et traçage des décisions.
+
+Désactivée par défaut: les fonctions décorées par chronométré ne paient alors qu'un
+test de l'attribut actif. Une fois activée (activer), l'instrumentation tient:
+
+- des compteurs (appels de chaque fonction, noeuds de recherche, lectures et succès
+  de la table de transposition, reprises de requêtes...);
+- un histogramme des durées de chaque fonction chronométrée et de chaque requête au
+  serveur, par puissances de deux de microsecondes.
+
+À la fin de chaque décision de Quoridor.jouer_coup, une ligne JSON est écrite dans
+le fichier de trace: les caractéristiques de la recherche, puis les compteurs et le
+temps passé dans chaque fonction chronométrée depuis la décision précédente, ce qui
+comprend la requête au serveur qui l'a précédée.
+"""
+import json
+import time
+from collections import Counter
+from functools import wraps
+
+actif = False
+compteurs = Counter()
+histogrammes = {}
+
+_sortie = None
+_compteurs_décision = Counter()
+_temps_décision = Counter()
+
+
+class Histogramme:
+    """
+    Histogramme de durées, en classes de puissances de deux de microsecondes.
+    """
+
+    __slots__ = ('classes', 'nombre', 'total', 'maximum')
+
+    def __init__(self):
+        self.classes = Counter()
+        self.nombre = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def ajouter(self, durée):
+        """Ajouter une durée, en secondes."""
+        self.classes[max(0, int(durée * 1e6)).bit_length()] += 1
+        self.nombre += 1
+        self.total += durée
+        self.maximum = max(self.maximum, durée)
+
+    def centile(self, rang):
+        """
+        Estimer un centile par la borne supérieure de sa classe.
+
+        :param rang: le centile voulu, de 0 à 100.
+        :returns: la durée estimée, en secondes.
+        """
+        seuil = rang * self.nombre / 100
+        cumul = 0
+        for classe in sorted(self.classes):
+            cumul += self.classes[classe]
+            if cumul >= seuil:
+                return min((1 << classe) / 1e6, self.maximum)
+        return self.maximum
+
+    def résumé(self):
+        """Produire un dictionnaire sérialisable en JSON."""
+        return {
+            'nombre': self.nombre,
+            'total': self.total,
+            'moyenne': self.total / self.nombre if self.nombre else 0.0,
+            'p50': self.centile(50),
+            'p90': self.centile(90),
+            'p99': self.centile(99),
+            'max': self.maximum,
+            'classes_us': {str(1 << classe): n for classe, n in sorted(self.classes.items())},
+        }
+
+
+def activer(sortie=None):
+    """
+    Activer l'instrumentation.
+
+    :param sortie: le chemin du fichier JSON Lines où écrire une ligne par décision
+    (None: aucune trace, seulement les compteurs et histogrammes).
+    """
+    global actif, _sortie
+    désactiver()
+    if sortie is not None:
+        _sortie = open(sortie, 'a', encoding='utf-8')
+    actif = True
+
+
+def désactiver():
+    """Désactiver l'instrumentation et fermer le fichier de trace."""
+    global actif, _sortie
+    actif = False
+    if _sortie is not None:
+        _sortie.close()
+        _sortie = None
+
+
+def réinitialiser():
+    """Effacer les compteurs et les histogrammes."""
+    compteurs.clear()
+    histogrammes.clear()
+    _compteurs_décision.clear()
+    _temps_décision.clear()
+
+
+def compter(nom, nombre=1):
+    """Incrémenter un compteur."""
+    compteurs[nom] += nombre
+    _compteurs_décision[nom] += nombre
+
+
+def mesurer(nom, durée):
+    """Ajouter une durée, en secondes, à l'histogramme d'un nom."""
+    histogramme = histogrammes.get(nom)
+    if histogramme is None:
+        histogramme = histogrammes[nom] = Histogramme()
+    histogramme.ajouter(durée)
+    compter(nom)
+    _temps_décision[nom] += durée
+
+
+def chronométré(nom):
+    """
+    Décorateur qui compte les appels d'une fonction et chronomètre leur durée
+    lorsque l'instrumentation est active.
+
+    :param nom: le nom du compteur et de l'histogramme.
+    """
+    def décorer(fonction):
+        @wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not actif:
+                return fonction(*args, **kwargs)
+            début = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                mesurer(nom, time.perf_counter() - début)
+        return enveloppe
+    return décorer
+
+
+def décision(**champs):
+    """
+    Clore une décision: écrire sa ligne de trace, puis repartir de zéro pour les
+    compteurs et les temps de la décision suivante.
+
+    :param champs: les caractéristiques de la décision (joueur, coup, noeuds...).
+    """
+    if _sortie is not None:
+        ligne = {
+            'horodatage': time.time(),
+            **champs,
+            'compteurs': dict(_compteurs_décision),
+            'temps': dict(_temps_décision),
+        }
+        _sortie.write(json.dumps(ligne, ensure_ascii=False) + '\n')
+        _sortie.flush()
+    _compteurs_décision.clear()
+    _temps_décision.clear()
+
+
+def exporter():
+    """
+    Produire l'état de l'instrumentation.
+
+    :returns: le dictionnaire {'compteurs', 'histogrammes'}, sérialisable en JSON.
+    """
+    return {
+        'compteurs': dict(compteurs),
+        'histogrammes': {nom: h.résumé() for nom, h in histogrammes.items()},
+    }
@@ -1,6 +1,9 @@
 '''Module principal, gère la logistique du jeu quoridor'''
 from argparse import ArgumentParser
+import asyncio
 import api
+import instrumentation
+from cache import CachePersistant, CHEMIN_DÉFAUT
 
 
 def analyser_commande():
@@ -19,9 +22,97 @@ def analyser_commande():
         action="store_true"
     )
 
+    parser.add_argument(
+        '-a', '--automatique',
+        help='Jouer automatiquement contre le serveur.',
+        action="store_true"
+    )
+
+    parser.add_argument(
+        '-t', '--temps', type=float, default=2.0,
+        help='Temps alloué à chaque coup en mode automatique, en secondes.',
+    )
+
+    parser.add_argument(
+        '-r', '--reflexion',
+        help="Réfléchir pendant le temps de l'adversaire en mode automatique.",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        '-c', '--cache', default=CHEMIN_DÉFAUT,
+        help='Fichier de la table de transposition conservée entre les parties.',
+    )
+
+    parser.add_argument(
+        '-u', '--url', default=api.URL_SERVEUR,
+        help="Adresse de l'API du serveur de jeu (par exemple, celle de serveur.py).",
+    )
+
+    parser.add_argument(
+        '--trace', default=None, metavar='FICHIER',
+        help='Activer l\'instrumentation et écrire une ligne JSON par décision.',
+    )
+
+    parser.add_argument(
+        '-n', '--parties', type=int, default=0,
+        help='Jouer automatiquement N parties simultanées, sans affichage du damier.',
+    )
+
+    parser.add_argument(
+        '-j', '--travailleurs', type=int, default=None,
+        help='Nombre de processus de recherche avec --parties.',
+    )
+
+    parser.add_argument(
+        '-p', '--processus', type=int, default=1,
+        help='Nombre de processus de chaque recherche en mode automatique (lazy SMP).',
+    )
+
     return parser.parse_args()
 
 
+def jouer_automatiquement(id_partie, état, cache, temps_max, réflexion=False, processus=1):
+    '''Joue la partie contre le serveur avec Quoridor.jouer_coup, jusqu'à la fin.
+    Avec réflexion, le coup suivant est préparé pendant que le serveur répond.
+    Avec plusieurs processus, chaque recherche est faite en mode 'smp'.
+
+    '''
+    # le moteur n'est importé que pour le jeu automatique: --lister et le jeu manuel
+    # démarrent sans lui (voir demarrage.py)
+    from etat import EtatQuoridor
+    from ponderation import Pondération
+    from quoridor import Quoridor
+
+    pondération = Pondération(table=cache) if réflexion else None
+    while True:
+        partie = Quoridor(état['joueurs'], état['murs'])
+        partie.table_transposition = cache
+
+        coup = None
+        if pondération is not None:
+            coup = pondération.coup_prêt(EtatQuoridor.depuis_dict(état))
+        if coup is None:
+            options = {'mode': 'smp', 'travailleurs': processus} if processus > 1 else {}
+            coup = partie.jouer_coup(1, temps_max=temps_max, **options)
+        else:
+            partie.appliquer(1, coup)
+        type_coup, position = coup
+        print(f'Coup joué: {type_coup} {position}')
+
+        if pondération is not None:
+            pondération.démarrer(partie.état_compact())
+        try:
+            état = api.jouer_coup(id_partie, type_coup, position)
+        except StopIteration as gagnant:
+            return str(gagnant)
+        finally:
+            if pondération is not None:
+                pondération.arrêter()
+
+        afficher_damier_ascii(état)
+
+
 def afficher_damier_ascii(game_state):
     '''Décodage d'un dictionnaire de jeu en art ASCII'''
     grid = make_grid_list()
@@ -77,9 +168,18 @@ if __name__ == '__main__':
 
     IDUL_ARG = ARGS.idul
 
+    api.configurer(ARGS.url)
+    if ARGS.trace:
+        instrumentation.activer(ARGS.trace)
+
     EN_JEU = True
 
-    if not ARGS.lister:
+    if ARGS.parties:
+        from pilote import piloter, rapport
+
+        print(rapport(*asyncio.run(
+            piloter(IDUL_ARG, ARGS.parties, ARGS.travailleurs, ARGS.temps))))
+    elif not ARGS.lister:
         print('\n' + '='*40 + '\n' + ' '*14 + 'Jeu Quoridor\n' + '='*40 + '\n')
 
         try:
@@ -100,42 +200,55 @@ if __name__ == '__main__':
                 {str(err)}'''
             )
 
-        while EN_JEU:
+        if ARGS.automatique:
+            CACHE = CachePersistant(ARGS.cache)
+            # lue avant le premier coup, pour ne pas l'être sur son temps de réflexion
+            CACHE.charger()
             try:
-                TYPE_COUP = input(
-                    "Veuillez entrer le type de coup que vous voulez jouer (D, MH ou MV): "
-                )
-                assert TYPE_COUP in (
-                    'D', 'MH', 'MV'), "Le type entré est invalide"
-                STR_POS_COUP = input(
-                    """Veuillez entrer la position sous la forme "x, y": """)
-                LIST_POS_COUP = STR_POS_COUP.split(sep=",")
-                try:
-                    POS_COUP = (int(LIST_POS_COUP[0]), int(LIST_POS_COUP[1]))
-                except Exception:
-                    raise AssertionError("Le format entré est invalide")
-
-                if TYPE_COUP == 'D':
-                    assert 1 <= POS_COUP[0] <= 9 and 1 <= POS_COUP[1] <= 9, "Indice invalide"
-                else:
-                    assert 2 <= POS_COUP[0] <= 9 and 1 <= POS_COUP[1] <= 8, "Indice invalide"
-
-                ETAT = api.jouer_coup(ID_PARTIE, TYPE_COUP, POS_COUP)
-
-                afficher_damier_ascii(ETAT)
-
-            except AssertionError as err:
-                print(err)
-
-            except RuntimeError as err:
-                print(err)
-
-            except StopIteration as gagnant:
-                print(str(gagnant) + 'a gagné la partie!')
-                EN_JEU = False
-
+                print(jouer_automatiquement(
+                    ID_PARTIE, ETAT, CACHE, ARGS.temps, ARGS.reflexion,
+                    ARGS.processus) + ' a gagné la partie!')
             except KeyboardInterrupt:
                 print("\nPartie annulée par l'utilisateur\n")
-                EN_JEU = False
+            finally:
+                CACHE.fermer()
+        else:
+            while EN_JEU:
+                try:
+                    TYPE_COUP = input(
+                        "Veuillez entrer le type de coup que vous voulez jouer (D, MH ou MV): "
+                    )
+                    assert TYPE_COUP in (
+                        'D', 'MH', 'MV'), "Le type entré est invalide"
+                    STR_POS_COUP = input(
+                        """Veuillez entrer la position sous la forme "x, y": """)
+                    LIST_POS_COUP = STR_POS_COUP.split(sep=",")
+                    try:
+                        POS_COUP = (int(LIST_POS_COUP[0]), int(LIST_POS_COUP[1]))
+                    except Exception:
+                        raise AssertionError("Le format entré est invalide")
+
+                    if TYPE_COUP == 'D':
+                        assert 1 <= POS_COUP[0] <= 9 and 1 <= POS_COUP[1] <= 9, "Indice invalide"
+                    else:
+                        assert 2 <= POS_COUP[0] <= 9 and 1 <= POS_COUP[1] <= 8, "Indice invalide"
+
+                    ETAT = api.jouer_coup(ID_PARTIE, TYPE_COUP, POS_COUP)
+
+                    afficher_damier_ascii(ETAT)
+
+                except AssertionError as err:
+                    print(err)
+
+                except RuntimeError as err:
+                    print(err)
+
+                except StopIteration as gagnant:
+                    print(str(gagnant) + 'a gagné la partie!')
+                    EN_JEU = False
+
+                except KeyboardInterrupt:
+                    print("\nPartie annulée par l'utilisateur\n")
+                    EN_JEU = False
     else:
         print(api.lister_parties(IDUL_ARG))
@@ -0,0 +1,298 @@
+"""
+Recherche arborescente Monte-Carlo (UCT) pour Quoridor.
+
+L'arbre est construit dans le processus principal; les simulations (parties jouées
+au hasard, mais selon les règles, jusqu'à la fin) sont réparties par lots sur un
+ProcessPoolExecutor, créé une fois par processus et conservé d'une recherche à
+l'autre (voir exécuteur_processus). Une perte virtuelle est appliquée aux noeuds d'un
+lot pendant sa sélection pour que les simulations d'un même lot explorent des
+feuilles variées.
+
+Les positions transmises aux processus sont encodées en un tuple d'entiers
+(pion1, pion2, murs_h, murs_v, restants1, restants2, trait).
+"""
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from damier import Damier, RANGÉES, NB_FENTES
+from recherche import Recherche
+
+SIMULATIONS_DÉFAUT = 2000
+EXPLORATION = 1.4
+
+# politique des simulations
+LONGUEUR_MAX = 200
+PROBABILITÉ_MUR = 0.1
+PROBABILITÉ_GLOUTON = 0.75
+ESSAIS_MUR = 3
+
+_OBJECTIFS = {joueur: frozenset(cases) for joueur, cases in RANGÉES.items()}
+
+# exécuteur des simulations du processus et son nombre de processus (voir
+# exécuteur_processus)
+_exécuteur = None
+_travailleurs = 0
+
+
+def encoder(damier, murs, trait):
+    """
+    Encoder une position en un tuple d'entiers, compact et sérialisable.
+
+    :param damier: le damier (voir damier.Damier).
+    :param murs: la liste du nombre de murs restants de chaque joueur.
+    :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+    :returns: le tuple (pion1, pion2, murs_h, murs_v, restants1, restants2, trait).
+    """
+    return (damier.pions[0], damier.pions[1], damier.murs_h, damier.murs_v,
+            murs[0], murs[1], trait)
+
+
+def décoder(encodage):
+    """
+    Décoder une position encodée par encoder.
+
+    :param encodage: le tuple produit par encoder.
+    :returns: le tuple (damier, murs, trait).
+    """
+    pion1, pion2, murs_h, murs_v, restants1, restants2, trait = encodage
+    return Damier.depuis_indices((pion1, pion2), murs_h, murs_v), [restants1, restants2], trait
+
+
+def gagnant(damier):
+    """
+    Déterminer le gagnant d'une position.
+
+    :param damier: le damier (voir damier.Damier).
+    :returns: le numéro du joueur qui a atteint son objectif, ou None.
+    """
+    for joueur in (1, 2):
+        if damier.pions[joueur - 1] in _OBJECTIFS[joueur]:
+            return joueur
+    return None
+
+
+def simuler(encodage, graine=None):
+    """
+    Jouer une partie au hasard, selon les règles, à partir de la position encodée.
+
+    Le pion suit un plus court chemin la plupart du temps et place parfois un mur
+    au hasard. Si la partie n'est pas terminée après LONGUEUR_MAX demi-coups, le
+    joueur le plus près de son objectif est déclaré gagnant.
+
+    :param encodage: la position encodée (voir encoder).
+    :param graine: la graine du générateur aléatoire.
+    :returns: le numéro du joueur gagnant (1 ou 2).
+    """
+    aléa = random.Random(graine)
+    damier, murs, trait = décoder(encodage)
+    champs = {1: damier.distances(1), 2: damier.distances(2)}
+
+    for _ in range(LONGUEUR_MAX):
+        vainqueur = gagnant(damier)
+        if vainqueur is not None:
+            return vainqueur
+
+        if murs[trait - 1] and aléa.random() < PROBABILITÉ_MUR:
+            for _ in range(ESSAIS_MUR):
+                orientation = aléa.choice(('horizontal', 'vertical'))
+                fente = aléa.randrange(NB_FENTES)
+                if damier.mur_valide(orientation, fente):
+                    damier.ajouter_mur(orientation, fente)
+                    murs[trait - 1] -= 1
+                    champs = {1: damier.distances(1), 2: damier.distances(2)}
+                    break
+            else:
+                orientation = None
+            if orientation is not None:
+                trait = 3 - trait
+                continue
+
+        successeurs = damier.successeurs(damier.pions[trait - 1])
+        if aléa.random() < PROBABILITÉ_GLOUTON:
+            champ = champs[trait]
+            suivant = min(successeurs, key=lambda indice: champ[indice])
+        else:
+            suivant = aléa.choice(successeurs)
+        damier.pions[trait - 1] = suivant
+        trait = 3 - trait
+
+    vainqueur = gagnant(damier)
+    if vainqueur is not None:
+        return vainqueur
+    distance1 = champs[1][damier.pions[0]]
+    distance2 = champs[2][damier.pions[1]]
+    if distance1 == distance2:
+        return trait
+    return 1 if distance1 < distance2 else 2
+
+
+def exécuteur_processus(travailleurs):
+    """
+    Produire l'exécuteur des simulations du processus, créé au premier appel: ses
+    processus sont conservés d'une recherche à l'autre.
+
+    :param travailleurs: le nombre de processus. Un exécuteur d'un autre nombre de
+    processus remplace le précédent.
+    :returns: le ProcessPoolExecutor.
+    """
+    global _exécuteur, _travailleurs
+    if _exécuteur is not None and _travailleurs != travailleurs:
+        _exécuteur.shutdown()
+        _exécuteur = None
+    if _exécuteur is None:
+        _exécuteur, _travailleurs = ProcessPoolExecutor(travailleurs), travailleurs
+    return _exécuteur
+
+
+def _simuler_lot(lot):
+    return [simuler(encodage, graine) for encodage, graine in lot]
+
+
+class Noeud:
+    """
+    Noeud de l'arbre de recherche.
+
+    :param encodage: la position encodée du noeud.
+    :param coup: le coup qui a mené à ce noeud (None pour la racine).
+    :param parent: le noeud parent (None pour la racine).
+    """
+
+    __slots__ = ('encodage', 'coup', 'parent', 'enfants', 'à_explorer',
+                 'visites', 'victoires', 'vainqueur')
+
+    def __init__(self, encodage, coup=None, parent=None):
+        self.encodage = encodage
+        self.coup = coup
+        self.parent = parent
+        self.enfants = []
+        self.à_explorer = None
+        self.visites = 0
+        self.victoires = 0
+        damier, _, _ = décoder(encodage)
+        self.vainqueur = gagnant(damier)
+
+    @property
+    def joueur(self):
+        """Le numéro du joueur qui a joué le coup menant à ce noeud."""
+        return 3 - self.encodage[-1]
+
+    def uct(self, exploration):
+        """Calculer la valeur UCT du noeud."""
+        return (
+            self.victoires / self.visites +
+            exploration * math.sqrt(math.log(self.parent.visites) / self.visites)
+        )
+
+
+class MCTS:
+    """
+    Recherche arborescente Monte-Carlo. Le nombre de simulations faites par la
+    dernière recherche est conservé dans l'attribut noeuds.
+
+    :param damier: le damier de la position à analyser.
+    :param murs: la liste du nombre de murs que chaque joueur peut encore placer.
+    :param simulations: le nombre total de simulations à effectuer.
+    :param travailleurs: le nombre de processus de simulation (par défaut, le nombre
+    de coeurs). Avec un seul travailleur, les simulations sont faites sur place.
+    :param exploration: la constante d'exploration UCT.
+    :param graine: la graine du générateur aléatoire.
+    """
+
+    def __init__(self, damier, murs, simulations=SIMULATIONS_DÉFAUT, travailleurs=None,
+                 exploration=EXPLORATION, graine=None):
+        self.damier = damier
+        self.murs = list(murs)
+        self.simulations = simulations
+        self.travailleurs = travailleurs or os.cpu_count() or 1
+        self.exploration = exploration
+        self.aléa = random.Random(graine)
+        self.noeuds = 0
+
+    def meilleur_coup(self, joueur):
+        """
+        Chercher le meilleur coup du joueur spécifié: celui dont le noeud a été le
+        plus visité.
+
+        :param joueur: le numéro du joueur (1 ou 2) qui a le trait.
+        :returns: le tuple (coup, taux) où coup est au format de la recherche et taux
+        est la proportion de victoires estimée pour ce coup.
+        """
+        racine = Noeud(encoder(self.damier, self.murs, joueur))
+        taille_lot = 8 * self.travailleurs
+
+        if self.travailleurs == 1:
+            self._explorer(racine, taille_lot, _simuler_lot)
+        else:
+            exécuteur = exécuteur_processus(self.travailleurs)
+            self._explorer(racine, taille_lot, lambda lot: self._répartir(exécuteur, lot))
+        self.noeuds = racine.visites
+
+        meilleur = max(racine.enfants, key=lambda enfant: enfant.visites)
+        return meilleur.coup, meilleur.victoires / meilleur.visites
+
+    def _répartir(self, exécuteur, lot):
+        # un morceau du lot par processus, pour limiter les échanges
+        morceaux = [lot[i::self.travailleurs] for i in range(self.travailleurs)]
+        gagnants = [None] * len(lot)
+        for i, résultats in enumerate(exécuteur.map(_simuler_lot, morceaux)):
+            gagnants[i::self.travailleurs] = résultats
+        return gagnants
+
+    def _explorer(self, racine, taille_lot, simuler_lot):
+        faites = 0
+        while faites < self.simulations:
+            feuilles = []
+            à_simuler = []
+            for _ in range(min(taille_lot, self.simulations - faites)):
+                feuille = self._sélectionner(racine)
+                feuilles.append(feuille)
+                if feuille.vainqueur is None:
+                    à_simuler.append((feuille.encodage, self.aléa.getrandbits(32)))
+            gagnants = iter(simuler_lot(à_simuler))
+            for feuille in feuilles:
+                vainqueur = feuille.vainqueur
+                if vainqueur is None:
+                    vainqueur = next(gagnants)
+                self._rétropropager(feuille, vainqueur)
+            faites += len(feuilles)
+
+    def _sélectionner(self, noeud):
+        # descendre l'arbre selon UCT en appliquant une perte virtuelle, puis
+        # développer un enfant non exploré
+        while True:
+            noeud.visites += 1
+            if noeud.vainqueur is not None:
+                return noeud
+            if noeud.à_explorer is None:
+                noeud.à_explorer = self._coups(noeud.encodage)
+            if noeud.à_explorer:
+                coup = noeud.à_explorer.pop()
+                enfant = Noeud(self._jouer(noeud.encodage, coup), coup, noeud)
+                noeud.enfants.append(enfant)
+                enfant.visites += 1
+                return enfant
+            if not noeud.enfants:
+                return noeud
+            noeud = max(noeud.enfants, key=lambda enfant: enfant.uct(self.exploration))
+
+    @staticmethod
+    def _rétropropager(noeud, vainqueur):
+        while noeud is not None:
+            if noeud.parent is not None and noeud.joueur == vainqueur:
+                noeud.victoires += 1
+            noeud = noeud.parent
+
+    @staticmethod
+    def _coups(encodage):
+        damier, murs, trait = décoder(encodage)
+        # les meilleurs coups sont développés en premier
+        return Recherche(damier, murs).coups(trait)[::-1]
+
+    @staticmethod
+    def _jouer(encodage, coup):
+        damier, murs, trait = décoder(encodage)
+        recherche = Recherche(damier, murs)
+        recherche.jouer(coup, trait)
+        return encoder(damier, recherche.murs, 3 - trait)
@@ -0,0 +1,248 @@
+"""
+Validation vectorisée des placements de murs.
+
+Les 128 fentes (64 horizontales suivies de 64 verticales) sont évaluées d'un seul
+coup avec des tableaux NumPy: chevauchement, croisement, limites du damier, puis
+préservation d'un chemin vers l'objectif de chaque joueur. Seuls les murs qui
+coupent le plus court chemin actuel d'un joueur peuvent l'isoler; ceux-là sont
+vérifiés ensemble par un remplissage par diffusion vectorisé depuis les rangées
+objectifs.
+
+Pour un seul mur, isole_un_joueur applique le même principe sur des masques de bits
+de 81 bits (entiers Python), sans NumPy, en quelques microsecondes.
+
+NumPy et les tables vectorisées ne sont chargés qu'au premier appel de
+masque_murs_légaux: la validation d'un coup et la recherche s'en passent, et le
+démarrage du programme n'en paie pas le coût.
+"""
+from damier import (
+    NB_CASES, NB_FENTES, DIRECTIONS, VOISINS, BLOQUEURS_H, BLOQUEURS_V, RANGÉES, EST, NORD,
+    murs_bloquants)
+from instrumentation import chronométré
+
+NB_MURS = 2 * NB_FENTES
+
+# chargés par _charger_numpy
+np = None
+_BITS = _BLOCAGES = _SOURCES = _DESTINATIONS = _EXISTE = None
+
+
+def _bits(masque):
+    return ((np.uint64(masque) >> _BITS) & np.uint64(1)).astype(bool)
+
+
+def _construire_blocages():
+    # blocages[m, c, d]: le mur m bloque le passage de la case c dans la direction d
+    blocages = np.zeros((NB_MURS, NB_CASES, len(DIRECTIONS)), dtype=bool)
+    for indice in range(NB_CASES):
+        for direction in DIRECTIONS:
+            blocages[:NB_FENTES, indice, direction] = _bits(BLOQUEURS_H[indice][direction])
+            blocages[NB_FENTES:, indice, direction] = _bits(BLOQUEURS_V[indice][direction])
+    return blocages
+
+
+def _charger_numpy():
+    global np, _BITS, _BLOCAGES, _SOURCES, _DESTINATIONS, _EXISTE
+    import numpy as np
+
+    _BITS = np.arange(NB_FENTES, dtype=np.uint64)
+    _BLOCAGES = _construire_blocages()
+    # pour chaque direction, les cases de départ qui ont une voisine et ces voisines
+    _SOURCES = tuple(
+        np.array([c for c in range(NB_CASES) if VOISINS[c][d] >= 0]) for d in DIRECTIONS)
+    _DESTINATIONS = tuple(
+        np.array([VOISINS[c][d] for c in range(NB_CASES) if VOISINS[c][d] >= 0])
+        for d in DIRECTIONS)
+    _EXISTE = np.array(VOISINS) >= 0
+
+
+def _passages(présents):
+    return _EXISTE & ~_BLOCAGES[présents].any(axis=0)
+
+
+def _atteignables(ouverts, joueur):
+    # remplissage par diffusion depuis la rangée objectif, pour chaque ligne de
+    # `ouverts` (les passages étant symétriques, on peut remonter les arcs)
+    atteints = np.zeros((ouverts.shape[0], NB_CASES), dtype=bool)
+    atteints[:, list(RANGÉES[joueur])] = True
+    while True:
+        précédents = atteints.copy()
+        for direction in DIRECTIONS:
+            sources, destinations = _SOURCES[direction], _DESTINATIONS[direction]
+            atteints[:, sources] |= (
+                atteints[:, destinations] & ouverts[:, sources, direction])
+        if (atteints == précédents).all():
+            return atteints
+
+
+def _chemin(damier, joueur):
+    champ = damier.distances(joueur)
+    courant = damier.pions[joueur - 1]
+    while champ[courant]:
+        suivant = next(
+            voisin for voisin in damier.voisins(courant)
+            if champ[voisin] == champ[courant] - 1)
+        yield courant, suivant
+        courant = suivant
+
+
+@chronométré('murs_légaux')
+def masque_murs_légaux(damier):
+    """
+    Calculer la légalité de tous les placements de murs pour un damier.
+
+    :param damier: le damier (voir damier.Damier).
+    :returns: un tableau NumPy de 128 booléens: les 64 fentes horizontales (voir
+    damier.fente_horizontale) suivies des 64 fentes verticales.
+    """
+    if np is None:
+        _charger_numpy()
+    horizontaux = _bits(damier.murs_h).reshape(8, 8)
+    verticaux = _bits(damier.murs_v).reshape(8, 8)
+
+    # chevauchement: même fente ou fente voisine dans le sens du mur
+    conflits_h = horizontaux.copy()
+    conflits_h[:, 1:] |= horizontaux[:, :-1]
+    conflits_h[:, :-1] |= horizontaux[:, 1:]
+    conflits_v = verticaux.copy()
+    conflits_v[1:, :] |= verticaux[:-1, :]
+    conflits_v[:-1, :] |= verticaux[1:, :]
+
+    # croisement: un mur horizontal et un mur vertical de même indice se croisent
+    conflits_h |= verticaux
+    conflits_v |= horizontaux
+
+    légaux = ~np.concatenate((conflits_h.ravel(), conflits_v.ravel()))
+    présents = np.concatenate((horizontaux.ravel(), verticaux.ravel()))
+
+    # préservation des chemins: seuls les murs qui coupent un plus court chemin
+    # actuel doivent être vérifiés
+    à_vérifier = np.zeros(NB_MURS, dtype=bool)
+    for joueur in range(1, len(damier.pions) + 1):
+        for départ, arrivée in _chemin(damier, joueur):
+            for orientation, fente in murs_bloquants(départ, arrivée):
+                à_vérifier[fente if orientation == 'horizontal' else NB_FENTES + fente] = True
+    candidats = np.flatnonzero(légaux & à_vérifier)
+    if candidats.size:
+        ouverts = _passages(présents)[np.newaxis] & ~_BLOCAGES[candidats]
+        for joueur in range(1, len(damier.pions) + 1):
+            atteints = _atteignables(ouverts, joueur)
+            légaux[candidats] &= atteints[:, damier.pions[joueur - 1]]
+
+    return légaux
+
+
+# Oracle de connexité par masques de bits: bit c pour la case c. Le bit c de `est`
+# indique que le passage de c vers c + 1 est ouvert, celui de `nord`, de c vers c + 9.
+_PAS_EST = sum(1 << c for c in range(NB_CASES) if VOISINS[c][EST] >= 0)
+_PAS_NORD = sum(1 << c for c in range(NB_CASES) if VOISINS[c][NORD] >= 0)
+_RANGÉES_BITS = {joueur: sum(1 << c for c in cases) for joueur, cases in RANGÉES.items()}
+
+
+def _construire_coupures():
+    # pour chaque mur (indice du masque), les passages est et nord qu'il coupe
+    coupures = []
+    for bloqueurs in (BLOQUEURS_H, BLOQUEURS_V):
+        for fente in range(NB_FENTES):
+            coupures.append((
+                sum(1 << c for c in range(NB_CASES) if bloqueurs[c][EST] >> fente & 1),
+                sum(1 << c for c in range(NB_CASES) if bloqueurs[c][NORD] >> fente & 1),
+            ))
+    return tuple(coupures)
+
+
+_COUPURES = _construire_coupures()
+
+
+def _ouvertures(damier):
+    est, nord = _PAS_EST, _PAS_NORD
+    for décalage, masque in ((0, damier.murs_h), (NB_FENTES, damier.murs_v)):
+        while masque:
+            fente = (masque & -masque).bit_length() - 1
+            masque &= masque - 1
+            coupés_est, coupés_nord = _COUPURES[décalage + fente]
+            est &= ~coupés_est
+            nord &= ~coupés_nord
+    return est, nord
+
+
+def _voisines(cases, est, nord):
+    return ((cases & est) << 1 | (cases >> 1) & est |
+            (cases & nord) << 9 | (cases >> 9) & nord)
+
+
+def _couches(est, nord, joueur, cible):
+    # parcours en largeur depuis la rangée objectif, arrêté dès que la cible est
+    # atteinte: la liste des fronts successifs, ou None si la cible est isolée
+    atteintes = front = _RANGÉES_BITS[joueur]
+    couches = [front]
+    while not atteintes & cible:
+        front = _voisines(front, est, nord) & ~atteintes
+        if not front:
+            return None
+        atteintes |= front
+        couches.append(front)
+    return couches
+
+
+def _passages_du_chemin(couches, cible, est, nord):
+    # un plus court chemin de la cible à la rangée objectif, en passages est et nord
+    chemin_est = chemin_nord = 0
+    courante = cible
+    for couche in reversed(couches[:-1]):
+        suivante = _voisines(courante, est, nord) & couche
+        suivante &= -suivante
+        if suivante == courante << 1:
+            chemin_est |= courante
+        elif suivante == courante >> 1:
+            chemin_est |= suivante
+        elif suivante == courante << 9:
+            chemin_nord |= courante
+        else:
+            chemin_nord |= suivante
+        courante = suivante
+    return chemin_est, chemin_nord
+
+
+def isole_un_joueur(damier, orientation, fente):
+    """
+    Déterminer si l'ajout d'un mur couperait un pion de sa rangée objectif.
+
+    Un mur qui ne coupe aucun passage d'un plus court chemin actuel est accepté
+    sans autre recherche; sinon, l'accessibilité est vérifiée par un remplissage
+    sur masques de bits depuis la rangée objectif. Les conflits avec les murs
+    présents ne sont pas vérifiés (voir damier.Damier.conflit).
+
+    :param damier: le damier (voir damier.Damier).
+    :param orientation: l'orientation du mur ('horizontal' ou 'vertical').
+    :param fente: l'indice de la fente du mur.
+    :returns: vrai si un joueur n'aurait plus de chemin vers son objectif.
+    """
+    coupés_est, coupés_nord = _COUPURES[fente if orientation == 'horizontal' else NB_FENTES + fente]
+    est, nord = _ouvertures(damier)
+    for joueur, pion in enumerate(damier.pions, start=1):
+        cible = 1 << pion
+        couches = _couches(est, nord, joueur, cible)
+        if couches is None:
+            return True
+        chemin_est, chemin_nord = _passages_du_chemin(couches, cible, est, nord)
+        if not (coupés_est & chemin_est or coupés_nord & chemin_nord):
+            continue
+        if _couches(est & ~coupés_est, nord & ~coupés_nord, joueur, cible) is None:
+            return True
+    return False
+
+
+def murs_légaux(damier):
+    """
+    Énumérer les murs légaux d'un damier.
+
+    :param damier: le damier (voir damier.Damier).
+    :returns: la liste des murs (orientation, fente) légaux.
+    """
+    masque = masque_murs_légaux(damier)
+    return [
+        ('horizontal', int(indice)) if indice < NB_FENTES
+        else ('vertical', int(indice) - NB_FENTES)
+        for indice in masque.nonzero()[0]
+    ]
@@ -0,0 +1,201 @@
+"""
+Livre d'ouvertures: les coups des premières positions de la partie, calculés hors
+ligne par des recherches profondes et conservés dans un fichier binaire compact.
+
+Le fichier commence par un en-tête (signature, version, nombre d'entrées), suivi
+d'entrées de 14 octets triées par clé:
+
+    clé canonique (8 octets) | coup (2 octets) | profondeur (2 octets) | score (2 octets)
+
+La clé est la clé de Zobrist canonique de la position (voir hachage.Hachage), et le
+coup est exprimé dans le repère canonique, comme dans la table de transposition.
+Le fichier est projeté en mémoire (mmap) à l'ouverture; une consultation est une
+recherche dichotomique, sans lecture du fichier entier.
+
+Construction: python ouvertures.py [--plis 6] [--largeur 3] [--profondeur 4]
+"""
+import mmap
+import os
+import struct
+from argparse import ArgumentParser
+
+from damier import Damier
+from hachage import Hachage, miroir_coup
+from recherche import Recherche, VICTOIRE
+
+CHEMIN_DÉFAUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ouvertures.bin')
+SIGNATURE = b'QLIV'
+VERSION = 1
+EN_TÊTE = struct.Struct('<4sHI')
+ENTRÉE = struct.Struct('<QHHh')
+
+PLIS_DÉFAUT = 6
+LARGEUR_DÉFAUT = 3
+PROFONDEUR_DÉFAUT = 4
+
+_TYPES = ('D', 'MH', 'MV')
+
+
+def encoder_coup(coup):
+    """Encoder un coup au format de la recherche sur 16 bits."""
+    type_coup, valeur = coup
+    return _TYPES.index(type_coup) << 7 | valeur
+
+
+def décoder_coup(code):
+    """Décoder un coup encodé par encoder_coup."""
+    return _TYPES[code >> 7], code & 0x7F
+
+
+class LivreOuvertures:
+    """
+    Livre d'ouvertures projeté en mémoire.
+
+    :param chemin: le chemin du fichier du livre.
+    :raises ValueError: si le fichier n'est pas un livre d'ouvertures.
+    """
+
+    def __init__(self, chemin=CHEMIN_DÉFAUT):
+        with open(chemin, 'rb') as fichier:
+            self._données = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        signature, version, self.taille = EN_TÊTE.unpack_from(self._données, 0)
+        if signature != SIGNATURE or version != VERSION:
+            raise ValueError(f"{chemin} n'est pas un livre d'ouvertures")
+
+    @classmethod
+    def charger(cls, chemin=CHEMIN_DÉFAUT):
+        """Ouvrir le livre s'il existe; produire None sinon."""
+        if not os.path.exists(chemin):
+            return None
+        return cls(chemin)
+
+    def __len__(self):
+        return self.taille
+
+    def _entrée(self, rang):
+        return ENTRÉE.unpack_from(self._données, EN_TÊTE.size + rang * ENTRÉE.size)
+
+    def entrées(self, clé):
+        """
+        Lire les entrées d'une position.
+
+        :param clé: la clé canonique de la position.
+        :returns: la liste des (coup, profondeur, score), coups dans le repère
+        canonique.
+        """
+        bas, haut = 0, self.taille
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self._entrée(milieu)[0] < clé:
+                bas = milieu + 1
+            else:
+                haut = milieu
+        résultat = []
+        while bas < self.taille:
+            clé_lue, code, profondeur, score = self._entrée(bas)
+            if clé_lue != clé:
+                break
+            résultat.append((décoder_coup(code), profondeur, score))
+            bas += 1
+        return résultat
+
+    def coup(self, damier, murs, trait):
+        """
+        Chercher le coup du livre pour une position.
+
+        :param damier: le damier (voir damier.Damier).
+        :param murs: la liste du nombre de murs restants de chaque joueur.
+        :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+        :returns: le coup au format de la recherche, ou None si la position n'est pas
+        dans le livre.
+        """
+        hachage = Hachage(damier, murs, trait)
+        entrées = self.entrées(hachage.canonique)
+        if not entrées:
+            return None
+        coup, _, _ = max(entrées, key=lambda entrée: (entrée[1], entrée[2]))
+        return miroir_coup(coup) if hachage.inversée else coup
+
+    def fermer(self):
+        """Fermer la projection du fichier."""
+        self._données.close()
+
+
+def écrire_livre(chemin, entrées):
+    """
+    Écrire un livre d'ouvertures.
+
+    :param chemin: le chemin du fichier.
+    :param entrées: le dictionnaire clé canonique -> liste des (coup, profondeur,
+    score), coups au format de la recherche dans le repère canonique.
+    """
+    rangées = sorted(
+        (clé, encoder_coup(coup), profondeur, max(-32768, min(32767, score)))
+        for clé, coups in entrées.items() for coup, profondeur, score in coups)
+    with open(chemin, 'wb') as fichier:
+        fichier.write(EN_TÊTE.pack(SIGNATURE, VERSION, len(rangées)))
+        for rangée in rangées:
+            fichier.write(ENTRÉE.pack(*rangée))
+
+
+def construire_livre(plis=PLIS_DÉFAUT, largeur=LARGEUR_DÉFAUT, profondeur=PROFONDEUR_DÉFAUT,
+                     rapport=None):
+    """
+    Explorer les premiers demi-coups depuis la position initiale et chercher le
+    meilleur coup de chaque position rencontrée.
+
+    Depuis chaque position, on explore le meilleur coup et les largeur - 1 coups
+    suivants dans l'ordre de la recherche (voir recherche.Recherche.coups), pour
+    couvrir les écarts de l'adversaire. Les positions symétriques ne sont
+    cherchées qu'une fois.
+
+    :param plis: le nombre de demi-coups explorés.
+    :param largeur: le nombre de coups explorés depuis chaque position.
+    :param profondeur: la profondeur des recherches.
+    :param rapport: une fonction appelée avec le nombre de positions cherchées.
+    :returns: le dictionnaire des entrées (voir écrire_livre).
+    """
+    entrées = {}
+    table = {}
+    front = [(Damier([(5, 1), (5, 9)]), [10, 10], 1)]
+    for _ in range(plis + 1):
+        suivants = []
+        for damier, murs, trait in front:
+            hachage = Hachage(damier, murs, trait)
+            if hachage.canonique in entrées:
+                continue
+            recherche = Recherche(
+                damier, murs, profondeur=profondeur, noeuds_max=float('inf'), table=table)
+            coup, score = recherche.meilleur_coup(trait)
+            if abs(score) >= VICTOIRE - profondeur:
+                continue
+            canonique = miroir_coup(coup) if hachage.inversée else coup
+            entrées[hachage.canonique] = [(canonique, profondeur, score)]
+            if rapport is not None:
+                rapport(len(entrées))
+
+            alternatives = [c for c in recherche.coups(trait) if c != coup][:largeur - 1]
+            for suivant in [coup] + alternatives:
+                copie = Damier.depuis_indices(damier.pions, damier.murs_h, damier.murs_v)
+                exploration = Recherche(copie, murs)
+                exploration.jouer(suivant, trait)
+                suivants.append((copie, exploration.murs, 3 - trait))
+        front = suivants
+    return entrées
+
+
+if __name__ == '__main__':
+    PARSER = ArgumentParser(description="Construction du livre d'ouvertures Quoridor")
+    PARSER.add_argument('--plis', type=int, default=PLIS_DÉFAUT,
+                        help='Nombre de demi-coups explorés.')
+    PARSER.add_argument('--largeur', type=int, default=LARGEUR_DÉFAUT,
+                        help='Nombre de coups explorés par position.')
+    PARSER.add_argument('--profondeur', type=int, default=PROFONDEUR_DÉFAUT,
+                        help='Profondeur des recherches.')
+    PARSER.add_argument('--sortie', default=CHEMIN_DÉFAUT, help='Fichier du livre.')
+    ARGS = PARSER.parse_args()
+    ENTRÉES = construire_livre(
+        ARGS.plis, ARGS.largeur, ARGS.profondeur,
+        rapport=lambda n: print(f'\r{n} positions', end='', flush=True))
+    écrire_livre(ARGS.sortie, ENTRÉES)
+    print(f'\n{sum(map(len, ENTRÉES.values()))} entrées écrites dans {ARGS.sortie}')
@@ -0,0 +1,335 @@
+"""
+Recherche alpha-bêta parallèle sur plusieurs processus («lazy SMP»).
+
+Le processus principal et des processus auxiliaires cherchent tous la même position
+par approfondissement itératif (voir recherche.Recherche), en partageant une table de
+transposition placée en mémoire partagée. Les auxiliaires impairs cherchent un
+demi-coup plus profond que le principal, ce qui désynchronise les recherches: les
+entrées qu'ils écrivent dans la table raccourcissent celles des autres. Lorsque le
+principal termine, les auxiliaires sont arrêtés, et le coup retenu est celui de la
+recherche qui a complété l'itération la plus profonde.
+
+Les processus auxiliaires sont créés une fois par instance de RechercheParallèle et
+conservés d'une recherche à l'autre (voir positionner), jusqu'à fermer; le temps de
+leur création est compté dans le temps alloué à la recherche qui les démarre.
+recherche_processus fournit l'instance du processus, conservée d'un coup à l'autre.
+
+La table partagée a une taille fixe; chaque case contient deux entiers de 64 bits,
+la clé combinée par ou exclusif avec les données, puis les données. Une lecture dont
+la clé ne se vérifie pas (case remplacée, ou écrite à moitié par un autre processus)
+est simplement un échec: aucun verrou n'est nécessaire.
+
+Mesure de l'accélération: python parallele.py --travailleurs 1 2 4 8 --profondeur 4
+"""
+import ctypes
+import json
+import os
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Event, RawArray
+
+from mcts import décoder, encoder
+from ouvertures import décoder_coup, encoder_coup
+from recherche import NOEUDS_MAX_DÉFAUT, PROFONDEUR_DÉFAUT, TAILLE_TABLE_DÉFAUT, Recherche
+
+TRAVAILLEURS_MESURE = (1, 2, 4, 8)
+PROFONDEUR_MESURE = 4
+
+_AUCUN_COUP = 0xFFFF
+_DÉCALAGE_SCORE = 1 << 31
+
+# table et signal d'arrêt des processus auxiliaires (voir _initialiser)
+_table = None
+_arrêt = None
+_table_processus = None
+_recherche_processus = None
+
+
+class TablePartagée:
+    """
+    Table de transposition de taille fixe en mémoire partagée, utilisable comme le
+    dictionnaire de recherche.Recherche.
+
+    Sa longueur est son nombre de cases: passée avec taille_table=len(table), elle
+    n'est jamais vidée par la recherche, ses entrées étant remplacées au besoin.
+
+    :param entrées: le nombre de cases, arrondi à une puissance de deux.
+    """
+
+    def __init__(self, entrées=TAILLE_TABLE_DÉFAUT):
+        self.entrées = 1 << max(0, entrées - 1).bit_length()
+        self.masque = self.entrées - 1
+        self.cases = RawArray(ctypes.c_uint64, 2 * self.entrées)
+
+    def __len__(self):
+        return self.entrées
+
+    def get(self, clé, défaut=None):
+        """
+        Lire l'entrée d'une clé.
+
+        :param clé: la clé canonique de la position.
+        :param défaut: la valeur produite si la clé est absente.
+        :returns: le tuple (profondeur, score, drapeau, coup) écrit par la recherche.
+        """
+        case = 2 * (clé & self.masque)
+        données = self.cases[case + 1]
+        if self.cases[case] ^ données != clé:
+            return défaut
+        code = données >> 10 & 0xFFFF
+        return (
+            données & 0xFF,
+            (données >> 26) - _DÉCALAGE_SCORE,
+            données >> 8 & 0x3,
+            None if code == _AUCUN_COUP else décoder_coup(code),
+        )
+
+    def __setitem__(self, clé, entrée):
+        profondeur, score, drapeau, coup = entrée
+        code = _AUCUN_COUP if coup is None else encoder_coup(coup)
+        données = (
+            min(profondeur, 0xFF) | drapeau << 8 | code << 10 |
+            (score + _DÉCALAGE_SCORE) << 26
+        )
+        case = 2 * (clé & self.masque)
+        self.cases[case] = clé ^ données
+        self.cases[case + 1] = données
+
+    def clear(self):
+        """Effacer toutes les entrées."""
+        ctypes.memset(self.cases, 0, ctypes.sizeof(self.cases))
+
+
+def table_processus():
+    """Produire la table partagée du processus, créée au premier appel."""
+    global _table_processus
+    if _table_processus is None:
+        _table_processus = TablePartagée()
+    return _table_processus
+
+
+def recherche_processus(travailleurs=None):
+    """
+    Produire la recherche parallèle du processus, créée au premier appel: ses
+    processus auxiliaires sont conservés d'un coup à l'autre (voir
+    RechercheParallèle.positionner).
+
+    :param travailleurs: le nombre total de processus (par défaut, le nombre de
+    coeurs). Une recherche d'un autre nombre de processus remplace la précédente.
+    """
+    global _recherche_processus
+    travailleurs = travailleurs or os.cpu_count() or 1
+    if _recherche_processus is not None and _recherche_processus.travailleurs != travailleurs:
+        _recherche_processus.fermer()
+        _recherche_processus = None
+    if _recherche_processus is None:
+        _recherche_processus = RechercheParallèle(None, (), travailleurs=travailleurs)
+    return _recherche_processus
+
+
+def _initialiser(table, arrêt):
+    global _table, _arrêt
+    _table, _arrêt = table, arrêt
+
+
+def _prêt():
+    return os.getpid()
+
+
+def _chercher(tâche):
+    encodage, profondeur, noeuds_max, temps_max = tâche
+    damier, murs, trait = décoder(encodage)
+    recherche = Recherche(
+        damier, murs, profondeur=profondeur, noeuds_max=noeuds_max, table=_table,
+        taille_table=len(_table), temps_max=temps_max, arrêt=_arrêt)
+    coup, score = recherche.meilleur_coup(trait)
+    return (coup, score, recherche.profondeur_atteinte, recherche.noeuds,
+            recherche.sondes_table, recherche.succès_table)
+
+
+class RechercheParallèle:
+    """
+    Recherche alpha-bêta sur plusieurs processus, avec table de transposition
+    partagée. Les processus auxiliaires vivent aussi longtemps que l'instance;
+    fermer, ou la sortie d'un bloc with, les arrête.
+
+    :param damier: le damier de la position à analyser.
+    :param murs: la liste du nombre de murs que chaque joueur peut encore placer.
+    :param profondeur: la profondeur maximale du processus principal, en demi-coups.
+    :param noeuds_max: le nombre maximal de noeuds visités par chaque processus.
+    :param temps_max: le temps alloué à la recherche, en secondes (None: illimité).
+    :param travailleurs: le nombre total de processus, principal compris (par
+    défaut, le nombre de coeurs). Avec un seul travailleur, la recherche est faite
+    sur place.
+    :param table: la table partagée (par défaut, celle du processus, conservée d'une
+    recherche à l'autre).
+    """
+
+    def __init__(self, damier, murs, profondeur=PROFONDEUR_DÉFAUT,
+                 noeuds_max=NOEUDS_MAX_DÉFAUT, temps_max=None, travailleurs=None, table=None):
+        self.travailleurs = travailleurs or os.cpu_count() or 1
+        self.table = table_processus() if table is None else table
+        self._exécuteur = None
+        self._arrêt = None
+        self.positionner(damier, murs, profondeur, noeuds_max, temps_max)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def positionner(self, damier, murs, profondeur=PROFONDEUR_DÉFAUT,
+                    noeuds_max=NOEUDS_MAX_DÉFAUT, temps_max=None):
+        """
+        Préparer la recherche d'une autre position, en conservant les processus
+        auxiliaires (voir RechercheParallèle pour les paramètres).
+        """
+        self.damier = damier
+        self.murs = list(murs)
+        self.profondeur = profondeur
+        self.noeuds_max = noeuds_max
+        self.temps_max = temps_max
+        self.noeuds = 0
+        self.sondes_table = 0
+        self.succès_table = 0
+        self.profondeur_atteinte = 0
+
+    def démarrer(self):
+        """Créer les processus auxiliaires, s'ils ne sont pas déjà créés."""
+        if self._exécuteur is not None or self.travailleurs == 1:
+            return
+        self._arrêt = Event()
+        self._exécuteur = ProcessPoolExecutor(
+            self.travailleurs - 1, initializer=_initialiser,
+            initargs=(self.table, self._arrêt))
+        # chaque tâche soumise sans processus libre en crée un
+        futurs = [self._exécuteur.submit(_prêt) for _ in range(1, self.travailleurs)]
+        for futur in futurs:
+            futur.result()
+
+    def fermer(self):
+        """Arrêter les processus auxiliaires."""
+        if self._exécuteur is not None:
+            self._arrêt.set()
+            self._exécuteur.shutdown()
+            self._exécuteur = self._arrêt = None
+
+    def meilleur_coup(self, joueur):
+        """
+        Chercher le meilleur coup du joueur spécifié. Les processus auxiliaires sont
+        créés au premier appel, sur le temps alloué.
+
+        :param joueur: le numéro du joueur (1 ou 2) qui a le trait.
+        :returns: le tuple (coup, score) où coup est au format de la recherche.
+        """
+        échéance = None if self.temps_max is None else time.perf_counter() + self.temps_max
+        self.démarrer()
+
+        def restant():
+            return None if échéance is None else max(0.0, échéance - time.perf_counter())
+
+        encodage = encoder(self.damier, self.murs, joueur)
+        principale = Recherche(
+            self.damier, self.murs, profondeur=self.profondeur, noeuds_max=self.noeuds_max,
+            table=self.table, taille_table=len(self.table), temps_max=restant())
+
+        if self._exécuteur is None:
+            auxiliaires = []
+            résultat = principale.meilleur_coup(joueur)
+        else:
+            self._arrêt.clear()
+            futurs = [
+                self._exécuteur.submit(_chercher, (
+                    encodage, self.profondeur + i % 2, self.noeuds_max, restant()))
+                for i in range(1, self.travailleurs)
+            ]
+            try:
+                résultat = principale.meilleur_coup(joueur)
+            finally:
+                self._arrêt.set()
+            auxiliaires = [futur.result() for futur in futurs]
+
+        self.noeuds = principale.noeuds
+        self.sondes_table = principale.sondes_table
+        self.succès_table = principale.succès_table
+        self.profondeur_atteinte = principale.profondeur_atteinte
+        for coup, score, profondeur, noeuds, sondes, succès in auxiliaires:
+            self.noeuds += noeuds
+            self.sondes_table += sondes
+            self.succès_table += succès
+            if profondeur > self.profondeur_atteinte:
+                résultat, self.profondeur_atteinte = (coup, score), profondeur
+        return résultat
+
+
+def mesurer_accélération(positions, travailleurs=TRAVAILLEURS_MESURE,
+                         profondeur=PROFONDEUR_MESURE):
+    """
+    Mesurer le temps de recherche d'un ensemble de positions à profondeur fixe selon
+    le nombre de processus, avec une table vide au départ de chaque position. Les
+    processus auxiliaires sont créés avant les mesures: leur création n'est pas
+    comptée.
+
+    :param positions: la liste des tuples (damier, murs, trait).
+    :param travailleurs: les nombres de processus à mesurer.
+    :param profondeur: la profondeur de recherche.
+    :returns: la liste des dictionnaires {'travailleurs', 'temps', 'noeuds',
+    'accélération', 'efficacité'}, l'accélération étant relative au premier nombre
+    de processus mesuré et l'efficacité, l'accélération par processus.
+    """
+    mesures = []
+    table = TablePartagée()
+    for nombre in travailleurs:
+        temps = noeuds = 0
+        with RechercheParallèle(None, (), travailleurs=nombre, table=table) as recherche:
+            recherche.démarrer()
+            for damier, murs, trait in positions:
+                table.clear()
+                recherche.positionner(damier, murs, profondeur, float('inf'))
+                début = time.perf_counter()
+                recherche.meilleur_coup(trait)
+                temps += time.perf_counter() - début
+                noeuds += recherche.noeuds
+        mesures.append({'travailleurs': nombre, 'temps': temps, 'noeuds': noeuds})
+
+    référence = mesures[0]
+    for mesure in mesures:
+        accélération = référence['temps'] / mesure['temps']
+        mesure['accélération'] = accélération
+        mesure['efficacité'] = accélération * référence['travailleurs'] / mesure['travailleurs']
+    return mesures
+
+
+if __name__ == '__main__':
+    from banc import charger_corpus
+    from damier import Damier
+
+    PARSER = ArgumentParser(description='Accélération de la recherche parallèle Quoridor')
+    PARSER.add_argument('--travailleurs', type=int, nargs='+', default=TRAVAILLEURS_MESURE,
+                        help='Nombres de processus à mesurer.')
+    PARSER.add_argument('--profondeur', type=int, default=PROFONDEUR_MESURE,
+                        help='Profondeur de recherche.')
+    PARSER.add_argument('--positions', type=int, default=8,
+                        help='Nombre de positions du corpus du banc d\'essai.')
+    PARSER.add_argument('--json', action='store_true', help='Produire les mesures en JSON.')
+    ARGS = PARSER.parse_args()
+
+    POSITIONS = [
+        (Damier([j['pos'] for j in état['joueurs']],
+                état['murs']['horizontaux'], état['murs']['verticaux']),
+         [j['murs'] for j in état['joueurs']], 1)
+        for état in charger_corpus()[:ARGS.positions]
+    ]
+    MESURES = mesurer_accélération(POSITIONS, ARGS.travailleurs, ARGS.profondeur)
+    if ARGS.json:
+        print(json.dumps(MESURES, ensure_ascii=False, indent=2))
+    else:
+        print(f'{os.cpu_count()} coeurs, profondeur {ARGS.profondeur}, '
+              f'{len(POSITIONS)} positions')
+        print('processus     temps     noeuds  accélération  efficacité')
+        for MESURE in MESURES:
+            print(f"{MESURE['travailleurs']:9d} {MESURE['temps']:8.2f} s "
+                  f"{MESURE['noeuds']:10d} {MESURE['accélération']:12.2f}x "
+                  f"{MESURE['efficacité']:10.0%}")
@@ -0,0 +1,118 @@
+"""
+Pilote de plusieurs parties simultanées contre le serveur de jeu.
+
+Chaque partie est une tâche asyncio: les attentes réseau (voir api.ClientAsynchrone)
+se chevauchent, tandis que les recherches (voir Quoridor.jouer_coup) sont confiées à
+un ProcessPoolExecutor. Chaque processus de travail conserve sa propre table de
+transposition d'un coup à l'autre. Le pilote produit le résultat de chaque partie et
+le débit total (coups par seconde, parties par heure).
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import api
+from api import ClientAsynchrone, PartieTerminée
+from quoridor import Quoridor
+
+TEMPS_DÉFAUT = 2.0
+
+# table de transposition de chaque processus de travail, partagée par ses recherches
+_TABLE = {}
+
+
+def calculer_coup(état, temps_max=TEMPS_DÉFAUT):
+    """
+    Choisir le coup du joueur 1 dans un état reçu du serveur.
+
+    :param état: le dictionnaire d'état du serveur.
+    :param temps_max: le temps alloué à la recherche, en secondes.
+    :returns: le tuple (type_coup, position) du coup choisi.
+    """
+    partie = Quoridor(état['joueurs'], état['murs'])
+    partie.table_transposition = _TABLE
+    return partie.jouer_coup(1, temps_max=temps_max)
+
+
+async def jouer_partie(client, idul, exécuteur, temps_max=TEMPS_DÉFAUT):
+    """
+    Jouer une partie complète contre le serveur.
+
+    :param client: le ClientAsynchrone utilisé pour les requêtes.
+    :param idul: l'IDUL du joueur.
+    :param exécuteur: l'exécuteur où les coups sont calculés.
+    :param temps_max: le temps alloué à chaque coup, en secondes.
+    :returns: le dictionnaire {'id', 'gagnant', 'coups', 'durée', 'erreur'} de la partie;
+    toute erreur de la partie (serveur, calcul d'un coup...) est rapportée dans
+    'erreur' plutôt que levée.
+    """
+    boucle = asyncio.get_running_loop()
+    résultat = {'id': None, 'gagnant': None, 'coups': 0, 'durée': 0.0, 'erreur': None}
+    début = time.perf_counter()
+    try:
+        résultat['id'], état = await client.débuter_partie(idul)
+        while True:
+            type_coup, position = await boucle.run_in_executor(
+                exécuteur, calculer_coup, état, temps_max)
+            résultat['coups'] += 1
+            état = await client.jouer_coup(résultat['id'], type_coup, position)
+    except PartieTerminée as fin:
+        résultat['gagnant'] = fin.gagnant
+    except (RuntimeError, ConnectionError) as err:
+        résultat['erreur'] = str(err)
+    except Exception as err:  # une partie en erreur ne doit pas interrompre les autres
+        résultat['erreur'] = f'{type(err).__name__}: {err}'
+    résultat['durée'] = time.perf_counter() - début
+    return résultat
+
+
+async def piloter(idul, nombre, travailleurs=None, temps_max=TEMPS_DÉFAUT, client=None):
+    """
+    Jouer plusieurs parties simultanément contre le serveur.
+
+    :param idul: l'IDUL du joueur.
+    :param nombre: le nombre de parties à jouer.
+    :param travailleurs: le nombre de processus de recherche (par défaut, le nombre
+    de processeurs).
+    :param temps_max: le temps alloué à chaque coup, en secondes.
+    :param client: le ClientAsynchrone à utiliser (par défaut, un nouveau client vers
+    le serveur de api.client(), avec une connexion par partie, fermé au retour).
+    :returns: le tuple (résultats, durée totale en secondes).
+    """
+    travailleurs = travailleurs or os.cpu_count() or 1
+    propre = client is None
+    if propre:
+        client = ClientAsynchrone(api.client().url, connexions=nombre)
+    début = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(travailleurs) as exécuteur:
+            résultats = await asyncio.gather(*(
+                jouer_partie(client, idul, exécuteur, temps_max) for _ in range(nombre)))
+    finally:
+        if propre:
+            client.fermer()
+    return résultats, time.perf_counter() - début
+
+
+def rapport(résultats, durée):
+    """
+    Produire le rapport d'une série de parties.
+
+    :param résultats: les dictionnaires retournés par jouer_partie.
+    :param durée: la durée totale, en secondes.
+    :returns: le rapport, sous forme de chaîne de caractères.
+    """
+    lignes = []
+    for résultat in résultats:
+        issue = (f"gagnant: {résultat['gagnant']}" if résultat['erreur'] is None
+                 else f"erreur: {résultat['erreur']}")
+        lignes.append(
+            f"{résultat['id']}  {résultat['coups']:3d} coups  "
+            f"{résultat['durée']:7.1f} s  {issue}")
+    terminées = sum(résultat['erreur'] is None for résultat in résultats)
+    coups = sum(résultat['coups'] for résultat in résultats)
+    lignes.append(
+        f"{terminées}/{len(résultats)} parties terminées en {durée:.1f} s: "
+        f"{coups / durée:.2f} coups/s, {terminées * 3600 / durée:.1f} parties/h")
+    return '\n'.join(lignes)
@@ -0,0 +1,87 @@
+"""
+Réflexion pendant le temps de l'adversaire.
+
+Pendant que la requête api.jouer_coup est en cours (le serveur calcule sa réponse),
+un fil d'exécution cherche à l'avance notre meilleur coup après chacune des réponses
+les plus probables de l'adversaire. Les recherches remplissent la table de
+transposition partagée, et les coups trouvés sont conservés par état (voir
+etat.EtatQuoridor). Lorsque le nouvel état arrive, le coup est prêt, ou la recherche
+qui suit profite d'une table déjà remplie.
+
+Le fil principal est bloqué sur le réseau pendant la réflexion: la table n'est
+jamais modifiée par les deux fils à la fois.
+"""
+import threading
+
+from recherche import Recherche, coup_externe, PROFONDEUR_DÉFAUT, PROFONDEUR_MAX
+
+RÉPONSES_DÉFAUT = 4
+
+
+class Pondération:
+    """
+    Recherche spéculative des coups à jouer après les réponses probables de
+    l'adversaire.
+
+    :param joueur: le numéro du joueur (1 ou 2) pour qui on réfléchit.
+    :param table: la table de transposition partagée avec Quoridor.jouer_coup.
+    :param réponses: le nombre de réponses de l'adversaire examinées.
+    """
+
+    def __init__(self, joueur=1, table=None, réponses=RÉPONSES_DÉFAUT):
+        self.joueur = joueur
+        self.table = {} if table is None else table
+        self.réponses = réponses
+        self.prêts = {}
+        self._arrêt = threading.Event()
+        self._fil = None
+
+    def démarrer(self, état):
+        """
+        Commencer à réfléchir sur le temps de l'adversaire.
+
+        :param état: l'EtatQuoridor après notre coup, l'adversaire ayant le trait.
+        """
+        self.arrêter()
+        self.prêts = {}
+        self._arrêt.clear()
+        self._fil = threading.Thread(target=self._réfléchir, args=(état,), daemon=True)
+        self._fil.start()
+
+    def arrêter(self):
+        """Interrompre la réflexion et attendre la fin du fil."""
+        if self._fil is not None:
+            self._arrêt.set()
+            self._fil.join()
+            self._fil = None
+
+    def coup_prêt(self, état, profondeur_min=PROFONDEUR_DÉFAUT):
+        """
+        Produire le coup trouvé pendant la réflexion pour un état, s'il y a lieu.
+
+        :param état: l'EtatQuoridor reçu du serveur, où nous avons le trait.
+        :param profondeur_min: la profondeur minimale de la recherche qui a trouvé le
+        coup pour qu'il soit joué tel quel.
+        :returns: le tuple (type_coup, position) du coup, ou None.
+        """
+        prêt = self.prêts.get(état)
+        if prêt is None or prêt[1] < profondeur_min:
+            return None
+        return prêt[0]
+
+    def _réfléchir(self, état):
+        adversaire = 3 - self.joueur
+        réponses = Recherche(
+            état.damier(), état.restants).coups(adversaire)[:self.réponses]
+        suivants = [état.jouer(adversaire, coup_externe(coup)) for coup in réponses]
+
+        # approfondir toutes les réponses ensemble, la plus probable en premier
+        for profondeur in range(1, PROFONDEUR_MAX + 1):
+            for suivant in suivants:
+                recherche = Recherche(
+                    suivant.damier(), suivant.restants, profondeur=profondeur,
+                    noeuds_max=float('inf'), table=self.table, arrêt=self._arrêt)
+                coup, _ = recherche.meilleur_coup(self.joueur)
+                if self._arrêt.is_set():
+                    return
+                self.prêts[suivant] = (coup_externe(coup), recherche.profondeur_atteinte)
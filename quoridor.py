@@ -1,6 +1,26 @@
+import time
 from collections.abc import Iterable
-import networkx as nx
-from graphe import construire_graphe
+from copy import deepcopy
+import instrumentation
+from instrumentation import chronométré
+from damier import (
+    Damier, fente_horizontale, fente_verticale, mur_horizontal_valide, mur_vertical_valide)
+from recherche import (
+    Recherche, coup_externe, PROFONDEUR_DÉFAUT, PROFONDEUR_MAX, NOEUDS_MAX_DÉFAUT)
+from mcts import MCTS, SIMULATIONS_DÉFAUT
+from coups import coups_légaux
+from murs import isole_un_joueur
+from etat import EtatQuoridor
+from finales import TableFinales
+from ouvertures import LivreOuvertures
+
+MODES = ('alphabeta', 'mcts', 'smp')
+CLÉS_MURS = {'MH': 'horizontaux', 'MV': 'verticaux'}
+
+# tables de finales partagées par toutes les parties
+FINALES = TableFinales()
+# livre d'ouvertures projeté en mémoire, s'il a été construit (voir ouvertures.py)
+LIVRE = LivreOuvertures.charger()
 
 
 
@@ -37,6 +57,7 @@ class Quoridor:
         if not isinstance(joueurs, Iterable):
             raise QuoridorError(
                 "L'argument 'joueurs' doit être un itérable")
+        joueurs = list(joueurs)
         if len(joueurs) > 2:
             raise QuoridorError("Seulement 2 joueurs peuvent être spécifiés")
 
@@ -45,27 +66,29 @@ class Quoridor:
         for i in range(len(joueurs)):
             if isinstance(joueurs[i], str):
                 liste_joueurs.append(
-                    {'nom': joueurs[i], 'murs': 10, 'position': 'adapt'})
+                    {'nom': joueurs[i], 'murs': 10, 'pos': 'adapt'})
             else:
-                liste_joueurs.append(joueurs[i])
+                liste_joueurs.append(deepcopy(joueurs[i]))
 
         bas_occ = False
 
         for i in range(len(liste_joueurs)):
-            if liste_joueurs[i]['position'] == (5, 1):
+            if liste_joueurs[i]['pos'] != 'adapt':
+                liste_joueurs[i]['pos'] = tuple(liste_joueurs[i]['pos'])
+            if liste_joueurs[i]['pos'] == (5, 1):
                 bas_occ = True
 
         for i in range(len(liste_joueurs)):
-            if liste_joueurs[i]['position'] == 'adapt':
+            if liste_joueurs[i]['pos'] == 'adapt':
                 if not bas_occ:
-                    liste_joueurs[i]['position'] = (5, 1)
+                    liste_joueurs[i]['pos'] = (5, 1)
                     bas_occ = True
                 else:
-                    liste_joueurs[i]['position'] = (5, 9)
+                    liste_joueurs[i]['pos'] = (5, 9)
 
             valid_range = [_ for _ in range(1, 10)]
             valid_pairs = [(x, y) for x in valid_range for y in valid_range]
-            if not liste_joueurs[i]['position'] in valid_pairs:
+            if not liste_joueurs[i]['pos'] in valid_pairs:
                 raise QuoridorError(f"Position du joueur {i + 1} invalide")
             if not 0 <= liste_joueurs[i]['murs'] <= 10:
                 raise QuoridorError(
@@ -74,15 +97,14 @@ class Quoridor:
         self.joueurs = liste_joueurs
 
         # Murs
-        
+
         if murs is None:
             murs = {'horizontaux': [], 'verticaux': []}
 
-
-        if not isinstance(murs, dict): 
+        if not isinstance(murs, dict):
             raise QuoridorError(
                 "L'argument :murs: doit être un dictionnaire")
-        
+
         murs_tot = 0
         for i in self.joueurs:
             murs_tot += i['murs']
@@ -90,14 +112,23 @@ class Quoridor:
         if murs_tot != 20:
             raise QuoridorError("Le total des murs doit être de 20")
 
-        for i in len(murs['horizontaux']):
-            if not (1 <= murs['horizontaux'][i][0] <= 8 and 2 <= murs['horizontaux'][i][1] <= 9):
+        for i in range(len(murs['horizontaux'])):
+            if not mur_horizontal_valide(murs['horizontaux'][i]):
                 raise QuoridorError(f"La coordonnée du mur horizontal {i + 1} est erronée")
-        for i in len(murs['verticaux']):
-            if not (2 <= murs['verticaux'][i][0] <= 9 and 1 <= murs['verticaux'][i][1] <= 8):
+        for i in range(len(murs['verticaux'])):
+            if not mur_vertical_valide(murs['verticaux'][i]):
                 raise QuoridorError(f"La coordonnée du mur vertical {i + 1} est erronée")
 
-        self.murs = murs
+        self.murs = {
+            'horizontaux': [tuple(mur) for mur in murs['horizontaux']],
+            'verticaux': [tuple(mur) for mur in murs['verticaux']],
+        }
+
+        self.table_transposition = {}
+        self.livre = LIVRE
+        self.profondeur_atteinte = 0
+        self.noeuds_visités = 0
+        self.historique = []
 
     def __str__(self):
         """
@@ -153,6 +184,7 @@ class Quoridor:
 
         return tot
 
+    @chronométré('déplacer_jeton')
     def déplacer_jeton(self, joueur, position):
         """
         Pour le joueur spécifié, déplacer son jeton à la position spécifiée.
@@ -163,35 +195,42 @@ class Quoridor:
         :raises QuoridorError: la position est invalide (en dehors du damier).
         :raises QuoridorError: la position est invalide pour l'état actuel du jeu.
         """
-        état = self.état_partie()
-
-        # Temporaire pour enlever les erreurs ---
-        Anpos = []
-        # ---------------------------------------
-
-        self.joueur = joueur
-        self.position = position
-        Anpos1 = état['joueur'][0]['pos']
-        Anpos2 = état['joueur'][1]['pos']
-
-        if joueur == 1:
-            état['joueurs'][0]['pos'] = position
-        if joueur == 2:
-            état['joueurs'][0]['pos'] = position
-        if joueur != 1 or 2:
+        if joueur not in (1, 2):
             raise QuoridorError(f"Aucun joueur n'est associé à {joueur}")
-        if position[0] < 1 or position[0] > 9:
-            raise QuoridorError('Les dimensions souhaitées sont incorrectes')
-        if position[1] < 1 or position[1] > 9:
+        position = tuple(position)
+        if not (1 <= position[0] <= 9 and 1 <= position[1] <= 9):
             raise QuoridorError('Les dimensions souhaitées sont incorrectes')
-        if Anpos[0] - position[0] != 1 or -1:
-            raise QuoridorError('Le déplacement souhaité est impossible')
-        if Anpos[1] - position[1] != 1 or -1:
+        if ('D', position) not in coups_légaux(self.état_compact(), joueur, murs=False):
             raise QuoridorError('Le déplacement souhaité est impossible')
 
-        #  TODO: Error quand jeton 2 est à proximité de jeton 1
-        
+        self.appliquer(joueur, ('D', position))
 
+    def damier(self):
+        """
+        Produire le damier compact correspondant à l'état actuel de la partie.
+
+        :returns: une instance de Damier.
+        """
+        return Damier(
+            [joueur['pos'] for joueur in self.joueurs],
+            self.murs['horizontaux'],
+            self.murs['verticaux']
+        )
+
+    def état_compact(self):
+        """
+        Produire l'état actuel de la partie sous forme compacte, immuable et hachable.
+
+        :returns: une instance d'EtatQuoridor (voir etat.EtatQuoridor).
+        """
+        damier = self.damier()
+        return EtatQuoridor(
+            [joueur['nom'] for joueur in self.joueurs],
+            damier.pions,
+            [joueur['murs'] for joueur in self.joueurs],
+            damier.murs_h,
+            damier.murs_v,
+        )
 
     def état_partie(self):
         """
@@ -221,111 +260,139 @@ class Quoridor:
         mur vertical se situe entre les colonnes x-1 et x, et bloque les lignes x et x+1.
         """
 
-        return {}
+        return deepcopy({'joueurs': self.joueurs, 'murs': self.murs})
 
-    def jouer_coup(self, joueur):
+    def jouer_coup(self, joueur, profondeur=None, noeuds_max=NOEUDS_MAX_DÉFAUT, temps_max=None,
+                   mode='alphabeta', simulations=SIMULATIONS_DÉFAUT, travailleurs=None):
         """
         Pour le joueur spécifié, jouer automatiquement son meilleur coup pour l'état actuel
         de la partie. Ce coup est soit le déplacement de son jeton, soit le placement d'un
         mur horizontal ou vertical.
 
+        En mode 'alphabeta', le coup est choisi par une recherche alpha-bêta à
+        approfondissement itératif (voir recherche.Recherche) dont la table de
+        transposition est conservée d'un coup à l'autre. La profondeur atteinte est
+        conservée dans l'attribut profondeur_atteinte. En mode 'mcts', le coup est
+        choisi par une recherche Monte-Carlo (voir mcts.MCTS). En mode 'smp', la
+        recherche alpha-bêta est répartie sur plusieurs processus qui partagent une
+        table de transposition en mémoire partagée (voir parallele.RechercheParallèle);
+        la table et les processus sont conservés d'un coup à l'autre. Lorsque les deux joueurs
+        n'ont plus de murs, dans tous les modes, le coup parfait est lu dans une table
+        de finales (voir finales.TableFinales), sans recherche, si elle en propose un;
+        dans les premières positions, le coup est lu dans le livre d'ouvertures de
+        l'attribut livre (voir ouvertures.LivreOuvertures; None pour s'en passer). Le
+        nombre de noeuds visités (de simulations, en mode 'mcts') est conservé dans
+        l'attribut noeuds_visités.
+
         :param joueur: un entier spécifiant le numéro du joueur (1 ou 2).
+        :param profondeur: la profondeur maximale de la recherche, en demi-coups. Par
+        défaut, PROFONDEUR_DÉFAUT sans limite de temps, et PROFONDEUR_MAX sinon.
+        :param noeuds_max: le nombre maximal de noeuds que la recherche peut visiter.
+        :param temps_max: le temps alloué au choix du coup, en secondes. La recherche
+        s'arrête à l'échéance et joue le meilleur coup trouvé jusque-là.
+        :param mode: le moteur de décision, 'alphabeta', 'mcts' ou 'smp'.
+        :param simulations: le nombre de simulations en mode 'mcts'.
+        :param travailleurs: le nombre de processus de simulation en mode 'mcts', ou de
+        recherche en mode 'smp' (par défaut, le nombre de coeurs).
+        :returns: le tuple (type_coup, position) du coup joué, où type_coup est 'D',
+        'MH' ou 'MV'.
         :raises QuoridorError: le numéro du joueur est autre que 1 ou 2.
         :raises QuoridorError: la partie est déjà terminée.
+        :raises QuoridorError: le mode est inconnu.
         """
-        if self.partie_terminée:
+        if self.partie_terminée():
             raise QuoridorError("La partie est terminée")
-        if not 1 <= joueur <=2:
+        if joueur not in (1, 2):
             raise QuoridorError("Le numéro du joueur spécifié est invalide")
-
-        état = self.état_partie()
-
-        graphe = construire_graphe(
-        [joueur['pos'] for joueur in état['joueurs']],
-        état['murs']['horizontaux'],
-        état['murs']['verticaux']
-        )
-
-        pos_soi = état['joueurs'][joueur - 1]['position']
-        pos_adversaire = état['joueurs'][joueur - 1]['position']
-
-        delta = (
-            nx.shortest_path_length(graphe, (pos_adversaire), 'B2') -
-            nx.shortest_path_length(graphe, (pos_soi), 'B1')
-        )
-
-        coup = 'mur' if delta < 0 else 'bouge'
-
-        if coup == 'mur':
-            position_prochaine = nx.shortest_path(
-                graphe, (pos_adversaire), 'B2')[0]
-            if pos_adversaire[1] - position_prochaine[1] != 0:  # Si bouge verticalement
-                orientation = 'horizontal'
-                position_mur = pos_adversaire
-            else:  # Si bouge horizontalement
-                orientation = 'vertical'
-                if pos_adversaire[0] - position_prochaine[0] <= 0:  # Si bouge vers la droite
-                    position_mur = (
-                        position_prochaine[0], position_prochaine[1] - 1)
-                else:  # Si bouge vers la gauche
-                    position_mur = (
-                        position_prochaine[0] - 1, position_prochaine[1] - 1)
-
-            invalide = False
-
-            if orientation == 'horizontal':
-                for mur in état['murs']['horizontaux']:
-                    if mur[1] == position_mur[1]:
-                        if -1 < mur[0] - position_mur[0] < 1:  # Si les murs se chevauchent
-                            invalide = True
-
-                for mur in état['murs']['verticaux']:
-                    if position_mur == (mur[0] + 1, mur[1] - 1):
-                        invalide = True
-
-                if not (1 <= position_mur[0] <= 8 and 2 <= position_mur[1] <= 9):
-                    invalide = True
-
-            else:
-                for mur in état['murs']['verticaux']:
-                    if mur[0] == position_mur[0]:
-                        if -1 < mur[1] - position_mur[1] < 1:  # Si les murs se chevauchent
-                            invalide = True
-
-                for mur in état['murs']['horizontaux']:
-                    if position_mur == (mur[0] - 1, mur[1] + 1):
-                        invalide = True
-
-                if not (2 <= position_mur[0] <= 9 and 1 <= position_mur[1] <= 8):
-                    invalide = True
-
-            if orientation == 'vertical':
-                nouveau_graphe = construire_graphe(
-                    [joueur['pos'] for joueur in état['joueurs']],
-                    état['murs']['horizontaux'],
-                    état['murs']['verticaux'] + [position_mur]
+        if mode not in MODES:
+            raise QuoridorError(f"Le mode doit être parmi {MODES}")
+
+        début = time.perf_counter() if instrumentation.actif else None
+        murs = [j['murs'] for j in self.joueurs]
+
+        coup = None
+        if not any(murs):
+            # course de pions: le coup parfait est lu dans la table de finales, à moins
+            # qu'elle n'en ait aucun à proposer
+            case = FINALES.meilleur_coup(self.damier(), joueur)
+            if case is not None:
+                coup, mode = ('D', case), 'finales'
+        elif self.livre is not None:
+            coup = self.livre.coup(self.damier(), murs, joueur)
+            if coup is not None:
+                mode = 'livre'
+
+        if coup is not None:
+            recherche = None
+            self.noeuds_visités = 0
+        elif mode == 'mcts':
+            recherche = None
+            mcts = MCTS(
+                self.damier(), murs, simulations=simulations, travailleurs=travailleurs)
+            coup, _ = mcts.meilleur_coup(joueur)
+            self.noeuds_visités = mcts.noeuds
+        else:
+            if profondeur is None:
+                profondeur = PROFONDEUR_DÉFAUT if temps_max is None else PROFONDEUR_MAX
+
+            if mode == 'smp':
+                # importé à l'usage: multiprocessing alourdit le démarrage
+                from parallele import recherche_processus
+
+                # processus auxiliaires conservés d'un coup à l'autre
+                recherche = recherche_processus(travailleurs)
+                recherche.positionner(
+                    self.damier(),
+                    murs,
+                    profondeur=profondeur,
+                    noeuds_max=noeuds_max,
+                    temps_max=temps_max,
                 )
-
             else:
-                nouveau_graphe = construire_graphe(
-                    [joueur['pos'] for joueur in état['joueurs']],
-                    état['murs']['horizontaux'] + [position_mur],
-                    état['murs']['verticaux']
+                recherche = Recherche(
+                    self.damier(),
+                    murs,
+                    profondeur=profondeur,
+                    noeuds_max=noeuds_max,
+                    table=self.table_transposition,
+                    temps_max=temps_max,
                 )
-
-            if not nx.has_path(nouveau_graphe, (pos_adversaire), 'B2'):
-                invalide = True
-
-            if invalide:
-                coup = 'bouge'
-        
-        if coup == 'mur':
-            self.placer_mur(1, position_mur, orientation)
-
+            coup, _ = recherche.meilleur_coup(joueur)
+            self.profondeur_atteinte = recherche.profondeur_atteinte
+            self.noeuds_visités = recherche.noeuds
+
+        coup = self._jouer_externe(joueur, coup_externe(coup))
+        if début is not None:
+            self._tracer(joueur, mode, coup, recherche, time.perf_counter() - début)
+        return coup
+
+    def _tracer(self, joueur, mode, coup, recherche, durée):
+        # voir instrumentation.décision
+        champs = {'joueur': joueur, 'mode': mode, 'coup': [coup[0], list(coup[1])],
+                  'durée': durée, 'noeuds': self.noeuds_visités}
+        instrumentation.compter('noeuds', self.noeuds_visités)
+        if recherche is not None:
+            champs.update(
+                profondeur=recherche.profondeur_atteinte,
+                sondes_table=recherche.sondes_table,
+                succès_table=recherche.succès_table,
+                taux_succès_table=(
+                    recherche.succès_table / recherche.sondes_table
+                    if recherche.sondes_table else 0.0))
+            instrumentation.compter('sondes_table', recherche.sondes_table)
+            instrumentation.compter('succès_table', recherche.succès_table)
+        instrumentation.mesurer('jouer_coup', durée)
+        instrumentation.décision(**champs)
+
+    def _jouer_externe(self, joueur, coup):
+        type_coup, position = coup
+        if type_coup == 'D':
+            self.déplacer_jeton(joueur, position)
+        elif type_coup == 'MH':
+            self.placer_mur(joueur, position, 'horizontal')
         else:
-            self.déplacer_jeton(1, nx.shortest_path(graphe, (pos_soi), 'B1')[0])
-
-        
+            self.placer_mur(joueur, position, 'vertical')
+        return coup
 
     def partie_terminée(self):
         """
@@ -333,15 +400,13 @@ class Quoridor:
 
         :returns: le nom du gagnant si la partie est terminée; False autrement.
         """
-        état = self.état_partie()
-
-        if état['joueur'][0]['pos'][1] == 9:
-            return état['joueur'][0]
-        if état['joueur'][1]['pos'][1] == 1:
-            return état['joueur'][0]
-        else:
-            return False
+        if self.joueurs[0]['pos'][1] == 9:
+            return self.joueurs[0]['nom']
+        if self.joueurs[1]['pos'][1] == 1:
+            return self.joueurs[1]['nom']
+        return False
 
+    @chronométré('placer_mur')
     def placer_mur(self, joueur: int, position: tuple, orientation: str):
         """
         Pour le joueur spécifié, placer un mur à la position spécifiée.
@@ -354,57 +419,73 @@ class Quoridor:
         :raises QuoridorError: la position est invalide pour cette orientation.
         :raises QuoridorError: le joueur a déjà placé tous ses murs.
         """
-        
-        état = self.état_partie()
-
-        if joueur == 1:
-            # Si l'orientation est horizontale
-            if orientation == 'horizontal':
-                # on traite l'erreure en premier
-                for i in état['murs']['horizontaux']:
-                    if tuple(i) == position:
-                        raise QuoridorError('un mur occupe déja cette position')
-                état['murs'][0].append(list(position))
-            # si la boucle est verticale
-            if orientation == 'vertical':
-                # on traite l'erreur en premier
-                for i in état['murs']['verticaux']:
-                    if tuple(i) == position:
-                        raise QuoridorError('un mur occupe déja cette position')
-                état['murs'][1].append(list(position))
-        if joueur == 2:
-            if orientation == 'horizontal':
-                # on traite l'erreure en premier
-                for i in état['murs']['horizontaux']:
-                    if tuple(i) == position:
-                        raise QuoridorError('un mur occupe déja cette position')
-                état['murs'][0].append(list(position))
-            # si la boucle est verticale
-            if orientation == 'vertical':
-                # on traite l'erreur en premier
-                for i in état['murs']['verticaux']:
-                    if tuple(i) == position:
-                        raise QuoridorError('un mur occupe déja cette position')
-                état['murs'][1].append(list(position))
-        #erreure si le joueur n'est pas 1 ou 2
-        if joueur != 1 or 2:
+        if joueur not in (1, 2):
             raise QuoridorError('le numéro du joueur est autre que 1 ou 2')
-        #erreur pour les murs
+        if self.joueurs[joueur - 1]['murs'] == 0:
+            raise QuoridorError('le joueur a déjà placé tous ses murs.')
+
+        position = tuple(position)
         if orientation == 'horizontal':
-            if position[0] < 1 or position[0] >= 8:
-                raise QuoridorError
-            if position[1] < 1 or position[1] > 9:
+            if not mur_horizontal_valide(position):
                 raise QuoridorError('la position est invalide pour cette orientation.')
-
-        if orientation == 'vertical':
-            if position[0] < 1 or position[0] > 9: 
-                raise QuoridorError
-            if position[1] < 1 or position[1] >= 8:
+            fente = fente_horizontale(position)
+            type_coup = 'MH'
+        elif orientation == 'vertical':
+            if not mur_vertical_valide(position):
                 raise QuoridorError('la position est invalide pour cette orientation.')
+            fente = fente_verticale(position)
+            type_coup = 'MV'
+        else:
+            raise QuoridorError("l'orientation doit être 'horizontal' ou 'vertical'")
+
+        damier = self.damier()
+        if damier.conflit(orientation, fente):
+            raise QuoridorError('un mur occupe déja cette position')
+        if isole_un_joueur(damier, orientation, fente):
+            raise QuoridorError('la position est invalide pour cette orientation.')
+
+        self.appliquer(joueur, (type_coup, position))
+
+    def appliquer(self, joueur, coup):
+        """
+        Appliquer un coup en place, sans validation ni copie de l'état, et l'empiler
+        dans l'historique de la partie pour qu'il puisse être annulé (voir annuler).
+        Les coups validés par déplacer_jeton et placer_mur passent par cette méthode;
+        un appelant ne doit l'utiliser directement que pour un coup qu'il sait légal.
+        Les moteurs de recherche, eux, jouent sur le damier compact (voir
+        recherche.Recherche.jouer).
+
+        :param joueur: le numéro du joueur (1 ou 2).
+        :param coup: le tuple (type_coup, position), où type_coup est 'D', 'MH' ou 'MV'.
+        """
+        type_coup, position = coup
+        position = tuple(position)
+        if type_coup == 'D':
+            self.historique.append((joueur, type_coup, self.joueurs[joueur - 1]['pos']))
+            self.joueurs[joueur - 1]['pos'] = position
+        else:
+            self.murs[CLÉS_MURS[type_coup]].append(position)
+            self.joueurs[joueur - 1]['murs'] -= 1
+            self.historique.append((joueur, type_coup, position))
+
+    def annuler(self):
+        """
+        Annuler le dernier coup de l'historique de la partie, qu'il ait été joué par
+        déplacer_jeton, placer_mur ou appliquer.
+
+        :returns: le tuple (joueur, type_coup) du coup annulé.
+        :raises QuoridorError: l'historique est vide.
+        """
+        if not self.historique:
+            raise QuoridorError("Aucun coup à annuler")
+        joueur, type_coup, position = self.historique.pop()
+        if type_coup == 'D':
+            self.joueurs[joueur - 1]['pos'] = position
+        else:
+            self.murs[CLÉS_MURS[type_coup]].pop()
+            self.joueurs[joueur - 1]['murs'] += 1
+        return joueur, type_coup
+
 
-        if (état['joueur'][i]['murs'] for i in range(2)) == 0:
-            raise QuoridorError('le joueur a déjà placé tous ses murs.')
-        
-# Toto
 class QuoridorError(Exception):
-    pass
\ No newline at end of file
+    pass
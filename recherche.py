@@ -0,0 +1,368 @@
+"""
+Moteur de recherche alpha-bêta (negamax) pour Quoridor.
+
+La recherche travaille directement sur un damier compact (voir damier.Damier) qu'elle
+modifie en place, coup par coup, puis restaure. Les distances à l'objectif sont
+maintenues de façon incrémentale (voir distances.Distances), de sorte que
+l'évaluation d'une position se fait en temps constant. Les positions déjà évaluées
+sont conservées dans une table de transposition indexée par la clé de Zobrist
+canonique (voir hachage.Hachage), commune à une position et à son image miroir.
+
+Un coup est un tuple (type_coup, valeur) où type_coup est 'D', 'MH' ou 'MV', comme
+pour api.jouer_coup, et où valeur est l'indice de la case ou de la fente visée.
+"""
+import time
+
+from damier import RANGÉES, position, position_horizontale, position_verticale
+from distances import Distances, IndexChemins
+from hachage import Hachage, miroir_coup
+from murs import murs_légaux
+
+VICTOIRE = 100000
+INFINI = 10 * VICTOIRE
+
+# drapeaux des entrées de la table de transposition
+EXACTE, BORNE_INF, BORNE_SUP = range(3)
+
+PROFONDEUR_DÉFAUT = 3
+PROFONDEUR_MAX = 64
+NOEUDS_MAX_DÉFAUT = 200000
+TAILLE_TABLE_DÉFAUT = 1 << 20
+TAILLE_ALLONGEANTS = 1 << 16
+
+# pondération de l'évaluation
+POIDS_DISTANCE = 100
+POIDS_MURS = 15
+
+ORIENTATIONS = {'MH': 'horizontal', 'MV': 'vertical'}
+
+_OBJECTIFS = {joueur: frozenset(cases) for joueur, cases in RANGÉES.items()}
+
+
+def coup_externe(coup):
+    """
+    Convertir un coup de la recherche en coup transmissible au serveur.
+
+    :param coup: le tuple (type_coup, indice).
+    :returns: le tuple (type_coup, position) où position est un tuple (x, y).
+    """
+    type_coup, valeur = coup
+    if type_coup == 'D':
+        return type_coup, position(valeur)
+    if type_coup == 'MH':
+        return type_coup, position_horizontale(valeur)
+    return type_coup, position_verticale(valeur)
+
+
+class BudgetÉpuisé(Exception):
+    """Levée lorsque la recherche dépasse son budget de noeuds ou de temps."""
+
+
+class Recherche:
+    """
+    Recherche alpha-bêta par approfondissement itératif, avec table de transposition.
+
+    :param damier: le damier de la position à analyser; il est modifié pendant la
+    recherche puis restauré, et ne doit pas être modifié par ailleurs.
+    :param murs: la liste du nombre de murs que chaque joueur peut encore placer.
+    :param profondeur: la profondeur maximale de recherche, en demi-coups.
+    :param noeuds_max: le nombre maximal de noeuds visités par recherche.
+    :param table: une table de transposition à réutiliser d'un coup à l'autre.
+    :param taille_table: le nombre d'entrées au-delà duquel la table est vidée.
+    :param temps_max: le temps alloué à la recherche, en secondes (None: illimité).
+    :param murs_complets: si vrai, tous les murs légaux (voir murs.murs_légaux) sont
+    considérés, et non seulement ceux qui coupent le chemin de l'adversaire.
+    :param arrêt: un threading.Event qui, une fois levé, interrompt la recherche
+    comme l'épuisement de son budget.
+    """
+
+    def __init__(self, damier, murs, profondeur=PROFONDEUR_DÉFAUT,
+                 noeuds_max=NOEUDS_MAX_DÉFAUT, table=None,
+                 taille_table=TAILLE_TABLE_DÉFAUT, temps_max=None, murs_complets=False,
+                 arrêt=None):
+        self.damier = damier
+        self.distances = Distances(damier)
+        self.murs = list(murs)
+        self.profondeur = profondeur
+        self.noeuds_max = noeuds_max
+        self.table = {} if table is None else table
+        self.taille_table = taille_table
+        self.temps_max = temps_max
+        self.arrêt = arrêt
+        self.murs_complets = murs_complets
+        self.échéance = None
+        self.noeuds = 0
+        self.sondes_table = 0
+        self.succès_table = 0
+        self.hachage = None
+        self.profondeur_atteinte = 0
+        # murs allongeants par (murs_h, murs_v, pion, joueur): l'index des plus courts
+        # chemins ne change qu'avec les murs ou le pion visé
+        self.allongeants = {}
+
+    def meilleur_coup(self, joueur):
+        """
+        Chercher le meilleur coup du joueur spécifié, en approfondissant d'un
+        demi-coup à la fois jusqu'à la profondeur maximale.
+
+        Lorsque le budget de noeuds ou de temps est épuisé, la recherche s'arrête et
+        le meilleur coup de la dernière itération est retourné; celui de l'itération
+        interrompue est préféré si au moins un coup de la racine y a été évalué, ce
+        coup étant toujours le meilleur de l'itération précédente.
+
+        :param joueur: le numéro du joueur (1 ou 2) qui a le trait.
+        :returns: le tuple (coup, score) où coup est au format de la recherche.
+        """
+        self.noeuds = 0
+        self.profondeur_atteinte = 0
+        if self.temps_max is not None:
+            self.échéance = time.perf_counter() + self.temps_max
+        self.hachage = Hachage(self.damier, self.murs, joueur)
+        if len(self.table) > self.taille_table:
+            self.table.clear()
+
+        résultat = None
+        for profondeur in range(1, self.profondeur + 1):
+            coup, score, complète = self._racine(joueur, profondeur)
+            if complète or score > -INFINI or résultat is None:
+                résultat = (coup, score)
+            if not complète:
+                break
+            self.profondeur_atteinte = profondeur
+            if abs(score) > VICTOIRE - 1000:
+                break
+        return résultat
+
+    def _racine(self, joueur, profondeur):
+        entrée = self.table.get(self.hachage.canonique)
+        coups = self.coups(joueur, self._coup_lu(entrée[3]) if entrée else None)
+        meilleur_coup, meilleur = coups[0], -INFINI
+        alpha = -INFINI
+        for coup in coups:
+            annulation = self.jouer(coup, joueur)
+            try:
+                score = -self._negamax(profondeur - 1, -INFINI, -alpha, 3 - joueur, 1)
+            except BudgetÉpuisé:
+                return meilleur_coup, meilleur, False
+            finally:
+                self.déjouer(coup, joueur, annulation)
+            if score > meilleur:
+                meilleur_coup, meilleur = coup, score
+                alpha = max(alpha, score)
+        self._mémoriser(profondeur, meilleur, EXACTE, meilleur_coup, 0)
+        return meilleur_coup, meilleur, True
+
+    def _negamax(self, profondeur, alpha, beta, trait, ply):
+        self.noeuds += 1
+        if self.noeuds > self.noeuds_max:
+            raise BudgetÉpuisé
+        if self.échéance is not None and time.perf_counter() > self.échéance:
+            raise BudgetÉpuisé
+        if self.arrêt is not None and self.arrêt.is_set():
+            raise BudgetÉpuisé
+        adversaire = 3 - trait
+        if self.damier.pions[adversaire - 1] in _OBJECTIFS[adversaire]:
+            return -VICTOIRE + ply
+
+        coup_table = None
+        self.sondes_table += 1
+        entrée = self.table.get(self.hachage.canonique)
+        if entrée is not None:
+            self.succès_table += 1
+            profondeur_table, score, drapeau, coup_table = entrée
+            coup_table = self._coup_lu(coup_table)
+            if profondeur_table >= profondeur:
+                score = _score_lu(score, ply)
+                if drapeau == EXACTE:
+                    return score
+                if drapeau == BORNE_INF:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        if profondeur <= 0:
+            return self.évaluer(trait)
+
+        alpha_initial = alpha
+        meilleur, meilleur_coup = -INFINI, None
+        for coup in self.coups(trait, coup_table):
+            annulation = self.jouer(coup, trait)
+            try:
+                score = -self._negamax(profondeur - 1, -beta, -alpha, adversaire, ply + 1)
+            finally:
+                self.déjouer(coup, trait, annulation)
+            if score > meilleur:
+                meilleur, meilleur_coup = score, coup
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if meilleur <= alpha_initial:
+            drapeau = BORNE_SUP
+        elif meilleur >= beta:
+            drapeau = BORNE_INF
+        else:
+            drapeau = EXACTE
+        self._mémoriser(profondeur, meilleur, drapeau, meilleur_coup, ply)
+        return meilleur
+
+    def _mémoriser(self, profondeur, score, drapeau, coup, ply):
+        self.table[self.hachage.canonique] = (
+            profondeur, _score_écrit(score, ply), drapeau, self._coup_lu(coup))
+
+    def _coup_lu(self, coup):
+        # les coups de la table sont conservés dans le repère de la clé canonique;
+        # la conversion est sa propre inverse
+        if coup is not None and self.hachage.inversée:
+            return miroir_coup(coup)
+        return coup
+
+    def évaluer(self, trait):
+        """
+        Évaluer la position du point de vue du joueur qui a le trait: différence
+        des distances à l'objectif, puis différence des murs restants.
+
+        :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+        :returns: le score de la position.
+        """
+        adversaire = 3 - trait
+        distance_soi = self.distances.distance(trait)
+        distance_adversaire = self.distances.distance(adversaire)
+        return (
+            POIDS_DISTANCE * (distance_adversaire - distance_soi) +
+            POIDS_MURS * (self.murs[trait - 1] - self.murs[adversaire - 1])
+        )
+
+    def coups(self, trait, coup_table=None):
+        """
+        Générer les coups légaux du joueur, ordonnés selon le gain de distance qu'ils
+        procurent (le coup de la table de transposition en premier).
+
+        Sauf si murs_complets est vrai, seuls les murs qui allongent le chemin de
+        l'adversaire sont considérés, c'est-à-dire ceux qui coupent tous ses plus
+        courts chemins (voir distances.IndexChemins); l'index est conservé pour
+        chaque disposition des murs et position du pion adverse. Le gain exact de
+        chaque mur est mesuré par les champs de distances.
+
+        :param trait: le numéro du joueur (1 ou 2) qui a le trait.
+        :param coup_table: le meilleur coup connu pour cette position, s'il y a lieu.
+        :returns: la liste des coups.
+        """
+        damier = self.damier
+        adversaire = 3 - trait
+        pion_soi = damier.pions[trait - 1]
+        pion_adversaire = damier.pions[adversaire - 1]
+        champ_soi = self.distances[trait]
+        champ_adversaire = self.distances[adversaire]
+        distance_soi = champ_soi[pion_soi]
+        distance_adversaire = champ_adversaire[pion_adversaire]
+
+        candidats = []
+        for suivant in damier.successeurs(pion_soi):
+            candidats.append((distance_soi - champ_soi[suivant], 1, ('D', suivant)))
+
+        if self.murs[trait - 1] > 0:
+            if self.murs_complets:
+                murs = murs_légaux(damier)
+            else:
+                clé = (damier.murs_h, damier.murs_v, pion_adversaire, adversaire)
+                murs = self.allongeants.get(clé)
+                if murs is None:
+                    if len(self.allongeants) >= TAILLE_ALLONGEANTS:
+                        self.allongeants.clear()
+                    murs = self.allongeants[clé] = (
+                        IndexChemins(champ_adversaire).murs_allongeants())
+            for orientation, fente in murs:
+                if damier.conflit(orientation, fente):
+                    continue
+                self.distances.ajouter_mur(orientation, fente)
+                nouvelle_adversaire = champ_adversaire[pion_adversaire]
+                nouvelle_soi = champ_soi[pion_soi]
+                self.distances.annuler()
+                if nouvelle_adversaire is None or nouvelle_soi is None:
+                    continue
+                gain = (
+                    (nouvelle_adversaire - distance_adversaire) -
+                    (nouvelle_soi - distance_soi)
+                )
+                type_coup = 'MH' if orientation == 'horizontal' else 'MV'
+                candidats.append((gain, 0, (type_coup, fente)))
+
+        candidats.sort(key=lambda candidat: (candidat[0], candidat[1]), reverse=True)
+        coups = [coup for _, _, coup in candidats]
+        if coup_table in coups:
+            coups.remove(coup_table)
+            coups.insert(0, coup_table)
+        return coups
+
+    def jouer(self, coup, joueur):
+        """
+        Appliquer un coup sur le damier, sans validation.
+
+        :param coup: le coup au format de la recherche.
+        :param joueur: le numéro du joueur (1 ou 2) qui joue le coup.
+        :returns: l'information nécessaire pour annuler le coup.
+        """
+        type_coup, valeur = coup
+        i = joueur - 1
+        hachage = self.hachage
+        if hachage is not None:
+            hachage.changer_trait()
+        if type_coup == 'D':
+            ancienne = self.damier.pions[i]
+            self.damier.pions[i] = valeur
+            if hachage is not None:
+                hachage.déplacer(joueur, ancienne, valeur)
+            return ancienne
+        self.distances.ajouter_mur(ORIENTATIONS[type_coup], valeur)
+        restants = self.murs[i]
+        self.murs[i] = restants - 1
+        if hachage is not None:
+            hachage.changer_restants(joueur, restants, restants - 1)
+            hachage.basculer_mur(type_coup, valeur)
+        return None
+
+    def déjouer(self, coup, joueur, annulation):
+        """
+        Annuler un coup appliqué par jouer.
+
+        :param coup: le coup au format de la recherche.
+        :param joueur: le numéro du joueur (1 ou 2) qui a joué le coup.
+        :param annulation: la valeur retournée par jouer.
+        """
+        type_coup, valeur = coup
+        i = joueur - 1
+        hachage = self.hachage
+        if hachage is not None:
+            hachage.changer_trait()
+        if type_coup == 'D':
+            self.damier.pions[i] = annulation
+            if hachage is not None:
+                hachage.déplacer(joueur, valeur, annulation)
+            return
+        self.distances.annuler()
+        restants = self.murs[i]
+        self.murs[i] = restants + 1
+        if hachage is not None:
+            hachage.changer_restants(joueur, restants, restants + 1)
+            hachage.basculer_mur(type_coup, valeur)
+
+
+def _score_écrit(score, ply):
+    # les scores de victoire sont conservés relativement au noeud courant
+    if score > VICTOIRE - 1000:
+        return score + ply
+    if score < -VICTOIRE + 1000:
+        return score - ply
+    return score
+
+
+def _score_lu(score, ply):
+    if score > VICTOIRE - 1000:
+        return score - ply
+    if score < -VICTOIRE + 1000:
+        return score + ply
+    return score
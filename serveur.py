@@ -0,0 +1,202 @@
+"""
+Serveur de jeu local, substitut du serveur python.gel.ulaval.ca pour les essais hors
+ligne et les tests de charge.
+
+Il expose les points d'accès lister/, débuter/ et jouer/ de l'API avec les mêmes
+réponses JSON ('parties', 'id', 'état', 'message', 'gagnant'). Les coups sont validés
+par Quoridor; le serveur joue le joueur 2 selon l'adversaire choisi:
+
+- 'chemin': avance le long d'un plus court chemin (presque gratuit, pour la charge);
+- 'alphabeta': Quoridor.jouer_coup à la profondeur donnée;
+- 'mcts': Quoridor.jouer_coup en mode 'mcts', dans le processus du serveur.
+
+Utilisation: python serveur.py [--port 8000] [--adversaire chemin] [--profondeur 1]
+puis, par exemple, python main.py IDUL -a --url http://127.0.0.1:8000/
+"""
+import json
+import threading
+import uuid
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from damier import position
+from quoridor import Quoridor, QuoridorError
+
+ADVERSAIRES = ('chemin', 'alphabeta', 'mcts')
+PORT_DÉFAUT = 8000
+NOM_ADVERSAIRE = 'serveur'
+PARTIES_LISTÉES = 20
+
+
+def jouer_adversaire(partie, adversaire='chemin', profondeur=1):
+    """
+    Jouer le coup du joueur 2.
+
+    :param partie: la partie (voir quoridor.Quoridor), le joueur 2 ayant le trait.
+    :param adversaire: la stratégie du joueur 2 (voir ADVERSAIRES).
+    :param profondeur: la profondeur de recherche de l'adversaire 'alphabeta'.
+    """
+    if adversaire == 'chemin':
+        chemin = partie.damier().chemin(2)
+        partie.déplacer_jeton(2, position(chemin[0]))
+    elif adversaire == 'alphabeta':
+        partie.jouer_coup(2, profondeur=profondeur)
+    else:
+        partie.jouer_coup(2, mode='mcts', travailleurs=1)
+
+
+class Serveur(ThreadingHTTPServer):
+    """
+    Serveur HTTP des parties en cours.
+
+    :param adresse: le tuple (hôte, port) d'écoute.
+    :param adversaire: la stratégie du joueur 2 (voir ADVERSAIRES).
+    :param profondeur: la profondeur de recherche de l'adversaire 'alphabeta'.
+    """
+
+    daemon_threads = True
+    # file d'attente des connexions: celle de socketserver (5) fait attendre d'une
+    # seconde la reprise des connexions simultanées au-delà (voir charge.py)
+    request_queue_size = 128
+
+    def __init__(self, adresse, adversaire='chemin', profondeur=1):
+        if adversaire not in ADVERSAIRES:
+            raise ValueError(f"L'adversaire doit être parmi {ADVERSAIRES}.")
+        super().__init__(adresse, Requête)
+        self.adversaire = adversaire
+        self.profondeur = profondeur
+        self.parties = {}
+        self.verrous = {}
+        self.iduls = {}
+        self._verrou = threading.Lock()
+
+    @property
+    def url(self):
+        """L'adresse de base de l'API, à passer à api.ClientAsynchrone."""
+        hôte, port = self.server_address[:2]
+        return f'http://{hôte}:{port}/'
+
+    def lister(self, idul):
+        """Produire les dernières parties d'un IDUL."""
+        with self._verrou:
+            identifiants = [i for i, auteur in self.iduls.items() if auteur == idul]
+        return {'parties': [
+            {'id': i, 'état': self.parties[i].état_partie()}
+            for i in identifiants[-PARTIES_LISTÉES:]
+        ]}
+
+    def débuter(self, idul):
+        """Entamer une partie pour un IDUL."""
+        partie = Quoridor([idul, NOM_ADVERSAIRE])
+        identifiant = str(uuid.uuid4())
+        with self._verrou:
+            self.parties[identifiant] = partie
+            self.verrous[identifiant] = threading.Lock()
+            self.iduls[identifiant] = idul
+        return {'id': identifiant, 'état': partie.état_partie()}
+
+    def jouer(self, identifiant, type_coup, position_coup):
+        """Jouer le coup du joueur 1, puis celui du serveur."""
+        partie = self.parties.get(identifiant)
+        if partie is None:
+            return {'message': "Cette partie n'existe pas."}
+        with self.verrous[identifiant]:
+            if partie.partie_terminée():
+                return {'message': 'Cette partie est terminée.'}
+            try:
+                if type_coup == 'D':
+                    partie.déplacer_jeton(1, position_coup)
+                elif type_coup in ('MH', 'MV'):
+                    orientation = 'horizontal' if type_coup == 'MH' else 'vertical'
+                    partie.placer_mur(1, position_coup, orientation)
+                else:
+                    return {'message': f'Type de coup invalide: {type_coup}.'}
+            except QuoridorError as err:
+                return {'message': str(err)}
+            gagnant = partie.partie_terminée()
+            if not gagnant:
+                jouer_adversaire(partie, self.adversaire, self.profondeur)
+                gagnant = partie.partie_terminée()
+            if gagnant:
+                return {'gagnant': gagnant}
+            return {'état': partie.état_partie()}
+
+
+class Requête(BaseHTTPRequestHandler):
+    """Traitement d'une requête adressée au Serveur."""
+
+    protocol_version = 'HTTP/1.1'  # connexions persistantes
+    disable_nagle_algorithm = True  # l'en-tête et le corps sont écrits séparément
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        """Point d'accès lister/."""
+        url = urlsplit(self.path)
+        if self._point(url.path) != 'lister':
+            return self._répondre(404, {'message': 'Point d\'accès inconnu.'})
+        paramètres = parse_qs(url.query)
+        return self._répondre(200, self.server.lister(paramètres.get('idul', [''])[0]))
+
+    def do_POST(self):
+        """Points d'accès débuter/ et jouer/."""
+        longueur = int(self.headers.get('Content-Length', 0))
+        paramètres = parse_qs(self.rfile.read(longueur).decode())
+        point = self._point(urlsplit(self.path).path)
+        if point == 'débuter':
+            return self._répondre(200, self.server.débuter(paramètres.get('idul', [''])[0]))
+        if point == 'jouer':
+            try:
+                position_coup = tuple(int(v) for v in paramètres['pos'])
+                réponse = self.server.jouer(
+                    paramètres['id'][0], paramètres['type'][0], position_coup)
+            except (KeyError, ValueError):
+                réponse = {'message': 'Requête invalide.'}
+            return self._répondre(200, réponse)
+        return self._répondre(404, {'message': 'Point d\'accès inconnu.'})
+
+    @staticmethod
+    def _point(chemin):
+        return unquote(chemin).strip('/').rsplit('/', 1)[-1]
+
+    def _répondre(self, code, données):
+        corps = json.dumps(données).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+
+def démarrer(hôte='127.0.0.1', port=0, adversaire='chemin', profondeur=1):
+    """
+    Démarrer un serveur local dans un fil d'exécution.
+
+    :param hôte: l'adresse d'écoute.
+    :param port: le port d'écoute (0 pour un port libre).
+    :param adversaire: la stratégie du joueur 2 (voir ADVERSAIRES).
+    :param profondeur: la profondeur de recherche de l'adversaire 'alphabeta'.
+    :returns: le Serveur; serveur.shutdown() l'arrête.
+    """
+    serveur = Serveur((hôte, port), adversaire, profondeur)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+
+if __name__ == '__main__':
+    PARSER = ArgumentParser(description='Serveur Quoridor local')
+    PARSER.add_argument('--hote', default='127.0.0.1', help="Adresse d'écoute.")
+    PARSER.add_argument('--port', type=int, default=PORT_DÉFAUT, help="Port d'écoute.")
+    PARSER.add_argument('--adversaire', choices=ADVERSAIRES, default='chemin',
+                        help='Stratégie du joueur 2.')
+    PARSER.add_argument('--profondeur', type=int, default=1,
+                        help="Profondeur de recherche de l'adversaire alphabeta.")
+    ARGS = PARSER.parse_args()
+    SERVEUR = Serveur((ARGS.hote, ARGS.port), ARGS.adversaire, ARGS.profondeur)
+    print(f'Serveur Quoridor à l\'écoute sur {SERVEUR.url}')
+    try:
+        SERVEUR.serve_forever()
+    except KeyboardInterrupt:
+        SERVEUR.server_close()
@@ -0,0 +1,52 @@
+"""
+Configuration commune des tests: les modules du jeu sont à la racine du dépôt.
+
+Les damiers aléatoires des tests sont produits par damier_aléatoire et mur_libre, à
+partir d'un générateur aléatoire initialisé par le test.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from damier import NB_CASES, NB_FENTES, Damier
+
+ORIENTATIONS = ('horizontal', 'vertical')
+MURS = tuple((orientation, fente) for orientation in ORIENTATIONS for fente in range(NB_FENTES))
+
+
+def damier_aléatoire(hasard, murs=0, pions=None):
+    """
+    Produire un damier aléatoire.
+
+    :param hasard: le générateur aléatoire (random.Random).
+    :param murs: le nombre de murs valides à placer au plus.
+    :param pions: les indices des cases des deux pions (par défaut, deux cases
+    distinctes tirées au hasard).
+    :returns: une instance de Damier.
+    """
+    if pions is None:
+        pions = hasard.sample(range(NB_CASES), 2)
+    damier = Damier.depuis_indices(pions, 0, 0)
+    candidats = list(MURS)
+    hasard.shuffle(candidats)
+    placés = 0
+    for mur in candidats:
+        if placés == murs:
+            break
+        if damier.mur_valide(*mur):
+            damier.ajouter_mur(*mur)
+            placés += 1
+    return damier
+
+
+def mur_libre(hasard, damier):
+    """
+    Tirer un mur sans conflit avec ceux du damier, qu'il isole un joueur ou non.
+
+    :param hasard: le générateur aléatoire (random.Random).
+    :param damier: le damier (voir damier.Damier).
+    :returns: le tuple (orientation, fente), ou None s'il n'y en a aucun.
+    """
+    libres = [mur for mur in MURS if not damier.conflit(*mur)]
+    return hasard.choice(libres) if libres else None
@@ -0,0 +1,55 @@
+"""Tests du client asynchrone du serveur de jeu (api.ClientAsynchrone)."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import serveur
+from api import ClientAsynchrone
+
+LATENCE = 0.2
+
+
+class ServeurLent(serveur.Serveur):
+    """Serveur local dont le point d'accès lister/ répond après LATENCE secondes."""
+
+    def lister(self, idul):
+        time.sleep(LATENCE)
+        return super().lister(idul)
+
+
+@pytest.fixture
+def serveur_lent():
+    local = ServeurLent(('127.0.0.1', 0))
+    threading.Thread(target=local.serve_forever, daemon=True).start()
+    yield local
+    local.shutdown()
+    local.server_close()
+
+
+async def _lister_ensemble(url, nombre):
+    async with ClientAsynchrone(url, connexions=nombre) as client:
+        début = time.perf_counter()
+        résultats = await asyncio.gather(*(
+            client.lister_parties(f'idul{i}') for i in range(nombre)))
+        return résultats, time.perf_counter() - début
+
+
+@pytest.mark.parametrize('nombre', [4, 16, 48])
+def test_requêtes_simultanées_en_une_latence(serveur_lent, nombre):
+    résultats, durée = asyncio.run(_lister_ensemble(serveur_lent.url, nombre))
+    assert résultats == [[]] * nombre
+    # toutes les requêtes sont en vol en même temps: environ une latence du serveur,
+    # et non nombre / taille de l'exécuteur par défaut latences (5 sur un coeur, soit
+    # près de 10 latences pour 48 requêtes); la marge couvre la création des fils
+    # du serveur sur une machine chargée
+    assert durée < 4 * LATENCE
+
+
+def test_fermer_ferme_les_sessions(serveur_lent):
+    client = ClientAsynchrone(serveur_lent.url, connexions=3)
+    asyncio.run(client.lister_parties('idul'))
+    assert client._sessions
+    client.fermer()
+    assert not client._sessions
@@ -0,0 +1,162 @@
+"""Tests de la base de parties binaire (archives.py)."""
+import random
+
+import pytest
+
+import archives
+from archives import (
+    BaseParties, ajouter_partie, coups_entre, décoder_coup, décoder_partie, encoder_coup,
+    encoder_partie)
+from coups import coups_légaux
+from quoridor import Quoridor, QuoridorError
+
+
+def _jouer(jeu, joueur, coup):
+    type_coup, position = coup
+    if type_coup == 'D':
+        jeu.déplacer_jeton(joueur, position)
+    else:
+        jeu.placer_mur(joueur, position, 'horizontal' if type_coup == 'MH' else 'vertical')
+
+
+def _partie_aléatoire(graine, départ=None, trait=1):
+    # coups légaux tirés au hasard, murs compris; produit aussi les états successifs
+    hasard = random.Random(graine)
+    jeu = Quoridor(['idul', 'automate']) if départ is None else \
+        Quoridor(départ['joueurs'], départ['murs'])
+    états = [jeu.état_partie()]
+    coups = []
+    joueur = trait
+    while not jeu.partie_terminée() and len(coups) < 300:
+        légaux = list(coups_légaux(jeu.état_compact(), joueur))
+        déplacements = [coup for coup in légaux if coup[0] == 'D']
+        coup = hasard.choice(déplacements if hasard.random() < 0.6 else légaux)
+        _jouer(jeu, joueur, coup)
+        coups.append(coup)
+        états.append(jeu.état_partie())
+        joueur = 3 - joueur
+    return coups, états
+
+
+def _résumé(état):
+    return (
+        [(tuple(joueur['pos']), joueur['murs']) for joueur in état['joueurs']],
+        {tuple(mur) for mur in état['murs']['horizontaux']},
+        {tuple(mur) for mur in état['murs']['verticaux']},
+    )
+
+
+@pytest.mark.parametrize('graine', range(8))
+def test_aller_retour_par_la_base(tmp_path, graine):
+    chemin = str(tmp_path / 'parties.bin')
+    parties = [_partie_aléatoire(graine)]
+    # une partie depuis une position intermédiaire, où le joueur 2 a le trait
+    coups, états = parties[0]
+    milieu = états[len(coups) // 2 | 1]
+    parties.append(_partie_aléatoire(graine + 100, milieu, trait=2))
+
+    for (coups, _), (départ, trait) in zip(parties, [(None, 1), (milieu, 2)]):
+        ajouter_partie(chemin, ['idul', 'automate'], coups, départ, trait)
+
+    base = BaseParties(chemin)
+    try:
+        assert len(base) == 2
+        for numéro, (coups, états) in enumerate(parties):
+            assert base.coups(numéro) == [(t, tuple(p)) for t, p in coups]
+            assert _résumé(base.rejouer(numéro).état_partie()) == _résumé(états[-1])
+            plis = len(coups) // 3
+            assert _résumé(base.rejouer(numéro, plis).état_partie()) == _résumé(états[plis])
+    finally:
+        base.fermer()
+
+
+def test_écriture_interrompue_sans_entrée_d_index(tmp_path, monkeypatch):
+    chemin = str(tmp_path / 'parties.bin')
+    noms = ['idul', 'automate']
+    premiers, _ = _partie_aléatoire(0)
+    ajouter_partie(chemin, noms, premiers)
+
+    ouvrir = open
+
+    class Interrompu:
+        """Fichier de la base dont l'écriture s'arrête au milieu de la partie."""
+
+        def __init__(self, fichier):
+            self.fichier = fichier
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exception):
+            self.fichier.close()
+
+        def tell(self):
+            return self.fichier.tell()
+
+        def write(self, données):
+            self.fichier.write(données[:len(données) // 2])
+            raise OSError('disque plein')
+
+    def ouvrir_interrompu(nom, mode='r'):
+        fichier = ouvrir(nom, mode)
+        return Interrompu(fichier) if nom == chemin else fichier
+
+    monkeypatch.setattr(archives, 'open', ouvrir_interrompu, raising=False)
+    with pytest.raises(OSError):
+        ajouter_partie(chemin, noms, _partie_aléatoire(1)[0])
+    monkeypatch.undo()
+
+    # la partie interrompue n'a pas d'entrée d'index; la suivante est lisible
+    derniers, _ = _partie_aléatoire(2)
+    assert ajouter_partie(chemin, noms, derniers) == 1
+    base = BaseParties(chemin)
+    try:
+        assert len(base) == 2
+        assert base.coups(0) == [(t, tuple(p)) for t, p in premiers]
+        assert base.coups(1) == [(t, tuple(p)) for t, p in derniers]
+    finally:
+        base.fermer()
+
+
+def test_nom_tronqué_sans_couper_de_caractère():
+    nom = 'a' + 'é' * 200
+    partie = décoder_partie(encoder_partie([nom, 'automate'], []))
+    assert len(partie['noms'][0].encode('utf-8')) <= 255
+    assert nom.startswith(partie['noms'][0])
+    assert partie['noms'][0] == 'a' + 'é' * 127
+    assert partie['noms'][1] == 'automate'
+
+
+@pytest.mark.parametrize('graine', range(8))
+def test_coups_entre_états_du_serveur(graine):
+    coups, états = _partie_aléatoire(graine)
+    for tour in range(0, len(coups), 2):
+        avant, après = états[tour], états[min(tour + 2, len(coups))]
+        trouvés = coups_entre(avant, après)
+        assert [joueur for joueur, _ in trouvés] == [1, 2][:len(coups[tour:tour + 2])]
+        jeu = Quoridor(avant['joueurs'], avant['murs'])
+        for joueur, coup in trouvés:
+            _jouer(jeu, joueur, coup)
+        assert _résumé(jeu.état_partie()) == _résumé(après)
+
+
+def test_coups_entre_refuse_un_coup_illégal():
+    avant = Quoridor(['idul', 'automate']).état_partie()
+    après = Quoridor(['idul', 'automate']).état_partie()
+    # un pion qui saute trois cases
+    après['joueurs'][0]['pos'] = (5, 4)
+    with pytest.raises(QuoridorError):
+        coups_entre(avant, après)
+
+
+def test_coups_entre_refuse_un_mur_sans_joueur():
+    avant = Quoridor(['idul', 'automate']).état_partie()
+    après = Quoridor(['idul', 'automate']).état_partie()
+    après['murs']['horizontaux'].append((4, 4))
+    with pytest.raises(QuoridorError):
+        coups_entre(avant, après)
+
+
+def test_encodage_des_coups():
+    for octet in range(209):
+        assert encoder_coup(décoder_coup(octet)) == octet
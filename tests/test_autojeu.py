@@ -0,0 +1,36 @@
+"""Tests du calcul de l'Elo et de son intervalle de confiance (autojeu.py)."""
+import pytest
+
+from autojeu import classement, elo
+
+
+@pytest.mark.parametrize('score, attendu', [
+    (0.5, 0.0),
+    (0.75, 190.8),   # 400 log10(3)
+    (10 / 11, 400.0),  # 400 log10(10)
+    (0.95, 511.5),   # 400 log10(19)
+])
+def test_elo(score, attendu):
+    assert elo(score) == pytest.approx(attendu, abs=0.05)
+    assert elo(1 - score) == pytest.approx(-attendu, abs=0.05)
+
+
+@pytest.mark.parametrize('score, parties, attendu', [
+    # écart de 1.96 * sqrt(0.25 / 100) = 0.098: scores 0.402 et 0.598
+    (0.5, 100, (0.0, -69.0, 69.0)),
+    # écart de 0.142 sur 40 parties: scores 0.558 et 0.842
+    (0.7, 40, (147.2, 40.5, 290.7)),
+    # dix fois plus de parties: un intervalle environ trois fois plus étroit
+    (0.7, 400, (147.2, 111.4, 186.2)),
+    # score parfait ramené à une demi-partie de l'extrême: 9.5 / 10
+    (1.0, 10, (511.5, 511.5, 511.5)),
+    (0.0, 10, (-511.5, -511.5, -511.5)),
+])
+def test_classement(score, parties, attendu):
+    assert classement(score, parties) == attendu
+
+
+def test_intervalle_borné_par_une_demi_partie():
+    # l'intervalle d'un score élevé ne dépasse pas l'extrême ramené
+    elo_, elo_min, elo_max = classement(0.9, 10)
+    assert elo_min < elo_ < elo_max == classement(1.0, 10)[0]
@@ -0,0 +1,77 @@
+"""Tests de la table de transposition persistante (cache.py)."""
+from cache import CachePersistant
+
+
+def _requêtes(cache):
+    # compte les requêtes SQL exécutées sur la connexion du cache
+    compteur = []
+    cache.connexion.set_trace_callback(compteur.append)
+    return compteur
+
+
+def test_entrées_conservées_d_une_partie_à_l_autre(tmp_path):
+    chemin = str(tmp_path / 'cache.sqlite')
+    cache = CachePersistant(chemin, profondeur_min=2)
+    cache[1] = (3, 10, 0, ('D', 4))
+    cache[(1 << 64) - 1] = (5, -7, 1, None)
+    cache[2] = (1, 0, 0, None)  # trop peu profonde pour être écrite
+    cache.fermer()
+
+    cache = CachePersistant(chemin, profondeur_min=2)
+    assert cache.get(1) == (3, 10, 0, ('D', 4))
+    assert cache[(1 << 64) - 1] == (5, -7, 1, None)
+    assert cache.get(2) is None
+    cache.fermer()
+
+
+def test_aucune_requête_par_clé_absente(tmp_path):
+    chemin = str(tmp_path / 'cache.sqlite')
+    cache = CachePersistant(chemin)
+    for clé in range(100):
+        cache[clé] = (4, clé, 0, None)
+    cache.fermer()
+
+    cache = CachePersistant(chemin)
+    cache.charger()
+    requêtes = _requêtes(cache)
+    for clé in range(100, 10000):
+        assert cache.get(clé) is None
+    assert cache.get(5) == (4, 5, 0, None)
+    assert requêtes == []
+    cache.fermer()
+
+
+def test_clear_enregistre_sans_relire(tmp_path):
+    chemin = str(tmp_path / 'cache.sqlite')
+    cache = CachePersistant(chemin)
+    cache[7] = (4, 1, 0, None)
+    cache.clear()
+    requêtes = _requêtes(cache)
+    assert len(cache) == 0
+    assert cache.get(7) is None
+    assert requêtes == []
+    cache.fermer()
+
+    cache = CachePersistant(chemin)
+    assert cache.get(7) == (4, 1, 0, None)
+    cache.fermer()
+
+
+def test_éviction_des_moins_récemment_consultées(tmp_path):
+    chemin = str(tmp_path / 'cache.sqlite')
+    cache = CachePersistant(chemin, taille_max=3)
+    for clé in (1, 2, 3):
+        cache[clé] = (4, clé, 0, None)
+    cache.fermer()
+
+    cache = CachePersistant(chemin, taille_max=3)
+    cache.get(1)
+    cache[4] = (4, 4, 0, None)
+    cache.fermer()
+
+    cache = CachePersistant(chemin, taille_max=3)
+    cache.charger()
+    # 1 a été consultée et 4 écrite après 2 et 3: l'une de ces deux-ci est évincée
+    assert len(cache) == 3
+    assert cache.get(1) is not None and cache.get(4) is not None
+    cache.fermer()
@@ -0,0 +1,21 @@
+"""Tests du générateur de charge (charge.py)."""
+import asyncio
+
+import charge
+
+
+def test_centile():
+    assert charge.centile([], 50) is None
+    assert charge.centile([1, 2, 3, 4], 50) == 2
+    assert charge.centile([1, 2, 3, 4], 99) == 4
+
+
+def test_charge_contre_un_serveur_dans_un_autre_processus():
+    processus, url = charge.lancer_serveur()
+    try:
+        latences, erreurs, _ = asyncio.run(charge.générer(url, 6, 3))
+    finally:
+        processus.terminate()
+        processus.wait()
+    assert erreurs == 0
+    assert len(latences['débuter']) == 6
@@ -0,0 +1,35 @@
+"""Tests du générateur des coups légaux (coups.py)."""
+import pytest
+
+from banc import charger_corpus
+from coups import coups_légaux
+from damier import position_horizontale, position_verticale
+from etat import EtatQuoridor
+from murs import murs_légaux
+
+CORPUS = charger_corpus()
+
+
+def _murs_attendus(damier):
+    return {
+        ('MH', position_horizontale(fente)) if orientation == 'horizontal'
+        else ('MV', position_verticale(fente))
+        for orientation, fente in murs_légaux(damier)
+    }
+
+
+@pytest.mark.parametrize('joueur', [1, 2])
+@pytest.mark.parametrize('état', CORPUS)
+def test_coups_légaux_selon_déplacements_et_murs_légaux(état, joueur):
+    compact = EtatQuoridor.depuis_dict(état)
+    damier = compact.damier()
+    coups = list(coups_légaux(compact, joueur))
+    assert len(coups) == len(set(coups))
+
+    déplacements = [('D', destination) for destination in damier.déplacements(joueur)]
+    # les déplacements d'abord, puis les murs
+    assert set(coups[:len(déplacements)]) == set(déplacements)
+    attendus = _murs_attendus(damier) if compact.restants[joueur - 1] else set()
+    assert set(coups[len(déplacements):]) == attendus
+
+    assert list(coups_légaux(compact, joueur, murs=False)) == coups[:len(déplacements)]
@@ -0,0 +1,136 @@
+"""Tests des déplacements et des conflits de murs du damier compact (damier.py)."""
+import random
+
+import pytest
+
+from conftest import MURS, damier_aléatoire
+from damier import (
+    NB_CASES, VOISINS, Damier, case, fente_horizontale, fente_verticale, position,
+    position_horizontale, position_verticale)
+
+nx = pytest.importorskip('networkx')
+
+
+def _graphe_de_référence(joueurs, murs_horizontaux, murs_verticaux):
+    # graphe.construire_graphe tel qu'il était avant le damier compact
+    graphe = nx.DiGraph()
+    for x in range(1, 10):
+        for y in range(1, 10):
+            if x > 1:
+                graphe.add_edge((x, y), (x-1, y))
+            if x < 9:
+                graphe.add_edge((x, y), (x+1, y))
+            if y > 1:
+                graphe.add_edge((x, y), (x, y-1))
+            if y < 9:
+                graphe.add_edge((x, y), (x, y+1))
+
+    for x, y in murs_horizontaux:
+        graphe.remove_edge((x, y-1), (x, y))
+        graphe.remove_edge((x, y), (x, y-1))
+        graphe.remove_edge((x+1, y-1), (x+1, y))
+        graphe.remove_edge((x+1, y), (x+1, y-1))
+
+    for x, y in murs_verticaux:
+        graphe.remove_edge((x-1, y), (x, y))
+        graphe.remove_edge((x, y), (x-1, y))
+        graphe.remove_edge((x-1, y+1), (x, y+1))
+        graphe.remove_edge((x, y+1), (x-1, y+1))
+
+    # les sauts sont déterminés sur le graphe des seuls murs: l'original les lisait
+    # sur le graphe en cours de modification et enchaînait un saut et une diagonale
+    # quand les deux pions sont voisins
+    passages = graphe.copy()
+    for joueur in joueurs:
+        for prédécesseur in list(passages.predecessors(joueur)):
+            graphe.remove_edge(prédécesseur, joueur)
+            successeur = (2*joueur[0]-prédécesseur[0], 2*joueur[1]-prédécesseur[1])
+            if successeur in passages.successors(joueur) and successeur not in joueurs:
+                graphe.add_edge(prédécesseur, successeur)
+            else:
+                for successeur in passages.successors(joueur):
+                    if prédécesseur != successeur and successeur not in joueurs:
+                        graphe.add_edge(prédécesseur, successeur)
+    return graphe
+
+
+def _pions_voisins(hasard):
+    # deux pions adjacents, pour exercer les sauts
+    pion = hasard.randrange(NB_CASES)
+    return [pion, hasard.choice([voisin for voisin in VOISINS[pion] if voisin >= 0])]
+
+
+@pytest.mark.parametrize('graine', range(60))
+def test_successeurs_selon_le_graphe_de_référence(graine):
+    hasard = random.Random(graine)
+    pions = _pions_voisins(hasard) if graine % 3 else None
+    damier = damier_aléatoire(hasard, hasard.randrange(25), pions)
+    graphe = _graphe_de_référence(
+        [position(pion) for pion in damier.pions],
+        damier.murs_horizontaux(), damier.murs_verticaux())
+    for indice in range(NB_CASES):
+        successeurs = [position(suivant) for suivant in damier.successeurs(indice)]
+        assert len(successeurs) == len(set(successeurs))
+        assert set(successeurs) == set(graphe.successors(position(indice))), position(indice)
+
+
+@pytest.mark.parametrize('pions, horizontaux, verticaux, attendus', [
+    # saut en ligne droite
+    ([(5, 5), (5, 6)], [], [], {(4, 5), (6, 5), (5, 4), (5, 7)}),
+    # mur derrière le pion adverse: sauts en diagonale
+    ([(5, 5), (5, 6)], [(5, 7)], [], {(4, 5), (6, 5), (5, 4), (4, 6), (6, 6)}),
+    # mur derrière et à côté du pion adverse: une seule diagonale
+    ([(5, 5), (5, 6)], [(5, 7)], [(6, 6)], {(4, 5), (6, 5), (5, 4), (4, 6)}),
+    # pion adverse contre le bord: sauts en diagonale
+    ([(5, 8), (5, 9)], [], [], {(4, 8), (6, 8), (5, 7), (4, 9), (6, 9)}),
+    # pion adverse dans un coin
+    ([(2, 9), (1, 9)], [], [], {(3, 9), (2, 8), (1, 8)}),
+    # mur entre les pions: pas de saut
+    ([(5, 5), (5, 6)], [(4, 6)], [], {(4, 5), (6, 5), (5, 4)}),
+])
+def test_sauts(pions, horizontaux, verticaux, attendus):
+    damier = Damier(pions, horizontaux, verticaux)
+    assert {position(suivant) for suivant in damier.successeurs(case(pions[0]))} == attendus
+    assert set(damier.déplacements(1)) == attendus
+
+
+def _centre(orientation, fente):
+    # coin du damier au milieu du mur
+    if orientation == 'horizontal':
+        x, y = position_horizontale(fente)
+        return x + 1, y
+    x, y = position_verticale(fente)
+    return x, y + 1
+
+
+def _conflit_attendu(mur, autre):
+    (x, y), (x_autre, y_autre) = _centre(*mur), _centre(*autre)
+    orientation = mur[0]
+    if orientation != autre[0]:
+        # croisement
+        return (x, y) == (x_autre, y_autre)
+    # chevauchement
+    if orientation == 'horizontal':
+        return y == y_autre and abs(x - x_autre) <= 1
+    return x == x_autre and abs(y - y_autre) <= 1
+
+
+def test_conflit_chevauchement_et_croisement():
+    for mur in MURS:
+        damier = Damier.depuis_indices([0, NB_CASES - 1], 0, 0)
+        damier.ajouter_mur(*mur)
+        for autre in MURS:
+            assert damier.conflit(*autre) == _conflit_attendu(mur, autre), (mur, autre)
+
+
+def test_conflit_exemples():
+    damier = Damier([(5, 1), (5, 9)], [(4, 5)], [])
+    # chevauchements
+    assert damier.conflit('horizontal', fente_horizontale((3, 5)))
+    assert damier.conflit('horizontal', fente_horizontale((5, 5)))
+    # croisement
+    assert damier.conflit('vertical', fente_verticale((5, 4)))
+    # bout à bout, ou vertical contre l'extrémité: pas de conflit
+    assert not damier.conflit('horizontal', fente_horizontale((6, 5)))
+    assert not damier.conflit('vertical', fente_verticale((4, 4)))
+    assert not damier.conflit('vertical', fente_verticale((6, 4)))
@@ -0,0 +1,57 @@
+"""Tests aléatoires des champs de distances incrémentaux (distances.py)."""
+import random
+
+import pytest
+
+from conftest import ORIENTATIONS, damier_aléatoire, mur_libre
+from damier import NB_FENTES
+from distances import INACCESSIBLE, Distances, IndexChemins
+
+GRAINES = range(30)
+
+
+def _attendues(damier, joueur):
+    return [INACCESSIBLE if distance is None else distance
+            for distance in damier.distances(joueur)]
+
+
+@pytest.mark.parametrize('graine', GRAINES)
+def test_réparer_et_annuler_suivent_le_recalcul(graine):
+    hasard = random.Random(graine)
+    damier = damier_aléatoire(hasard)
+    distances = Distances(damier)
+    for _ in range(60):
+        # des murs qui isolent un joueur sont admis: le champ doit rester exact
+        mur = mur_libre(hasard, damier)
+        if distances.pile and (mur is None or hasard.random() < 0.3):
+            distances.annuler()
+        elif mur is not None:
+            distances.ajouter_mur(*mur)
+        for joueur in (1, 2):
+            assert distances[joueur].valeurs == _attendues(damier, joueur)
+    while distances.pile:
+        distances.annuler()
+    assert (damier.murs_h, damier.murs_v) == (0, 0)
+    for joueur in (1, 2):
+        assert distances[joueur].valeurs == _attendues(damier, joueur)
+
+
+@pytest.mark.parametrize('graine', GRAINES)
+def test_allonge_suit_la_distance_recalculée(graine):
+    hasard = random.Random(graine)
+    damier = damier_aléatoire(hasard, hasard.randrange(20))
+
+    distances = Distances(damier)
+    for joueur in (1, 2):
+        index = IndexChemins(distances[joueur])
+        # distances sans tenir compte des pions, comme le champ
+        avant = _attendues(damier, joueur)[damier.pions[joueur - 1]]
+        for orientation in ORIENTATIONS:
+            for fente in range(NB_FENTES):
+                if damier.conflit(orientation, fente):
+                    continue
+                damier.ajouter_mur(orientation, fente)
+                après = _attendues(damier, joueur)[damier.pions[joueur - 1]]
+                damier.retirer_mur(orientation, fente)
+                assert index.allonge(orientation, fente) == (après > avant), \
+                    (joueur, orientation, fente)
@@ -0,0 +1,82 @@
+"""Tests de l'état compact et immuable d'une partie (etat.EtatQuoridor)."""
+import pickle
+import random
+
+import pytest
+
+from banc import charger_corpus
+from conftest import damier_aléatoire
+from etat import EtatQuoridor
+
+CORPUS = charger_corpus()
+
+
+def _trié(état):
+    # les murs sont énumérés par indice de fente croissant: y, puis x
+    murs = état['murs']
+    return dict(état, murs={
+        'horizontaux': sorted(murs['horizontaux'], key=lambda mur: (mur[1], mur[0])),
+        'verticaux': sorted(murs['verticaux'], key=lambda mur: (mur[1], mur[0])),
+    })
+
+
+def _aléatoire(graine):
+    hasard = random.Random(graine)
+    damier = damier_aléatoire(hasard, hasard.randrange(20))
+    return EtatQuoridor(('idul', 'automate'), damier.pions,
+                        (hasard.randrange(11), hasard.randrange(11)),
+                        damier.murs_h, damier.murs_v)
+
+
+@pytest.mark.parametrize('état', CORPUS)
+def test_aller_retour_par_le_dictionnaire(état):
+    compact = EtatQuoridor.depuis_dict(état)
+    assert compact.vers_dict() == _trié(état)
+    assert EtatQuoridor.depuis_dict(compact.vers_dict()) == compact
+
+
+def test_égalité_et_hachage():
+    états = [_aléatoire(graine) for graine in range(50)]
+    copies = [EtatQuoridor.depuis_dict(état.vers_dict()) for état in états]
+    for état, copie in zip(états, copies):
+        assert état is not copie
+        assert état == copie and hash(état) == hash(copie)
+    assert len(set(états + copies)) == len(set(map(repr, états)))
+    état = états[0]
+    assert état != EtatQuoridor(état.noms, état.pions, (état.restants1 + 1, état.restants2),
+                                état.murs_h, état.murs_v)
+    assert état != EtatQuoridor(('autre', 'automate'), état.pions, état.restants,
+                                état.murs_h, état.murs_v)
+    assert état != état.vers_dict()
+
+
+def test_ordre_total():
+    états = [_aléatoire(graine) for graine in range(50)]
+    triés = sorted(états)
+    for premier, second in zip(triés, triés[1:]):
+        assert premier <= second and not second < premier
+        assert (premier < second) == (premier != second)
+    assert max(états) == triés[-1] and min(états) == triés[0]
+    with pytest.raises(TypeError):
+        états[0] < 0
+
+
+def test_sérialisation():
+    for graine in range(20):
+        état = _aléatoire(graine)
+        copie = pickle.loads(pickle.dumps(état))
+        assert copie == état and hash(copie) == hash(état)
+        assert copie.noms == état.noms and copie.restants == état.restants
+
+
+def test_immuable():
+    état = _aléatoire(0)
+    for attribut in ('pion1', 'restants2', 'murs_h', 'noms', 'autre'):
+        with pytest.raises(AttributeError):
+            setattr(état, attribut, 0)
+        with pytest.raises(AttributeError):
+            delattr(état, attribut)
+    # jouer produit un nouvel état et laisse l'ancien intact
+    avant = état.vers_dict()
+    après = état.jouer(1, ('D', (5, 5)))
+    assert après is not état and état.vers_dict() == avant
@@ -0,0 +1,72 @@
+"""Tests de la table de finales par analyse rétrograde (finales.py)."""
+import random
+
+import pytest
+
+from conftest import damier_aléatoire
+from damier import NB_CASES, RANGÉES, Damier, case
+from finales import GAIN, INCONNUE, PERTE, Finale
+from recherche import VICTOIRE, Recherche
+
+
+def _murs_aléatoires(graine, nombre):
+    damier = damier_aléatoire(random.Random(graine), nombre, (case((5, 1)), case((5, 9))))
+    return damier.murs_h, damier.murs_v
+
+
+@pytest.fixture(scope='module', params=[(0, 0), (1, 6), (2, 14), (3, 20)])
+def finale(request):
+    return Finale(*_murs_aléatoires(*request.param))
+
+
+def _positions():
+    for trait in (1, 2):
+        for pion1 in range(NB_CASES):
+            for pion2 in range(NB_CASES):
+                if pion1 != pion2:
+                    yield (pion1, pion2), trait
+
+
+def _successeurs(finale, pions, trait):
+    finale.damier.pions = list(pions)
+    for suivante in finale.damier.successeurs(pions[trait - 1]):
+        nouveaux = list(pions)
+        nouveaux[trait - 1] = suivante
+        yield finale.sonder(nouveaux, 3 - trait)
+
+
+def test_récurrence_rétrograde(finale):
+    for pions, trait in _positions():
+        issue, plis = finale.sonder(pions, trait)
+        if pions[0] in RANGÉES[1] or pions[1] in RANGÉES[2]:
+            # le joueur qui vient de jouer a gagné
+            assert (issue, plis) == (PERTE, 0)
+            continue
+        suivants = list(_successeurs(finale, pions, trait))
+        pertes = [p for i, p in suivants if i == PERTE]
+        if pertes:
+            # gain au plus vite
+            assert (issue, plis) == (GAIN, 1 + min(pertes)), (pions, trait)
+        elif suivants and all(i == GAIN for i, _ in suivants):
+            # perte au plus tard
+            assert (issue, plis) == (PERTE, 1 + max(p for _, p in suivants)), (pions, trait)
+        else:
+            assert (issue, plis) == (INCONNUE, 0), (pions, trait)
+
+
+def test_accord_avec_la_recherche(finale):
+    hasard = random.Random(0)
+    courtes = [
+        (pions, trait) for pions, trait in _positions()
+        if pions[0] not in RANGÉES[1] and pions[1] not in RANGÉES[2]
+        and finale.sonder(pions, trait)[0] != INCONNUE
+        and finale.sonder(pions, trait)[1] <= 5
+    ]
+    for pions, trait in hasard.sample(courtes, 25):
+        issue, plis = finale.sonder(pions, trait)
+        damier = Damier.depuis_indices(pions, finale.damier.murs_h, finale.damier.murs_v)
+        _, score = Recherche(
+            damier, [0, 0], profondeur=plis, noeuds_max=float('inf'), table={},
+        ).meilleur_coup(trait)
+        attendu = VICTOIRE - plis if issue == GAIN else -(VICTOIRE - plis)
+        assert score == attendu, (pions, trait, issue, plis)
@@ -0,0 +1,74 @@
+"""Tests du hachage de Zobrist et de la symétrie miroir (hachage.py)."""
+import random
+
+import pytest
+
+from conftest import damier_aléatoire
+from damier import NB_CASES, NB_FENTES, Damier
+from hachage import (
+    MIROIR_CASES, MIROIR_H, MIROIR_V, Hachage, clé_canonique, clé_zobrist, miroir_coup)
+from recherche import Recherche
+
+
+def _miroir(damier):
+    murs_h = murs_v = 0
+    for fente in range(NB_FENTES):
+        if damier.murs_h >> fente & 1:
+            murs_h |= 1 << MIROIR_H[fente]
+        if damier.murs_v >> fente & 1:
+            murs_v |= 1 << MIROIR_V[fente]
+    return Damier.depuis_indices([MIROIR_CASES[pion] for pion in damier.pions], murs_h, murs_v)
+
+
+@pytest.mark.parametrize('graine', range(20))
+def test_clés_incrémentales_selon_le_recalcul(graine):
+    hasard = random.Random(graine)
+    damier = damier_aléatoire(hasard, hasard.randrange(10))
+    recherche = Recherche(damier, [hasard.randrange(1, 11), hasard.randrange(1, 11)])
+    trait = hasard.choice((1, 2))
+    recherche.hachage = Hachage(damier, recherche.murs, trait)
+    initiale = recherche.hachage.clé
+    joués = []
+    for _ in range(60):
+        if joués and hasard.random() < 0.4:
+            coup, annulation = joués.pop()
+            trait = 3 - trait
+            recherche.déjouer(coup, trait, annulation)
+        else:
+            coup = hasard.choice(recherche.coups(trait))
+            joués.append((coup, recherche.jouer(coup, trait)))
+            trait = 3 - trait
+        assert recherche.hachage.clé == clé_zobrist(damier, recherche.murs, trait)
+        assert recherche.hachage.canonique == clé_canonique(damier, recherche.murs, trait)
+    while joués:
+        coup, annulation = joués.pop()
+        trait = 3 - trait
+        recherche.déjouer(coup, trait, annulation)
+    assert recherche.hachage.clé == initiale
+
+
+@pytest.mark.parametrize('graine', range(20))
+def test_position_et_miroir_partagent_la_clé_canonique(graine):
+    hasard = random.Random(graine)
+    damier = damier_aléatoire(hasard, hasard.randrange(20))
+    murs, trait = [hasard.randrange(11), hasard.randrange(11)], hasard.choice((1, 2))
+    miroir = _miroir(damier)
+    hachage = Hachage(damier, murs, trait)
+    assert hachage.miroir == clé_zobrist(miroir, murs, trait)
+    assert clé_canonique(miroir, murs, trait) == clé_canonique(damier, murs, trait)
+    assert Hachage(miroir, murs, trait).inversée == (hachage.clé < hachage.miroir)
+    # les coups de l'image miroir sont les images miroirs des coups
+    coups = Recherche(damier, murs, murs_complets=True).coups(trait)
+    coups_miroir = Recherche(miroir, murs, murs_complets=True).coups(trait)
+    assert set(map(miroir_coup, coups)) == set(coups_miroir)
+
+
+def test_miroir_coup_est_une_involution():
+    coups = [('D', indice) for indice in range(NB_CASES)] + [
+        (type_coup, fente) for type_coup in ('MH', 'MV') for fente in range(NB_FENTES)]
+    images = [miroir_coup(coup) for coup in coups]
+    assert sorted(images) == sorted(coups)
+    assert [miroir_coup(image) for image in images] == coups
+    # seuls les coups sur la colonne centrale sont leur propre image
+    assert {coup for coup, image in zip(coups, images) if coup == image} == {
+        ('D', indice) for indice in range(NB_CASES) if indice % 9 == 4}
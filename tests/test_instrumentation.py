@@ -0,0 +1,88 @@
+"""Tests de l'instrumentation facultative (instrumentation.py)."""
+import json
+
+import pytest
+
+import instrumentation
+from banc import charger_corpus
+from instrumentation import Histogramme, chronométré
+from quoridor import Quoridor
+
+
+@chronométré('essai')
+def _doubler(valeur, échouer=False):
+    """Doubler une valeur."""
+    if échouer:
+        raise ValueError(valeur)
+    return 2 * valeur
+
+
+@pytest.fixture(autouse=True)
+def propre():
+    instrumentation.désactiver()
+    instrumentation.réinitialiser()
+    yield
+    instrumentation.désactiver()
+    instrumentation.réinitialiser()
+
+
+def test_décorateur_transparent_si_désactivé():
+    assert _doubler.__name__ == '_doubler' and _doubler.__doc__ == 'Doubler une valeur.'
+    assert _doubler(21) == 42
+    with pytest.raises(ValueError):
+        _doubler(1, échouer=True)
+    assert not instrumentation.compteurs and not instrumentation.histogrammes
+
+
+def test_compteurs_et_histogrammes_si_activé():
+    instrumentation.activer()
+    for valeur in range(5):
+        assert _doubler(valeur) == 2 * valeur
+    with pytest.raises(ValueError):
+        _doubler(1, échouer=True)
+    instrumentation.compter('autre', 3)
+
+    assert instrumentation.compteurs['essai'] == 6
+    assert instrumentation.compteurs['autre'] == 3
+    histogramme = instrumentation.histogrammes['essai']
+    assert histogramme.nombre == 6 and sum(histogramme.classes.values()) == 6
+    assert 0 < histogramme.maximum <= histogramme.total
+
+    exporté = json.loads(json.dumps(instrumentation.exporter()))
+    assert exporté['compteurs'] == {'essai': 6, 'autre': 3}
+    assert exporté['histogrammes']['essai']['nombre'] == 6
+
+    instrumentation.désactiver()
+    _doubler(1)
+    assert instrumentation.compteurs['essai'] == 6
+
+
+def test_histogramme_par_puissances_de_deux():
+    histogramme = Histogramme()
+    for durée in (0.0, 3e-6, 500e-6, 500e-6, 0.1):
+        histogramme.ajouter(durée)
+    # 0 µs, 3 µs dans [2, 4), 500 µs dans [256, 512), 100 ms dans [65536, 131072)
+    assert histogramme.classes == {0: 1, 2: 1, 9: 2, 17: 1}
+    assert histogramme.centile(50) == pytest.approx(512e-6)
+    assert histogramme.centile(100) == pytest.approx(0.1)
+    assert histogramme.résumé()['moyenne'] == pytest.approx(0.1010030 / 5)
+
+
+def test_trace_d_une_décision(tmp_path):
+    trace = tmp_path / 'trace.jsonl'
+    instrumentation.activer(str(trace))
+    # une position de milieu de partie, hors du livre d'ouvertures
+    état = charger_corpus()[3]
+    partie = Quoridor(état['joueurs'], état['murs'])
+    partie.jouer_coup(1, profondeur=2)
+    partie.jouer_coup(2, profondeur=2)
+    instrumentation.désactiver()
+
+    lignes = [json.loads(ligne) for ligne in trace.read_text(encoding='utf-8').splitlines()]
+    assert [ligne['joueur'] for ligne in lignes] == [1, 2]
+    for ligne in lignes:
+        assert ligne['profondeur'] >= 1 and ligne['noeuds'] > 0
+        # les compteurs de chaque ligne sont ceux de sa seule décision
+        assert ligne['compteurs']['jouer_coup'] == 1
+        assert ligne['compteurs']['noeuds'] == ligne['noeuds']
+    assert instrumentation.compteurs['jouer_coup'] == 2
@@ -0,0 +1,34 @@
+"""Tests de la recherche Monte-Carlo (mcts.py)."""
+import pytest
+
+import mcts
+from damier import Damier
+from mcts import MCTS
+from recherche import Recherche
+
+
+def _position():
+    return Damier([(5, 3), (4, 7)], [(4, 4), (6, 6)], [(3, 2)]), [8, 9]
+
+
+@pytest.mark.parametrize('travailleurs', [1, 2])
+@pytest.mark.parametrize('simulations', [1, 37, 200])
+def test_coup_légal_et_simulations_comptées(travailleurs, simulations):
+    damier, murs = _position()
+    recherche = MCTS(damier, murs, simulations=simulations, travailleurs=travailleurs,
+                     graine=1)
+    coup, taux = recherche.meilleur_coup(1)
+    assert coup in Recherche(damier, murs).coups(1)
+    assert 0 <= taux <= 1
+    assert recherche.noeuds == simulations
+    # la position n'est pas modifiée par la recherche
+    assert (damier.pions, murs) == (_position()[0].pions, [8, 9])
+
+
+def test_exécuteur_conservé_d_une_recherche_à_l_autre():
+    damier, murs = _position()
+    MCTS(damier, murs, simulations=20, travailleurs=2).meilleur_coup(1)
+    exécuteur = mcts.exécuteur_processus(2)
+    MCTS(damier, murs, simulations=20, travailleurs=2).meilleur_coup(2)
+    assert mcts.exécuteur_processus(2) is exécuteur
+    assert mcts.exécuteur_processus(3) is not exécuteur
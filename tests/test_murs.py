@@ -0,0 +1,41 @@
+"""Tests aléatoires de l'énumération des murs légaux (murs.py)."""
+import random
+
+import pytest
+
+from conftest import ORIENTATIONS, damier_aléatoire
+from damier import NB_FENTES
+from murs import isole_un_joueur, murs_légaux
+
+
+def _damier_aléatoire(graine):
+    hasard = random.Random(graine)
+    return damier_aléatoire(hasard, hasard.randrange(40))
+
+
+@pytest.mark.parametrize('graine', range(40))
+def test_murs_légaux_selon_conflit_et_isolement(graine):
+    damier = _damier_aléatoire(graine)
+    attendus = {
+        (orientation, fente)
+        for orientation in ORIENTATIONS for fente in range(NB_FENTES)
+        if not damier.conflit(orientation, fente)
+        and not isole_un_joueur(damier, orientation, fente)
+    }
+    légaux = murs_légaux(damier)
+    assert len(légaux) == len(set(légaux))
+    assert set(légaux) == attendus
+
+
+@pytest.mark.parametrize('graine', range(40))
+def test_isole_un_joueur_selon_le_recalcul(graine):
+    damier = _damier_aléatoire(graine)
+    for orientation in ORIENTATIONS:
+        for fente in range(NB_FENTES):
+            if damier.conflit(orientation, fente):
+                continue
+            damier.ajouter_mur(orientation, fente)
+            isolé = any(damier.distances(joueur)[pion] is None
+                        for joueur, pion in enumerate(damier.pions, start=1))
+            damier.retirer_mur(orientation, fente)
+            assert isole_un_joueur(damier, orientation, fente) == isolé
@@ -0,0 +1,76 @@
+"""Tests du livre d'ouvertures (ouvertures.py)."""
+import pytest
+
+from damier import Damier, case, fente_horizontale
+from hachage import Hachage, miroir_coup
+from ouvertures import (
+    LivreOuvertures, construire_livre, décoder_coup, encoder_coup, écrire_livre)
+from recherche import Recherche
+
+# une position et son image miroir (x -> 10-x; voir hachage.py)
+POSITION = ([(3, 1), (5, 9)], [(2, 3), (6, 6)], [(3, 4)])
+MIROIR = ([(7, 1), (5, 9)], [(7, 3), (3, 6)], [(8, 4)])
+
+
+@pytest.fixture
+def chemin(tmp_path):
+    return str(tmp_path / 'livre.bin')
+
+
+def test_construire_puis_charger(chemin, tmp_path):
+    entrées = construire_livre(plis=2, largeur=2, profondeur=2)
+    écrire_livre(chemin, entrées)
+    livre = LivreOuvertures.charger(chemin)
+    assert len(livre) == sum(map(len, entrées.values()))
+    for clé, attendues in entrées.items():
+        assert livre.entrées(clé) == attendues
+
+    damier, murs = Damier([(5, 1), (5, 9)]), [10, 10]
+    coup, _ = Recherche(damier, murs, profondeur=2, noeuds_max=float('inf')).meilleur_coup(1)
+    assert livre.coup(damier, murs, 1) == coup
+    livre.fermer()
+
+    assert LivreOuvertures.charger(str(tmp_path / 'absent.bin')) is None
+    (tmp_path / 'autre.bin').write_bytes(b'\0' * 32)
+    with pytest.raises(ValueError):
+        LivreOuvertures(str(tmp_path / 'autre.bin'))
+
+
+def test_position_miroir(chemin):
+    damier, miroir, murs = Damier(*POSITION), Damier(*MIROIR), [8, 9]
+    hachage = Hachage(damier, murs, 1)
+    assert hachage.canonique == Hachage(miroir, murs, 1).canonique
+    # un coup du livre, dans le repère canonique
+    coup = ('MH', fente_horizontale((1, 5)))
+    canonique = miroir_coup(coup) if hachage.inversée else coup
+    écrire_livre(chemin, {hachage.canonique: [(canonique, 4, 120)]})
+
+    livre = LivreOuvertures(chemin)
+    try:
+        assert livre.coup(damier, murs, 1) == coup
+        assert livre.coup(miroir, murs, 1) == miroir_coup(coup)
+        assert miroir_coup(coup) == ('MH', fente_horizontale((8, 5)))
+        # clé absente: autre trait, autre nombre de murs, autre position
+        assert livre.coup(damier, murs, 2) is None
+        assert livre.coup(damier, [8, 8], 1) is None
+        assert livre.coup(Damier([(5, 1), (5, 9)]), [10, 10], 1) is None
+    finally:
+        livre.fermer()
+
+
+def test_meilleure_entrée_et_encodage(chemin):
+    damier, murs = Damier(*POSITION), [8, 9]
+    hachage = Hachage(damier, murs, 1)
+    profond, superficiel = ('D', case((2, 1))), ('D', case((3, 2)))
+    écrire_livre(chemin, {hachage.canonique: [(superficiel, 2, 50), (profond, 4, -40000)]})
+    livre = LivreOuvertures(chemin)
+    try:
+        # le score est borné à 16 bits, et la recherche la plus profonde l'emporte
+        assert sorted(livre.entrées(hachage.canonique)) == [
+            (profond, 4, -32768), (superficiel, 2, 50)]
+        attendu = miroir_coup(profond) if hachage.inversée else profond
+        assert livre.coup(damier, murs, 1) == attendu
+    finally:
+        livre.fermer()
+    for coup in [('D', 0), ('D', 80), ('MH', 63), ('MV', 0), ('MV', 63)]:
+        assert décoder_coup(encoder_coup(coup)) == coup
@@ -0,0 +1,47 @@
+"""Tests de la recherche parallèle (parallele.py)."""
+import time
+
+from damier import Damier
+from parallele import RechercheParallèle, TablePartagée, recherche_processus
+from recherche import Recherche
+
+
+def _position():
+    return Damier([(5, 3), (4, 7)], [(4, 4), (6, 6)], [(3, 2)]), [8, 9]
+
+
+def _processus(recherche):
+    return set(recherche._exécuteur._processes)
+
+
+def test_processus_conservés_d_une_recherche_à_l_autre():
+    damier, murs = _position()
+    with RechercheParallèle(damier, murs, profondeur=2, travailleurs=3,
+                            table=TablePartagée(1 << 12)) as recherche:
+        coup, _ = recherche.meilleur_coup(1)
+        assert coup in Recherche(damier, murs).coups(1)
+        processus = _processus(recherche)
+        assert len(processus) == 2
+
+        recherche.positionner(damier, murs, profondeur=2)
+        recherche.meilleur_coup(2)
+        assert _processus(recherche) == processus
+    assert recherche._exécuteur is None
+
+
+def test_création_des_processus_comptée_dans_le_temps_alloué():
+    damier, murs = _position()
+    with RechercheParallèle(damier, murs, profondeur=30, noeuds_max=float('inf'),
+                            temps_max=0.5, travailleurs=3,
+                            table=TablePartagée(1 << 12)) as recherche:
+        début = time.perf_counter()
+        recherche.meilleur_coup(1)
+        assert time.perf_counter() - début < 0.5 * 1.5
+
+
+def test_recherche_du_processus():
+    première = recherche_processus(2)
+    assert recherche_processus(2) is première
+    seconde = recherche_processus(3)
+    assert seconde is not première and première._exécuteur is None
+    seconde.fermer()
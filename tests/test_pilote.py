@@ -0,0 +1,84 @@
+"""Tests du pilote de parties simultanées (pilote.piloter)."""
+import asyncio
+import threading
+
+import pytest
+
+import api
+import pilote
+import serveur
+
+
+@pytest.fixture
+def local():
+    serveur_local = serveur.démarrer()
+    yield serveur_local
+    serveur_local.shutdown()
+    serveur_local.server_close()
+
+
+@pytest.fixture
+def fermetures(monkeypatch):
+    fermés = []
+    fermer = api.ClientAsynchrone.fermer
+
+    def fermer_noté(client):
+        fermés.append(client)
+        fermer(client)
+
+    monkeypatch.setattr(api.ClientAsynchrone, 'fermer', fermer_noté)
+    return fermés
+
+
+def test_parties_jouées_puis_client_fermé(local, fermetures, monkeypatch):
+    monkeypatch.setattr(api, '_CLIENT', api.ClientAsynchrone(local.url))
+    résultats, _ = asyncio.run(pilote.piloter('idul', 2, travailleurs=1, temps_max=0.05))
+    assert [résultat['erreur'] for résultat in résultats] == [None, None]
+    assert all(résultat['gagnant'] for résultat in résultats)
+    assert len(fermetures) == 1 and fermetures[0] is not api._CLIENT
+
+
+def test_client_fermé_sur_erreur(local, fermetures, monkeypatch):
+    async def échouer(*args):
+        raise ValueError('échec')
+
+    monkeypatch.setattr(api, '_CLIENT', api.ClientAsynchrone(local.url))
+    monkeypatch.setattr(pilote, 'jouer_partie', échouer)
+    with pytest.raises(ValueError):
+        asyncio.run(pilote.piloter('idul', 2, travailleurs=1))
+    assert len(fermetures) == 1
+
+
+def test_client_fourni_laissé_ouvert(local, fermetures):
+    client = api.ClientAsynchrone(local.url)
+    asyncio.run(pilote.piloter('idul', 1, travailleurs=1, temps_max=0.05, client=client))
+    assert fermetures == []
+    client.fermer()
+
+
+class ServeurUnePartieInvalide(serveur.Serveur):
+    """Serveur dont la première partie débute dans un état que le jeu refuse."""
+
+    def débuter(self, idul):
+        réponse = super().débuter(idul)
+        if not getattr(self, 'invalide', False):
+            self.invalide = True
+            réponse['état']['joueurs'][0]['murs'] = 11
+        return réponse
+
+
+def test_partie_en_erreur_rapportée_sans_interrompre_les_autres():
+    local = ServeurUnePartieInvalide(('127.0.0.1', 0))
+    threading.Thread(target=local.serve_forever, daemon=True).start()
+    try:
+        client = api.ClientAsynchrone(local.url)
+        résultats, durée = asyncio.run(
+            pilote.piloter('idul', 3, travailleurs=1, temps_max=0.05, client=client))
+        client.fermer()
+    finally:
+        local.shutdown()
+        local.server_close()
+    erreurs = [résultat['erreur'] for résultat in résultats if résultat['erreur']]
+    assert len(erreurs) == 1 and erreurs[0].startswith('QuoridorError')
+    assert sum(résultat['gagnant'] is not None for résultat in résultats) == 2
+    assert '2/3 parties terminées' in pilote.rapport(résultats, durée)
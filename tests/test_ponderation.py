@@ -0,0 +1,61 @@
+"""Tests de la réflexion pendant le temps de l'adversaire (ponderation.py)."""
+import time
+
+from coups import coups_légaux
+from etat import EtatQuoridor
+from ponderation import Pondération
+from quoridor import Quoridor
+from recherche import Recherche, coup_externe
+
+
+def _après_notre_coup():
+    # la position initiale après l'avance du joueur 1: le joueur 2 a le trait
+    partie = Quoridor(['idul', 'automate'])
+    partie.déplacer_jeton(1, (5, 2))
+    return partie.état_compact()
+
+
+def _attendre(condition, délai=10.0):
+    échéance = time.perf_counter() + délai
+    while not condition():
+        assert time.perf_counter() < échéance
+        time.sleep(0.01)
+
+
+def test_arrêter_interrompt_la_réflexion():
+    pondération = Pondération()
+    pondération.démarrer(_après_notre_coup())
+    _attendre(lambda: pondération.prêts)
+    time.sleep(0.2)
+    début = time.perf_counter()
+    pondération.arrêter()
+    assert time.perf_counter() - début < 0.5
+    assert pondération._fil is None
+    prêts = dict(pondération.prêts)
+    time.sleep(0.1)
+    assert pondération.prêts == prêts
+    # arrêter sans réflexion en cours n'a pas d'effet
+    pondération.arrêter()
+
+
+def test_coup_prêt_pour_la_réponse_prévue():
+    état = _après_notre_coup()
+    table = {}
+    pondération = Pondération(table=table, réponses=2)
+    pondération.démarrer(état)
+
+    # la réponse la plus probable de l'adversaire, telle que le serveur la renverrait
+    réponse = Recherche(état.damier(), état.restants).coups(2)[0]
+    prévu = EtatQuoridor.depuis_dict(état.jouer(2, coup_externe(réponse)).vers_dict())
+    _attendre(lambda: pondération.prêts.get(prévu, (None, 0))[1] >= 2)
+    pondération.arrêter()
+
+    coup = pondération.coup_prêt(prévu, profondeur_min=2)
+    assert coup in set(coups_légaux(prévu, 1))
+    assert pondération.coup_prêt(prévu, profondeur_min=99) is None
+    # la table partagée a été remplie pour la recherche qui suivra
+    assert table
+    # une réponse imprévue: rien n'est prêt
+    imprévu = état.jouer(2, ('MH', (1, 2)))
+    assert imprévu not in pondération.prêts
+    assert pondération.coup_prêt(imprévu, profondeur_min=1) is None
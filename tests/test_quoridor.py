@@ -0,0 +1,80 @@
+"""Tests du choix automatique des coups (Quoridor.jouer_coup)."""
+import random
+
+import pytest
+
+import quoridor
+from coups import coups_légaux
+from quoridor import Quoridor, QuoridorError
+
+
+def _course():
+    # course de pions: plus aucun mur à placer
+    return Quoridor(
+        [{'nom': 'idul', 'murs': 0, 'pos': (5, 3)},
+         {'nom': 'automate', 'murs': 0, 'pos': (4, 7)}],
+        {'horizontaux': [[1, 5], [3, 5], [5, 5], [7, 5], [2, 8], [6, 2], [8, 7]],
+         'verticaux': [[2, 2], [9, 3], [3, 7], [6, 6], [8, 2], [4, 2], [7, 8],
+                       [5, 8], [2, 6], [9, 6], [6, 3], [4, 8], [5, 3]]})
+
+
+def test_course_de_pions_lue_dans_la_table_de_finales(monkeypatch):
+    appels = []
+    meilleur_coup = quoridor.FINALES.meilleur_coup
+    monkeypatch.setattr(quoridor.FINALES, 'meilleur_coup',
+                        lambda *args: appels.append(args) or meilleur_coup(*args))
+    partie = _course()
+    type_coup, _ = partie.jouer_coup(1)
+    assert type_coup == 'D'
+    assert appels and partie.noeuds_visités == 0
+
+
+@pytest.mark.parametrize('mode', ['alphabeta', 'mcts'])
+def test_recherche_si_la_table_de_finales_est_muette(monkeypatch, mode):
+    monkeypatch.setattr(quoridor.FINALES, 'meilleur_coup', lambda damier, trait: None)
+    partie = _course()
+    avant = partie.état_partie()['joueurs'][0]['pos']
+    type_coup, position = partie.jouer_coup(1, profondeur=2, mode=mode, simulations=50,
+                                            travailleurs=1)
+    assert type_coup == 'D'
+    assert tuple(position) != tuple(avant)
+    assert tuple(partie.état_partie()['joueurs'][0]['pos']) == tuple(position)
+    assert partie.noeuds_visités > 0
+
+
+def _résumé(partie):
+    état = partie.état_partie()
+    return (
+        [(joueur['nom'], joueur['murs'], tuple(joueur['pos'])) for joueur in état['joueurs']],
+        [tuple(mur) for mur in état['murs']['horizontaux']],
+        [tuple(mur) for mur in état['murs']['verticaux']],
+    )
+
+
+@pytest.mark.parametrize('graine', range(6))
+def test_appliquer_puis_annuler_rétablit_l_état(graine):
+    hasard = random.Random(graine)
+    partie = Quoridor(['idul', 'automate'])
+    résumés = [_résumé(partie)]
+    joués = []
+    joueur = 1
+    while not partie.partie_terminée() and len(joués) < 80:
+        coup = hasard.choice(list(coups_légaux(partie.état_compact(), joueur)))
+        if hasard.random() < 0.5:
+            partie.appliquer(joueur, coup)
+        elif coup[0] == 'D':
+            partie.déplacer_jeton(joueur, coup[1])
+        else:
+            partie.placer_mur(
+                joueur, coup[1], 'horizontal' if coup[0] == 'MH' else 'vertical')
+        joués.append((joueur, coup[0]))
+        résumés.append(_résumé(partie))
+        joueur = 3 - joueur
+    assert {type_coup for _, type_coup in joués} >= {'D', 'MH', 'MV'}
+
+    while joués:
+        assert partie.annuler() == joués.pop()
+        résumés.pop()
+        assert _résumé(partie) == résumés[-1]
+    with pytest.raises(QuoridorError):
+        partie.annuler()
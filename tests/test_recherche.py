@@ -0,0 +1,84 @@
+"""Tests de la recherche alpha-bêta (recherche.py)."""
+import time
+
+import pytest
+
+from banc import charger_corpus
+from coups import coups_légaux
+from damier import RANGÉES
+from etat import EtatQuoridor
+from recherche import INFINI, VICTOIRE, Recherche, coup_externe
+
+CORPUS = charger_corpus()
+
+
+def _recherche(état, **options):
+    compact = EtatQuoridor.depuis_dict(état)
+    return Recherche(compact.damier(), list(compact.restants), **options)
+
+
+def _minimax(recherche, profondeur, trait, ply):
+    # negamax sans élagage ni table, sur les coups de la recherche
+    adversaire = 3 - trait
+    if recherche.damier.pions[adversaire - 1] in RANGÉES[adversaire]:
+        return -VICTOIRE + ply
+    if profondeur == 0:
+        return recherche.évaluer(trait)
+    meilleur = -INFINI
+    for coup in recherche.coups(trait):
+        annulation = recherche.jouer(coup, trait)
+        meilleur = max(meilleur, -_minimax(recherche, profondeur - 1, adversaire, ply + 1))
+        recherche.déjouer(coup, trait, annulation)
+    return meilleur
+
+
+@pytest.mark.parametrize('indice, profondeur, murs_complets', [
+    (0, 2, False), (5, 2, False), (11, 2, False), (17, 2, False),
+    (0, 3, False), (5, 3, False), (11, 3, False), (17, 3, False),
+    (11, 2, True),
+])
+def test_alpha_bêta_et_table_selon_minimax(indice, profondeur, murs_complets):
+    état = CORPUS[indice]
+    attendu = _minimax(_recherche(état, murs_complets=murs_complets), profondeur, 1, 0)
+
+    recherche = _recherche(état, profondeur=profondeur, noeuds_max=float('inf'),
+                           murs_complets=murs_complets)
+    _, score = recherche.meilleur_coup(1)
+    assert score == attendu
+    # la table de la première recherche ne doit pas fausser la suivante
+    _, score = recherche.meilleur_coup(1)
+    assert score == attendu
+
+
+def _vérifier_interruption(état, recherche, profondeur):
+    damier = recherche.damier
+    avant = (list(damier.pions), damier.murs_h, damier.murs_v, list(recherche.murs))
+    coup, _ = recherche.meilleur_coup(1)
+    assert (list(damier.pions), damier.murs_h, damier.murs_v, list(recherche.murs)) == avant
+    assert coup_externe(coup) in set(coups_légaux(EtatQuoridor.depuis_dict(état), 1))
+    assert recherche.profondeur_atteinte < profondeur
+
+
+@pytest.mark.parametrize('indice', [0, 8, 16])
+def test_budget_de_temps(indice):
+    état = CORPUS[indice]
+    recherche = _recherche(état, profondeur=30, noeuds_max=float('inf'), temps_max=0.1)
+    début = time.perf_counter()
+    _vérifier_interruption(état, recherche, 30)
+    # marge large: la génération des coups de la racine n'est pas interrompue
+    assert time.perf_counter() - début < 1.0
+    assert recherche.profondeur_atteinte >= 1
+
+
+@pytest.mark.parametrize('noeuds_max', [1, 50, 500])
+@pytest.mark.parametrize('indice', [0, 8, 16])
+def test_budget_de_noeuds(indice, noeuds_max):
+    état = CORPUS[indice]
+    recherche = _recherche(état, profondeur=30, noeuds_max=noeuds_max)
+    _vérifier_interruption(état, recherche, 30)
+    # le noeud qui dépasse le budget est compté, puis la recherche s'arrête
+    assert recherche.noeuds == noeuds_max + 1
+    if noeuds_max == 1:
+        assert recherche.profondeur_atteinte == 0
+    if noeuds_max == 500:
+        assert recherche.profondeur_atteinte >= 1
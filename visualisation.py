@@ -0,0 +1,49 @@
+"""
+Visualisation du graphe des déplacements admissibles (voir graphe.construire_graphe).
+
+networkx et matplotlib ne sont requis que par ce module, qui n'est importé par aucun
+autre: le jeu et l'API démarrent sans eux.
+
+Utilisation: python visualisation.py
+"""
+import matplotlib.pyplot as plt
+import networkx as nx
+
+from graphe import EXEMPLE, construire_graphe
+
+
+def afficher_graphe(état):
+    """
+    Dessiner le graphe des déplacements admissibles d'un état de jeu: les pions en
+    rouge (joueur 1) et en vert (joueur 2), avec leurs noeuds objectifs.
+
+    :param état: l'état de jeu, tel que retourné par le serveur.
+    """
+    graphe = construire_graphe(
+        [joueur['pos'] for joueur in état['joueurs']],
+        état['murs']['horizontaux'],
+        état['murs']['verticaux']
+    )
+    positions = {'B1': (5, 10), 'B2': (5, 0)}
+
+    colors = {
+        'B1': 'red', 'B2': 'green',
+        tuple(état['joueurs'][0]['pos']): 'red',
+        tuple(état['joueurs'][1]['pos']): 'green',
+    }
+    sizes = {
+        tuple(état['joueurs'][0]['pos']): 300,
+        tuple(état['joueurs'][1]['pos']): 300
+    }
+
+    nx.draw(
+        graphe,
+        pos={node: positions.get(node, node) for node in graphe},
+        node_size=[sizes.get(node, 100) for node in graphe],
+        node_color=[colors.get(node, 'gray') for node in graphe],
+    )
+    plt.show()
+
+
+if __name__ == "__main__":
+    afficher_graphe(EXEMPLE)